@@ -1,8 +1,48 @@
-import uvicorn
+import argparse
+import asyncio
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from src.config import APP_TITLE, APP_DESCRIPTION, APP_VERSION, PORT, HOST, LOG_LEVEL, DATA_DIR, WEBHOOK_SECRET, BROKERAGE_NAME
+from src.config import (
+    APP_TITLE, APP_DESCRIPTION, APP_VERSION, PORT, HOST, LOG_LEVEL, DATA_DIR, WEBHOOK_SECRET, BROKERAGE_NAME,
+    SERVER_MODE, WORKERS, KEEP_ALIVE_TIMEOUT, BACKLOG, GRACEFUL_SHUTDOWN_TIMEOUT, METRICS_MULTIPROC_DIR
+)
 from src.routes import webhook_router, api_router
+from src.jsoncodec import JSONResponse
+from src.profiling import ProfilingMiddleware
+from src.metrics import clear_snapshots, write_snapshot, write_snapshots_periodically
+from src.background import drain
+from src.tenants import TENANTS, DEFAULT_TENANT, ensure_storage
+from src.assistant_config import ASSISTANTS
+from src.live import LIVE_CALLS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create storage and render assistant configs on startup; drain background writes on shutdown
+
+    Nothing touches the filesystem at import time, so importing the app
+    (worker boot, tests, benchmarks) stays cheap.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # Other tenants' shards are created on their first webhook
+    ensure_storage(DEFAULT_TENANT)
+    ASSISTANTS.add_numbers(TENANTS.brokerage_numbers())
+    ASSISTANTS.warm()
+    # Several workers: keep this one's share of /metrics on disk for whichever worker is scraped
+    snapshots = asyncio.create_task(write_snapshots_periodically()) if METRICS_MULTIPROC_DIR else None
+    # Calls whose end never arrived are swept on a timer rather than on every webhook
+    evictions = asyncio.create_task(LIVE_CALLS.evict_periodically())
+    yield
+    evictions.cancel()
+    await drain(GRACEFUL_SHUTDOWN_TIMEOUT)
+    if snapshots:
+        snapshots.cancel()
+        write_snapshot(METRICS_MULTIPROC_DIR)
 
 
 def create_app() -> FastAPI:
@@ -10,9 +50,15 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=APP_TITLE,
         description=APP_DESCRIPTION,
-        version=APP_VERSION
+        version=APP_VERSION,
+        lifespan=lifespan,
+        # Routes returning dicts are encoded with src/jsoncodec.py too
+        default_response_class=JSONResponse
     )
     
+    # Opt-in profiling of /webhook deliveries
+    app.add_middleware(ProfilingMiddleware)
+    
     # Include routers
     app.include_router(webhook_router)
     app.include_router(api_router)
@@ -26,12 +72,47 @@ app = create_app()
 
 def main():
     """Start the server"""
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description=f"{BROKERAGE_NAME} Webhook Server")
+    parser.add_argument("--production", action="store_true", default=SERVER_MODE == "production",
+                        help="Run without the reloader, with WEB_CONCURRENCY workers (default: one per CPU) and uvloop/httptools")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Worker processes in production mode (default: WEB_CONCURRENCY or the CPU count, here {WORKERS})")
+    args = parser.parse_args()
+    
     print("\n" + "=" * 60)
     print(f"Starting {BROKERAGE_NAME} Webhook Server")
     print("=" * 60)
     print(f"Port: {PORT}")
+    print(f"Mode: {'production' if args.production else 'development'}")
     print(f"Data Directory: {DATA_DIR.absolute()}")
     print(f"Webhook Secret: {'Configured' if WEBHOOK_SECRET != 'your-webhook-secret-key' else 'Using default (change this!)'}")
+    
+    if not args.production:
+        print("=" * 60 + "\n")
+        uvicorn.run(
+            "app:app",
+            host=HOST,
+            port=PORT,
+            log_level=LOG_LEVEL,
+            reload=True
+        )
+        return
+    
+    # Both ship with uvicorn[standard]; fall back to the pure-Python defaults if missing
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    if args.workers > 1:
+        # Workers inherit the environment, so each one finds the shared metrics directory
+        metrics_dir = METRICS_MULTIPROC_DIR or str(DATA_DIR / "metrics")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+        clear_snapshots(metrics_dir)
+        print(f"Metrics directory: {metrics_dir}")
+    
+    print(f"Workers: {args.workers}")
+    print(f"Event loop: {loop}, HTTP parser: {http}")
     print("=" * 60 + "\n")
     
     uvicorn.run(
@@ -39,7 +120,15 @@ def main():
         host=HOST,
         port=PORT,
         log_level=LOG_LEVEL,
-        reload=True
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEP_ALIVE_TIMEOUT,
+        # Time allowed for in-flight requests to finish after SIGTERM;
+        # lifespan shutdown then drains background writes
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True
     )
 
 
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the webhook server
+
+Run from the repository root, e.g. `python -m benchmarks.startup`.
+Results are written to benchmarks/results/ so runs can be compared.
+"""
@@ -0,0 +1,138 @@
+"""
+Bytes on the wire and CPU per request for single-call reads
+
+Seeds calls through POST /webhook in-process, then fetches each one from
+/db/calls/{call_id} and /calls/{call_id} as a client that doesn't compress,
+one that accepts gzip (and brotli, when installed), and one revalidating a
+copy it already has with If-None-Match. Bytes are the response body as
+sent, before the client decompresses it; CPU is process time per request,
+client included, so compare runs rather than reading it as server cost.
+
+    python -m benchmarks.call_payloads --calls 200 --transcript-length 400
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+from .common import REPO_ROOT, RESULTS_DIR, save_result
+from .payloads import end_of_call_report
+
+ENDPOINTS = ("/db/calls/{call_id}", "/calls/{call_id}")
+
+
+def _clients() -> Dict[str, Dict[str, str]]:
+    clients = {"identity": {"Accept-Encoding": "identity"}, "gzip": {"Accept-Encoding": "gzip"}}
+    try:
+        import brotli  # noqa: F401 (httpx only decodes br when it is installed)
+        clients["br"] = {"Accept-Encoding": "br, gzip"}
+    except ImportError:
+        pass
+    return clients
+
+
+async def _fetch(client, path: str, headers: Dict[str, str]):
+    response = await client.get(path, headers=headers)
+    await response.aread()
+    return response
+
+
+async def _measure(client, call_ids: list[str], endpoint: str, headers: Dict[str, str], revalidate: bool) -> dict:
+    etags = {}
+    if revalidate:
+        for call_id in call_ids:
+            response = await _fetch(client, endpoint.format(call_id=call_id), headers)
+            etags[call_id] = response.headers.get("etag")
+
+    wire_bytes = 0
+    statuses: Dict[int, int] = {}
+    start = time.process_time()
+    for call_id in call_ids:
+        request_headers = dict(headers)
+        if etags.get(call_id):
+            request_headers["If-None-Match"] = etags[call_id]
+        response = await _fetch(client, endpoint.format(call_id=call_id), request_headers)
+        wire_bytes += response.num_bytes_downloaded
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    cpu = time.process_time() - start
+
+    return {
+        "avg_wire_bytes": round(wire_bytes / len(call_ids)),
+        "cpu_ms_per_request": round(cpu / len(call_ids) * 1000, 3),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def run(calls: int, transcript_length: int, seed: int) -> dict:
+    import httpx
+    from app import app
+
+    rng = random.Random(seed)
+    reports = [end_of_call_report(rng, transcript_length) for _ in range(calls)]
+    call_ids = [report["message"]["call"]["id"] for report in reports]
+    results = {}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for report in reports:
+                    await client.post("/webhook", content=json.dumps(report), headers={"Content-Type": "application/json"})
+
+                for endpoint in ENDPOINTS:
+                    for name, headers in _clients().items():
+                        results[f"{endpoint} {name}"] = await _measure(client, call_ids, endpoint, headers, False)
+                    results[f"{endpoint} revalidate"] = await _measure(client, call_ids, endpoint, {"Accept-Encoding": "gzip"}, True)
+    return results
+
+
+def _previous(name: str) -> Optional[dict]:
+    path = RESULTS_DIR / f"{name}_latest.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def report(results: dict, previous: Optional[dict]):
+    prev_cases = (previous or {}).get("cases", {})
+    print("=" * 78)
+    print(f"{'case':<34}{'wire B':>10}{'CPU ms':>9}  statuses")
+    print("-" * 78)
+    for case, stats in results.items():
+        before = prev_cases.get(case)
+        change = f"  (was {before['avg_wire_bytes']} B, {before['cpu_ms_per_request']} ms)" if before else ""
+        print(f"{case:<34}{stats['avg_wire_bytes']:>10}{stats['cpu_ms_per_request']:>9.3f}  {stats['statuses']}{change}")
+    if previous:
+        print(f"Compared with previous run recorded {previous['recorded_at']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GET /db/calls/{id} and /calls/{id} payloads")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--transcript-length", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    name = "call_payloads"
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Must be set before the app is imported
+        os.environ["DATA_DIR"] = data_dir
+        os.environ.pop("DB_PATH", None)
+        os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+        sys.path.insert(0, str(REPO_ROOT))
+        results = asyncio.run(run(args.calls, args.transcript_length, args.seed))
+
+    summary = {"cases": results, "config": {"calls": args.calls, "transcript_length": args.transcript_length}}
+    previous = _previous(name)
+    if previous and previous.get("config") != summary["config"]:
+        previous = None
+    report(results, previous)
+    print(f"Results saved to: {save_result(name, summary)}")
+
+
+if __name__ == "__main__":
+    main()
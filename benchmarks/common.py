@@ -0,0 +1,66 @@
+"""Shared helpers for benchmark result storage and regression checks"""
+import json
+import math
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save_result(name: str, result: Dict[str, Any]) -> Path:
+    """Write a timestamped result file and update `<name>_latest.json`"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    record = {"benchmark": name, "recorded_at": datetime.utcnow().isoformat(), "environment": environment(), **result}
+
+    path = RESULTS_DIR / f"{name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+    path.write_text(json.dumps(record, indent=2))
+    (RESULTS_DIR / f"{name}_latest.json").write_text(json.dumps(record, indent=2))
+    return path
+
+
+def load_baseline(name: str) -> Optional[Dict[str, Any]]:
+    path = RESULTS_DIR / f"{name}_baseline.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(name: str, result: Dict[str, Any]) -> Path:
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{name}_baseline.json"
+    path.write_text(json.dumps({"benchmark": name, "recorded_at": datetime.utcnow().isoformat(), **result}, indent=2))
+    return path
+
+
+def check_regression(metric: str, current: float, baseline: Optional[float], tolerance: float, slack: float = 0.0) -> Optional[str]:
+    """
+    Compare a lower-is-better metric against its baseline
+
+    Returns a message if `current` exceeds baseline * (1 + tolerance) + slack.
+    """
+    if baseline is None:
+        return None
+    limit = baseline * (1 + tolerance) + slack
+    if current > limit:
+        return f"{metric}: {current:.2f} exceeds baseline {baseline:.2f} (limit {limit:.2f})"
+    return None
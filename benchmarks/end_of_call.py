@@ -0,0 +1,109 @@
+"""
+Memory and CPU of one end-of-call report
+
+Parses a report body and runs handle_end_of_call on it, the way /webhook
+does, against a throwaway DATA_DIR. Reports:
+
+- peak RSS growth while handling the first long report (after a short
+  warm-up report has loaded everything), from ru_maxrss
+- peak Python allocations per report, from tracemalloc
+- CPU per report on the handling thread (background scoring excluded)
+
+Run it in a fresh interpreter each time; RSS only ever grows.
+
+    python -m benchmarks.end_of_call --transcript-length 2000 --reports 20
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .common import REPO_ROOT, save_result
+from .payloads import end_of_call_report
+
+
+def _max_rss_mb() -> float:
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(transcript_length: int, reports: int, seed: int) -> dict:
+    from src import jsoncodec
+    from src.background import drain
+    from src.handlers import handle_end_of_call
+    from src.tenants import DEFAULT_TENANT, ensure_storage
+
+    rng = random.Random(seed)
+    bodies = [json.dumps(end_of_call_report(rng, transcript_length)).encode() for _ in range(reports + 2)]
+    warmup = json.dumps(end_of_call_report(rng, 10)).encode()
+
+    async def handle(body: bytes):
+        result = await handle_end_of_call(jsoncodec.loads(body))
+        if result.get("status") != "success":
+            raise RuntimeError(result)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        ensure_storage(DEFAULT_TENANT)
+        await handle(warmup)
+        await drain(60)
+
+        before = _max_rss_mb()
+        await handle(bodies[0])
+        rss_growth = _max_rss_mb() - before
+        await drain(60)
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await handle(bodies[1])
+        allocated_peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        await drain(60)
+
+        cpu = 0.0
+        for body in bodies[2:]:
+            start = time.thread_time()
+            await handle(body)
+            cpu += time.thread_time() - start
+            await drain(60)
+
+    return {
+        "body_bytes": len(bodies[0]),
+        "peak_rss_growth_mb": round(rss_growth, 1),
+        "peak_allocated_mb": round(allocated_peak / 2**20, 1),
+        "cpu_ms_per_report": round(cpu / reports * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory and CPU of handle_end_of_call")
+    parser.add_argument("--transcript-length", type=int, default=2000)
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Must be set before src is imported
+        os.environ["DATA_DIR"] = data_dir
+        os.environ.pop("DB_PATH", None)
+        os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+        sys.path.insert(0, str(REPO_ROOT))
+        summary = asyncio.run(run(args.transcript_length, args.reports, args.seed))
+
+    summary["config"] = {"transcript_length": args.transcript_length, "reports": args.reports}
+    print(f"Report body: {summary['body_bytes']:,} bytes ({args.transcript_length} transcript messages)")
+    print(f"Peak RSS growth: {summary['peak_rss_growth_mb']} MB")
+    print(f"Peak allocations: {summary['peak_allocated_mb']} MB")
+    print(f"CPU per report: {summary['cpu_ms_per_report']} ms")
+    print(f"Results saved to: {save_result('end_of_call', summary)}")
+
+
+if __name__ == "__main__":
+    main()
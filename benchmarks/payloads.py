@@ -0,0 +1,230 @@
+"""
+Synthetic Vapi webhook payloads
+
+Shapes follow what the handlers in src/handlers.py read, padded with the
+fields real Vapi deliveries carry so body sizes are realistic.
+
+    python -m benchmarks.payloads end-of-call-report --transcript-length 200
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MESSAGE_TYPES = ("end-of-call-report", "tool-calls", "status-update", "transcript")
+
+# Relative frequency of each message type over a typical call
+DEFAULT_MIX = {"transcript": 20, "status-update": 3, "tool-calls": 1, "end-of-call-report": 1}
+
+FIRST_NAMES = ["Maria", "James", "Priya", "Daniel", "Chen", "Olivia", "Marcus", "Aisha", "Robert", "Sofia"]
+LAST_NAMES = ["Gonzalez", "Smith", "Patel", "Kim", "Nguyen", "Johnson", "Okafor", "Rossi", "Cohen", "Müller"]
+ROLES = ["owner", "buyer", "broker", "lender", "tenant", "landlord", "investor", "other"]
+ASSET_TYPES = ["office", "retail", "industrial", "multifamily", "land", "mixed-use", "self storage", "medical office"]
+LOCATIONS = ["Austin, TX", "Miami", "Phoenix metro", "Brooklyn, NY", "Dallas-Fort Worth", "Denver CO", "Chicago suburbs", "Nashville"]
+DEAL_SIZES = ["$2-3M", "around 500k", "$10 million", "1.5M to 2M", "under $750,000", "not sure yet", "$25M+"]
+URGENCIES = ["immediate", "within_month", "within_quarter", "exploring", "unspecified"]
+END_REASONS = ["customer-ended-call", "assistant-ended-call", "silence-timed-out", "exceeded-max-duration"]
+STATUSES = ["queued", "ringing", "in-progress", "forwarding", "ended"]
+
+ASSISTANT_LINES = [
+    "Hi! This is Realflow. How can I help you today?",
+    "Oh, that's exciting. Are you looking to buy, sell, or something else?",
+    "Got it. What kind of property are we talking about, and where is it?",
+    "That makes sense. What's driving your timeline on this?",
+    "Perfect, and what's the best email for our team to follow up?",
+    "Great! Let me make sure our team has the right contact information for you.",
+]
+USER_LINES = [
+    "Yeah hi, I'm thinking about selling a small industrial building I own.",
+    "It's about forty thousand square feet, fully leased, out near the airport.",
+    "We'd like to close before the end of the year if the numbers work.",
+    "I got a call from one of your brokers last week and wanted to follow up.",
+    "Do you folks do lending, or can you point me to someone who does?",
+    "Sure, it's probably easiest to reach me on my cell.",
+]
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+1{rng.randint(200, 989)}{rng.randint(200, 999)}{rng.randint(1000, 9999)}"
+
+
+def _call(rng: random.Random, call_id: str, assistant_id: str, started: datetime, ended: Optional[datetime] = None) -> Dict[str, Any]:
+    call = {
+        "id": call_id,
+        "orgId": str(uuid.UUID(int=rng.getrandbits(128))),
+        "assistantId": assistant_id,
+        "type": "inboundPhoneCall",
+        "status": "ended" if ended else "in-progress",
+        "phoneNumber": _phone(rng),
+        "customer": {"number": _phone(rng)},
+        "createdAt": _iso(started - timedelta(seconds=2)),
+        "startedAt": _iso(started),
+    }
+    if ended:
+        call["endedAt"] = _iso(ended)
+        call["duration"] = round((ended - started).total_seconds(), 2)
+    return call
+
+
+def caller_information(rng: random.Random) -> Dict[str, Any]:
+    """Arguments of a submit_caller_information tool call"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    asset, location = rng.choice(ASSET_TYPES), rng.choice(LOCATIONS)
+    return {
+        "caller_name": f"{first} {last}",
+        "phone_number": _phone(rng),
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "caller_role": rng.choice(ROLES),
+        "asset_type": asset,
+        "location": location,
+        "reason_for_calling": f"Interested in {asset} opportunities in {location}",
+        "deal_size": rng.choice(DEAL_SIZES),
+        "urgency": rng.choice(URGENCIES),
+        "additional_notes": "Prefers a call back in the afternoon.",
+        "inquiry_summary": f"{asset.title()} inquiry in {location}",
+    }
+
+
+def transcript_messages(rng: random.Random, length: int, started: datetime) -> list[Dict[str, Any]]:
+    """Alternating assistant/user turns with realistic sentence lengths"""
+    messages = []
+    moment = started
+    for i in range(length):
+        role = "assistant" if i % 2 == 0 else "user"
+        lines = ASSISTANT_LINES if role == "assistant" else USER_LINES
+        content = " ".join(rng.choice(lines) for _ in range(rng.randint(1, 3)))
+        moment += timedelta(seconds=rng.uniform(2, 12))
+        messages.append({"role": role, "content": content, "timestamp": _iso(moment)})
+    return messages
+
+
+def end_of_call_report(rng: random.Random, transcript_length: int = 40, structured_data: bool = True,
+                       call_id: Optional[str] = None, assistant_id: str = "asst-benchmark") -> Dict[str, Any]:
+    call_id = call_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    started = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(1, 600))
+    transcript = transcript_messages(rng, transcript_length, started)
+    ended = datetime.fromisoformat(transcript[-1]["timestamp"].replace("Z", "+00:00")) if transcript else started
+
+    analysis = {
+        "summary": "Caller is exploring a sale of an owned industrial property and asked for a broker follow-up.",
+        "successEvaluation": rng.choice(["true", "false", "8", "3"]),
+    }
+    if structured_data:
+        analysis["structuredData"] = caller_information(rng)
+
+    return {
+        "message": {
+            "type": "end-of-call-report",
+            "timestamp": int(ended.timestamp() * 1000),
+            "call": _call(rng, call_id, assistant_id, started, ended),
+            "endedReason": rng.choice(END_REASONS),
+            "cost": round(rng.uniform(0.05, 2.5), 4),
+            "recordingUrl": f"https://storage.vapi.ai/{call_id}-mono.wav",
+            "analysis": analysis,
+            "transcript": transcript,
+            # Vapi also sends the full message log; the handlers ignore it but it dominates body size
+            "messages": [
+                {"role": m["role"] if m["role"] == "user" else "bot", "message": m["content"], "time": i, "secondsFromStart": i * 4.0}
+                for i, m in enumerate(transcript)
+            ],
+        }
+    }
+
+
+def tool_calls(rng: random.Random, call_id: Optional[str] = None, assistant_id: str = "asst-benchmark") -> Dict[str, Any]:
+    call_id = call_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    tool_call = {
+        "id": f"call_{uuid.UUID(int=rng.getrandbits(128)).hex[:24]}",
+        "type": "function",
+        "function": {"name": "submit_caller_information", "arguments": caller_information(rng)},
+    }
+    started = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(1, 10))
+    return {
+        "message": {
+            "type": "tool-calls",
+            "timestamp": int(datetime.now(timezone.utc).timestamp() * 1000),
+            "call": _call(rng, call_id, assistant_id, started),
+            "toolCalls": [tool_call],
+            "toolCallList": [tool_call],
+        }
+    }
+
+
+def status_update(rng: random.Random, call_id: Optional[str] = None, assistant_id: str = "asst-benchmark",
+                  status: Optional[str] = None) -> Dict[str, Any]:
+    call_id = call_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    started = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(1, 10))
+    return {
+        "message": {
+            "type": "status-update",
+            "timestamp": int(datetime.now(timezone.utc).timestamp() * 1000),
+            "status": status or rng.choice(STATUSES),
+            "call": _call(rng, call_id, assistant_id, started),
+        }
+    }
+
+
+def transcript(rng: random.Random, call_id: Optional[str] = None, assistant_id: str = "asst-benchmark",
+               final: Optional[bool] = None) -> Dict[str, Any]:
+    call_id = call_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    started = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(1, 10))
+    role = rng.choice(["assistant", "user"])
+    return {
+        "message": {
+            "type": "transcript",
+            "timestamp": int(datetime.now(timezone.utc).timestamp() * 1000),
+            "role": role,
+            "transcriptType": ("final" if final else "partial") if final is not None else rng.choice(["final", "partial"]),
+            "transcript": rng.choice(ASSISTANT_LINES if role == "assistant" else USER_LINES),
+            "call": _call(rng, call_id, assistant_id, started),
+        }
+    }
+
+
+def generate(message_type: str, rng: random.Random, transcript_length: int = 40, structured_data: bool = True,
+             **kwargs) -> Dict[str, Any]:
+    """Build one payload of the given Vapi message type"""
+    if message_type == "end-of-call-report":
+        return end_of_call_report(rng, transcript_length=transcript_length, structured_data=structured_data, **kwargs)
+    if message_type == "tool-calls":
+        return tool_calls(rng, **kwargs)
+    if message_type == "status-update":
+        return status_update(rng, **kwargs)
+    if message_type == "transcript":
+        return transcript(rng, **kwargs)
+    raise ValueError(f"Unknown message type: {message_type}")
+
+
+def workload(count: int, mix: Optional[Dict[str, int]] = None, seed: int = 0, transcript_length: int = 40,
+             structured_data: bool = True) -> Iterator[Tuple[str, bytes]]:
+    """Yield `count` (message_type, encoded body) pairs drawn from `mix`"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    types, weights = zip(*mix.items())
+    for _ in range(count):
+        message_type = rng.choices(types, weights)[0]
+        payload = generate(message_type, rng, transcript_length=transcript_length, structured_data=structured_data)
+        yield message_type, json.dumps(payload).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a synthetic Vapi webhook payload")
+    parser.add_argument("message_type", choices=MESSAGE_TYPES)
+    parser.add_argument("--transcript-length", type=int, default=40)
+    parser.add_argument("--no-structured-data", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate(args.message_type, random.Random(args.seed), transcript_length=args.transcript_length,
+                       structured_data=not args.no_structured_data)
+    print(json.dumps(payload, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Startup benchmark: import time of `app` and time-to-first-request
+
+Each sample runs in a fresh interpreter against a throwaway DATA_DIR.
+The first run records a baseline in benchmarks/results/startup_baseline.json;
+later runs exit non-zero if either metric regresses past the tolerance.
+
+    python -m benchmarks.startup [--runs 5] [--tolerance 0.25] [--update-baseline]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from .common import REPO_ROOT, save_result, load_baseline, save_baseline, check_regression
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+SERVER_SNIPPET = "import sys, uvicorn; uvicorn.run('app:app', host='127.0.0.1', port=int(sys.argv[1]), log_level='warning')"
+
+# Regressions are judged on the fastest run, which is the least noisy.
+# Absolute slack on top of the relative tolerance keeps tiny baselines from flapping
+IMPORT_SLACK_MS = 20
+FIRST_REQUEST_SLACK_MS = 100
+
+
+def _env(data_dir: str) -> dict:
+    env = dict(os.environ)
+    env["DATA_DIR"] = data_dir
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(data_dir: str) -> float:
+    """Milliseconds spent importing `app` in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=REPO_ROOT, env=_env(data_dir), capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def slowest_imports(data_dir: str, limit: int = 10) -> list[tuple[str, float]]:
+    """Top modules by cumulative import time, from `python -X importtime`"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=REPO_ROOT, env=_env(data_dir), capture_output=True, text=True, check=True
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append((name, int(cumulative_us) / 1000))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def measure_first_request(data_dir: str, timeout: float = 30.0) -> float:
+    """Milliseconds from spawning the server to the first successful /health"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SNIPPET, str(port)],
+        cwd=REPO_ROOT, env=_env(data_dir), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.005)
+        raise TimeoutError(f"Server did not answer {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        import_ms = sorted(measure_import(data_dir) for _ in range(args.runs))
+        first_request_ms = sorted(measure_first_request(data_dir) for _ in range(args.runs))
+        top_imports = slowest_imports(data_dir)
+
+    result = {
+        "runs": args.runs,
+        "import_ms": {"median": statistics.median(import_ms), "min": import_ms[0], "max": import_ms[-1]},
+        "first_request_ms": {"median": statistics.median(first_request_ms), "min": first_request_ms[0], "max": first_request_ms[-1]},
+        "slowest_imports_ms": dict(top_imports),
+    }
+    path = save_result("startup", result)
+
+    print("=" * 60)
+    print("STARTUP BENCHMARK")
+    print("=" * 60)
+    print(f"Import app:          median {result['import_ms']['median']:.1f}ms (min {import_ms[0]:.1f}, max {import_ms[-1]:.1f})")
+    print(f"Time to first request: median {result['first_request_ms']['median']:.1f}ms (min {first_request_ms[0]:.1f}, max {first_request_ms[-1]:.1f})")
+    print("\nSlowest imports (cumulative):")
+    for name, ms in top_imports:
+        print(f"  {ms:8.1f}ms  {name}")
+    print(f"\nResults saved to: {path}")
+
+    baseline = load_baseline("startup")
+    if baseline is None or args.update_baseline:
+        print(f"Baseline saved to: {save_baseline('startup', result)}")
+        return
+
+    failures = [
+        message for message in (
+            check_regression("import_ms", result["import_ms"]["min"], baseline["import_ms"]["min"], args.tolerance, IMPORT_SLACK_MS),
+            check_regression("first_request_ms", result["first_request_ms"]["min"], baseline["first_request_ms"]["min"], args.tolerance, FIRST_REQUEST_SLACK_MS),
+        ) if message
+    ]
+    if failures:
+        print("\nREGRESSION:")
+        for message in failures:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nNo regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
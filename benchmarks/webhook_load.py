@@ -0,0 +1,219 @@
+"""
+Load benchmark for POST /webhook
+
+Drives the app either in-process through httpx's ASGI transport (no network,
+measures the application itself) or over a real socket against a uvicorn
+subprocess (includes HTTP parsing and the event loop). Reports req/s and
+p50/p95/p99 latency per message type, saves the run to benchmarks/results/
+and prints the change against the previous run of the same mode.
+
+    python -m benchmarks.webhook_load --mode inprocess --requests 2000 --concurrency 32
+    python -m benchmarks.webhook_load --mode socket --workers 2 --transcript-length 400
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from .common import REPO_ROOT, RESULTS_DIR, percentile, save_result, load_baseline, save_baseline, check_regression
+from .payloads import DEFAULT_MIX, MESSAGE_TYPES, workload
+
+
+async def _drive(client, bodies: list[tuple[str, bytes]], concurrency: int) -> tuple[Dict[str, list[float]], int, float]:
+    """Send every body with at most `concurrency` in flight; returns latencies, errors, wall time"""
+    latencies: Dict[str, list[float]] = defaultdict(list)
+    errors = 0
+    queue = iter(bodies)
+
+    async def worker():
+        nonlocal errors
+        for message_type, body in queue:
+            start = time.perf_counter()
+            response = await client.post("/webhook", content=body, headers={"Content-Type": "application/json"})
+            latencies[message_type].append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_inprocess(bodies: list[tuple[str, bytes]], concurrency: int):
+    import httpx
+    from app import app
+
+    # Handlers log every delivery; keep the formatting cost but not the terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await _drive(client, bodies, concurrency)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_socket(bodies: list[tuple[str, bytes]], concurrency: int, workers: int):
+    import httpx
+
+    port = _free_port()
+    command = [
+        sys.executable, "-c",
+        "import sys, uvicorn; uvicorn.run('app:app', host='127.0.0.1', port=int(sys.argv[1]), "
+        "workers=int(sys.argv[2]), log_level='warning')",
+        str(port), str(workers),
+    ]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            deadline = time.perf_counter() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() > deadline:
+                    raise TimeoutError("Server did not start within 30s")
+                await asyncio.sleep(0.05)
+
+            return await _drive(client, bodies, concurrency)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def summarize(latencies: Dict[str, list[float]], errors: int, wall: float, bodies: list[tuple[str, bytes]]) -> dict:
+    total = sum(len(values) for values in latencies.values())
+    per_type = {}
+    for message_type, values in sorted(latencies.items()):
+        values.sort()
+        sizes = [len(body) for t, body in bodies if t == message_type]
+        per_type[message_type] = {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+            "avg_body_bytes": round(sum(sizes) / len(sizes)) if sizes else 0,
+        }
+    return {
+        "requests": total,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(total / wall, 1) if wall else 0,
+        "per_type": per_type,
+    }
+
+
+def _previous(name: str) -> Optional[dict]:
+    path = RESULTS_DIR / f"{name}_latest.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def _delta(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    change = (current - previous) / previous * 100
+    return f" ({change:+.1f}%)"
+
+
+def report(summary: dict, previous: Optional[dict]):
+    prev_types = (previous or {}).get("per_type", {})
+    print("=" * 78)
+    print(f"{'message type':<22}{'requests':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'body B':>12}")
+    print("-" * 78)
+    for message_type, stats in summary["per_type"].items():
+        print(f"{message_type:<22}{stats['requests']:>9}{stats['p50_ms']:>11.2f}{stats['p95_ms']:>11.2f}"
+              f"{stats['p99_ms']:>11.2f}{stats['avg_body_bytes']:>12}"
+              f"{_delta(stats['p95_ms'], prev_types.get(message_type, {}).get('p95_ms'))}")
+    print("-" * 78)
+    print(f"Throughput: {summary['requests_per_second']} req/s over {summary['wall_seconds']}s"
+          f"{_delta(summary['requests_per_second'], (previous or {}).get('requests_per_second'))}")
+    print(f"Errors: {summary['errors']}")
+    if previous:
+        print(f"Compared with previous run recorded {previous['recorded_at']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark POST /webhook")
+    parser.add_argument("--mode", choices=("inprocess", "socket"), default="inprocess")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="Server workers in socket mode")
+    parser.add_argument("--transcript-length", type=int, default=40)
+    parser.add_argument("--no-structured-data", action="store_true")
+    parser.add_argument("--only", choices=MESSAGE_TYPES, help="Send a single message type instead of the default mix")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if throughput or p95 regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    mix = {args.only: 1} if args.only else DEFAULT_MIX
+    bodies = list(workload(args.requests, mix, seed=args.seed, transcript_length=args.transcript_length,
+                           structured_data=not args.no_structured_data))
+    name = f"webhook_load_{args.mode}"
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Must be set before the app is imported (in-process) or spawned (socket)
+        os.environ["DATA_DIR"] = data_dir
+        os.environ.pop("DB_PATH", None)
+        os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+        sys.path.insert(0, str(REPO_ROOT))
+
+        if args.mode == "inprocess":
+            latencies, errors, wall = asyncio.run(run_inprocess(bodies, args.concurrency))
+        else:
+            latencies, errors, wall = asyncio.run(run_socket(bodies, args.concurrency, args.workers))
+
+    summary = summarize(latencies, errors, wall, bodies)
+    summary["config"] = {
+        "mode": args.mode, "requests": args.requests, "concurrency": args.concurrency, "workers": args.workers,
+        "transcript_length": args.transcript_length, "structured_data": not args.no_structured_data, "mix": mix,
+    }
+
+    previous = _previous(name)
+    if previous and previous.get("config") != summary["config"]:
+        previous = None
+    report(summary, previous)
+    print(f"Results saved to: {save_result(name, summary)}")
+
+    if args.update_baseline:
+        print(f"Baseline saved to: {save_baseline(name, summary)}")
+    if args.check:
+        baseline = load_baseline(name)
+        if baseline is None:
+            print("No baseline to check against; run with --update-baseline first")
+            sys.exit(1)
+        failures = [check_regression("seconds per request", 1 / summary["requests_per_second"],
+                                     1 / baseline["requests_per_second"], args.tolerance)]
+        for message_type, stats in summary["per_type"].items():
+            base = baseline["per_type"].get(message_type)
+            if base:
+                failures.append(check_regression(f"{message_type} p95_ms", stats["p95_ms"], base["p95_ms"], args.tolerance, 1.0))
+        failures = [f for f in failures if f]
+        if failures:
+            print("\nREGRESSION:")
+            for message in failures:
+                print(f"  {message}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
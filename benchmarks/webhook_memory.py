@@ -0,0 +1,96 @@
+"""
+Peak memory of POST /webhook as end-of-call reports grow
+
+Posts one end-of-call report per transcript length through the app
+in-process, against a throwaway DATA_DIR, and records the peak Python
+allocations while the request is handled (tracemalloc, the request body the
+client sends excluded). With bounded parsing the peak should track the
+stored transcript, not the whole body; run with and without ijson installed
+to compare the streaming and in-memory paths.
+
+    python -m benchmarks.webhook_memory --lengths 500 2000 8000
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .common import REPO_ROOT, save_result
+from .payloads import end_of_call_report
+
+
+async def run(lengths: list[int], seed: int) -> list[dict]:
+    import httpx
+    from app import app
+    from src.background import drain
+    from src.webhook_body import ijson
+
+    rng = random.Random(seed)
+    results = []
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                headers = {"Content-Type": "application/json"}
+                # Warm-up, so imports and first-use caches aren't counted
+                await client.post("/webhook", content=json.dumps(end_of_call_report(rng, 10)), headers=headers)
+                await drain(60)
+
+                for length in lengths:
+                    # Timed without tracemalloc, which slows allocation-heavy code unevenly
+                    body = json.dumps(end_of_call_report(rng, length)).encode()
+                    start = time.perf_counter()
+                    await client.post("/webhook", content=body, headers=headers)
+                    elapsed = time.perf_counter() - start
+                    await drain(60)
+
+                    body = json.dumps(end_of_call_report(rng, length)).encode()
+                    tracemalloc.start()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    response = await client.post("/webhook", content=body, headers=headers)
+                    peak = tracemalloc.get_traced_memory()[1] - baseline
+                    tracemalloc.stop()
+                    await drain(60)
+                    results.append({
+                        "transcript_length": length,
+                        "body_bytes": len(body),
+                        "status": response.status_code,
+                        "peak_allocated_mb": round(peak / 2**20, 1),
+                        "latency_ms": round(elapsed * 1000, 1),
+                        "streaming": bool(ijson),
+                    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory of /webhook for growing end-of-call reports")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Must be set before the app is imported
+        os.environ["DATA_DIR"] = data_dir
+        os.environ.pop("DB_PATH", None)
+        os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+        sys.path.insert(0, str(REPO_ROOT))
+        results = asyncio.run(run(args.lengths, args.seed))
+
+    print(f"{'messages':>9}{'body MB':>10}{'peak MB':>10}{'ms':>9}  status")
+    for result in results:
+        print(f"{result['transcript_length']:>9}{result['body_bytes'] / 2**20:>10.1f}"
+              f"{result['peak_allocated_mb']:>10.1f}{result['latency_ms']:>9.1f}  {result['status']}")
+    mode = "streaming (ijson)" if results and results[0]["streaming"] else "in-memory"
+    print(f"Parsing: {mode}")
+    print(f"Results saved to: {save_result('webhook_memory', {'cases': results, 'config': {'lengths': args.lengths}})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,92 @@
 #!/usr/bin/env python3
 """
-Database diagnostic script to check tables and identify issues
+Database diagnostics: contents, consistency checks and SQLite integrity
+
+Everything is computed in SQL (JSON1 for the stored JSON), over a single
+read-only connection, so it runs in seconds on large databases and never
+changes them.
+
+    python debug_db.py                          # row counts, recent rows, structured data, diagnosis
+    python debug_db.py check                    # orphans, duplicates, invalid JSON, rollups, index health
+    python debug_db.py integrity                # PRAGMA quick_check
+    python debug_db.py integrity --full         # PRAGMA integrity_check (reads every page)
+    python debug_db.py check --tenant acme      # another tenant's shard, or --db path/to/calls.db
+
+`check` and `integrity` exit non-zero when they find a problem.
 """
+import argparse
+import json
 import sqlite3
+import sys
+import time
 from pathlib import Path
 
-DB_PATH = Path("conversation_data/calls.db")
-
-def check_database():
-    """Check database contents and structure"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at: {DB_PATH.absolute()}")
-        return
-    
-    print(f"✅ Database found at: {DB_PATH.absolute()}\n")
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check caller_information table
-    print("=" * 60)
-    print("CALLER_INFORMATION TABLE")
+from src.tenants import TENANTS, DEFAULT_TENANT
+
+# Truthy analysis.structuredData, without parsing metadata that isn't valid JSON
+STRUCTURED_DATA = """
+    CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.analysis.structuredData') END
+"""
+
+# Lookups the app runs on every request or webhook; each should use an index
+INDEXED_QUERIES = {
+    "call by call_id (/db/calls/{id})": "SELECT * FROM calls WHERE call_id = ?",
+    "recent calls (/db/calls)": "SELECT * FROM calls ORDER BY created_at DESC LIMIT 50",
+    "calls of a lead": "SELECT call_id FROM calls WHERE lead_id = ?",
+    "submissions of a call": "SELECT * FROM caller_information WHERE call_id = ? ORDER BY id DESC LIMIT 1",
+    "submissions of a lead": "SELECT id FROM caller_information WHERE lead_id = ?",
+    "leads by market (/db/leads)": "SELECT id FROM caller_information WHERE market = ? ORDER BY id DESC LIMIT 50",
+    "leads by urgency (/db/leads)": "SELECT id FROM caller_information WHERE urgency = ? ORDER BY id DESC LIMIT 50",
+    "unscored leads": "SELECT id FROM caller_information WHERE score IS NULL",
+    "lead by phone": "SELECT id FROM leads WHERE phone = ?",
+}
+
+# JSON text columns
+JSON_COLUMNS = [
+    ("calls", "transcript"),
+    ("calls", "metadata"),
+    ("caller_information", "arguments"),
+    ("caller_information", "raw_payload"),
+    ("leads", "profile"),
+]
+
+
+def open_readonly(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(f"{db_path.absolute().as_uri()}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def scalar(conn: sqlite3.Connection, sql: str, params: tuple = ()):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def heading(title: str):
+    print("\n" + "=" * 60)
+    print(title)
     print("=" * 60)
-    
-    cursor.execute("SELECT COUNT(*) FROM caller_information")
-    count = cursor.fetchone()[0]
-    print(f"Total rows: {count}")
-    
-    if count > 0:
-        cursor.execute("SELECT * FROM caller_information ORDER BY id DESC LIMIT 5")
-        rows = cursor.fetchall()
+
+
+def summary(conn: sqlite3.Connection, show: int):
+    """Row counts, the latest rows and calls carrying structured caller data"""
+    heading("CALLER_INFORMATION TABLE")
+    caller_count = scalar(conn, "SELECT COUNT(*) FROM caller_information")
+    print(f"Total rows: {caller_count:,}")
+
+    if caller_count > 0:
+        rows = conn.execute("SELECT id, call_id, function_name FROM caller_information ORDER BY id DESC LIMIT 5")
         print("\nMost recent entries:")
         for row in rows:
-            print(f"  ID: {row[0]}, Call ID: {row[1]}, Function: {row[5]}")
+            print(f"  ID: {row[0]}, Call ID: {row[1]}, Function: {row[2]}")
     else:
         print("⚠️  No rows found in caller_information table")
-    
-    # Check calls table
-    print("\n" + "=" * 60)
-    print("CALLS TABLE")
-    print("=" * 60)
-    
-    cursor.execute("SELECT COUNT(*) FROM calls")
-    count = cursor.fetchone()[0]
-    print(f"Total rows: {count}")
-    
+
+    heading("CALLS TABLE")
+    count = scalar(conn, "SELECT COUNT(*) FROM calls")
+    print(f"Total rows: {count:,}")
+
     if count > 0:
-        cursor.execute("SELECT call_id, phone_number, call_status, call_duration FROM calls ORDER BY id DESC LIMIT 5")
-        rows = cursor.fetchall()
+        rows = conn.execute("SELECT call_id, phone_number, call_status, call_duration FROM calls ORDER BY id DESC LIMIT 5")
         print("\nMost recent calls:")
         for row in rows:
             print(f"  Call ID: {row[0]}")
@@ -55,41 +94,40 @@ def check_database():
             print(f"    Status: {row[2]}")
             print(f"    Duration: {row[3]}s")
             print()
+
+        print("End reasons:")
+        for reason, calls in conn.execute("""
+            SELECT COALESCE(end_reason, '(none)'), COUNT(*) FROM calls
+            GROUP BY 1 ORDER BY 2 DESC LIMIT 10
+        """):
+            print(f"  {reason}: {calls:,}")
     else:
         print("⚠️  No rows found in calls table")
-    
-    # Check for calls with caller info in analysis
+
+    print(f"\nLeads: {scalar(conn, 'SELECT COUNT(*) FROM leads'):,}")
+
     if count > 0:
-        print("=" * 60)
-        print("CHECKING FOR CALLER INFO IN CALL METADATA")
-        print("=" * 60)
-        
-        cursor.execute("SELECT call_id, metadata FROM calls WHERE metadata IS NOT NULL")
-        rows = cursor.fetchall()
-        
-        import json
-        found_caller_info = False
-        for row in rows:
-            call_id, metadata_json = row
-            try:
-                metadata = json.loads(metadata_json)
-                analysis = metadata.get('analysis', {})
-                if 'structuredData' in analysis and analysis['structuredData']:
-                    print(f"\n✅ Found structured data in call {call_id}:")
-                    print(f"   {json.dumps(analysis['structuredData'], indent=4)}")
-                    found_caller_info = True
-            except json.JSONDecodeError:
-                pass
-        
-        if not found_caller_info:
+        heading("CHECKING FOR CALLER INFO IN CALL METADATA")
+
+        with_data = scalar(conn, f"""
+            SELECT COUNT(*) FROM calls WHERE {STRUCTURED_DATA} NOT IN ('{{}}', '[]', '', 0)
+        """)
+        print(f"Calls with structured data: {with_data:,} of {count:,}")
+
+        if with_data:
+            rows = conn.execute(f"""
+                SELECT call_id, structured FROM (SELECT call_id, id, {STRUCTURED_DATA} AS structured FROM calls)
+                WHERE structured NOT IN ('{{}}', '[]', '', 0)
+                ORDER BY id DESC LIMIT ?
+            """, (show,))
+            for call_id, structured in rows:
+                print(f"\n✅ Found structured data in call {call_id}:")
+                print(f"   {json.dumps(json.loads(structured), indent=4)}")
+        else:
             print("⚠️  No calls have structured data in analysis")
-    
-    conn.close()
-    
-    print("\n" + "=" * 60)
-    print("DIAGNOSIS")
-    print("=" * 60)
-    
+
+    heading("DIAGNOSIS")
+
     if count == 0:
         print("❌ No calls have been recorded yet")
         print("   - Check if the webhook server is running")
@@ -97,11 +135,7 @@ def check_database():
         print("   - Check webhook URL configuration")
     else:
         print("✅ Calls are being recorded")
-        
-        cursor = sqlite3.connect(DB_PATH).cursor()
-        cursor.execute("SELECT COUNT(*) FROM caller_information")
-        caller_count = cursor.fetchone()[0]
-        
+
         if caller_count == 0:
             print("❌ But caller_information is empty")
             print("\nPossible reasons:")
@@ -114,5 +148,145 @@ def check_database():
             print("   - Verify WEBHOOK_URL in .env matches your ngrok/public URL")
 
 
+def report(label: str, found: int, hint: str = "", warn_only: bool = False) -> bool:
+    """Print one check's result; returns whether it failed"""
+    if not found:
+        print(f"✅ {label}: none")
+        return False
+    print(f"{'⚠️ ' if warn_only else '❌'} {label}: {found:,}" + (f"  ({hint})" if hint else ""))
+    return not warn_only
+
+
+def check(conn: sqlite3.Connection) -> bool:
+    """Orphans, duplicates, invalid JSON, rollup drift and index health; returns whether anything failed"""
+    failed = False
+
+    heading("ORPHANS")
+    failed |= report("caller_information rows pointing at a missing lead", scalar(conn, """
+        SELECT COUNT(*) FROM caller_information c
+        WHERE c.lead_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM leads l WHERE l.id = c.lead_id)
+    """))
+    failed |= report("calls pointing at a missing lead", scalar(conn, """
+        SELECT COUNT(*) FROM calls c
+        WHERE c.lead_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM leads l WHERE l.id = c.lead_id)
+    """))
+    report("leads with no calls or submissions", scalar(conn, """
+        SELECT COUNT(*) FROM leads l
+        WHERE NOT EXISTS (SELECT 1 FROM calls c WHERE c.lead_id = l.id)
+          AND NOT EXISTS (SELECT 1 FROM caller_information s WHERE s.lead_id = l.id)
+    """), "left behind by deleted rows", warn_only=True)
+    report("submissions whose end-of-call report never arrived", scalar(conn, """
+        SELECT COUNT(*) FROM caller_information s
+        WHERE NOT EXISTS (SELECT 1 FROM calls c WHERE c.call_id = s.call_id)
+    """), "calls still in progress, or lost reports", warn_only=True)
+    report("rows without a lead", scalar(conn, """
+        SELECT (SELECT COUNT(*) FROM calls WHERE lead_id IS NULL)
+             + (SELECT COUNT(*) FROM caller_information WHERE lead_id IS NULL)
+    """), "no caller phone number", warn_only=True)
+
+    heading("DUPLICATES")
+    failed |= report("tool calls saved more than once", scalar(conn, """
+        SELECT COALESCE(SUM(copies - 1), 0) FROM (
+            SELECT COUNT(*) AS copies FROM caller_information
+            WHERE tool_call_id IS NOT NULL GROUP BY tool_call_id HAVING COUNT(*) > 1
+        )
+    """), "redelivered tool-calls webhooks")
+    report("calls saved under call_id 'unknown'", scalar(conn, """
+        SELECT COUNT(*) FROM calls WHERE call_id = 'unknown'
+    """), "reports without call.id overwrite each other", warn_only=True)
+
+    heading("JSON COLUMNS")
+    for table, column in JSON_COLUMNS:
+        failed |= report(f"{table}.{column} not valid JSON", scalar(conn, f"""
+            SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL AND NOT json_valid({column})
+        """))
+
+    heading("ROLLUPS")
+    counted = scalar(conn, "SELECT COALESCE(SUM(calls), 0) FROM rollup_calls WHERE granularity = 'day'")
+    stored = scalar(conn, "SELECT COUNT(*) FROM calls")
+    failed |= report(f"daily rollups off from calls ({counted:,} counted, {stored:,} stored)",
+                     abs(counted - stored), "python manage_rollups.py rebuild")
+
+    heading("INDEXES")
+    unindexed = 0
+    for label, sql in INDEXED_QUERIES.items():
+        plan = " / ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count("?")))
+        scans = "SCAN" in plan and "USING" not in plan
+        print(f"{'❌' if scans else '✅'} {label}: {plan}")
+        unindexed += scans
+    if unindexed:
+        print("   Missing indexes are created by init_database when the server starts")
+        failed = True
+
+    indexes = scalar(conn, "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'")
+    analyzed = scalar(conn, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    print(f"\n{indexes} indexes; planner statistics {'present' if analyzed else 'missing (run PRAGMA optimize)'}")
+
+    page_size, pages, free = (scalar(conn, f"PRAGMA {name}") for name in ("page_size", "page_count", "freelist_count"))
+    print(f"File: {pages * page_size / 1e6:,.1f} MB, {free / pages:.0%} free pages" if pages else "File: empty")
+    if pages and free / pages > 0.25:
+        print("⚠️  Over a quarter of the file is free pages; VACUUM would shrink it")
+
+    return failed
+
+
+def integrity(conn: sqlite3.Connection, full: bool) -> bool:
+    """PRAGMA quick_check, or integrity_check with --full; returns whether it found problems"""
+    pragma = "integrity_check" if full else "quick_check"
+    heading(f"PRAGMA {pragma}")
+    problems = [row[0] for row in conn.execute(f"PRAGMA {pragma}(100)")]
+    if problems == ["ok"]:
+        print("✅ ok")
+        return False
+    for problem in problems:
+        print(f"❌ {problem}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the calls database")
+    parser.add_argument("--db", type=Path, help="Database file (default: the tenant's)")
+    parser.add_argument("--tenant", help="Tenant whose shard to inspect (see TENANTS_FILE)")
+    commands = parser.add_subparsers(dest="command")
+
+    overview = commands.add_parser("summary", help="Row counts, recent rows and structured data (default)")
+    overview.add_argument("--show", type=int, default=5, help="Calls with structured data to print")
+    commands.add_parser("check", help="Orphans, duplicates, invalid JSON, rollups and index health")
+    full_check = commands.add_parser("integrity", help="PRAGMA quick_check")
+    full_check.add_argument("--full", action="store_true", help="PRAGMA integrity_check instead")
+    args = parser.parse_args()
+
+    tenant = TENANTS.get(args.tenant) if args.tenant else DEFAULT_TENANT
+    if not tenant:
+        parser.error(f"Unknown tenant {args.tenant}")
+    db_path = args.db or tenant.db_path
+
+    if not db_path.exists():
+        print(f"❌ Database not found at: {db_path.absolute()}")
+        sys.exit(1)
+
+    print(f"✅ Database found at: {db_path.absolute()}")
+
+    start = time.perf_counter()
+    conn = open_readonly(db_path)
+    try:
+        if args.command == "check":
+            failed = check(conn)
+        elif args.command == "integrity":
+            failed = integrity(conn, args.full)
+        else:
+            summary(conn, getattr(args, "show", 5))
+            failed = False
+    except sqlite3.OperationalError as e:
+        # Databases older than the current schema are migrated when the server starts
+        print(f"❌ {e}")
+        failed = True
+    finally:
+        conn.close()
+
+    print(f"\nDone in {time.perf_counter() - start:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
 if __name__ == "__main__":
-    check_database()
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Bulk import historical calls into SQLite
+
+Streams the ConversationData records in all_calls.jsonl and/or call_*.json
+into the `calls` and `caller_information` tables in large transactions.
+Rows are deduplicated on call_id, so re-running (or overlapping sources) is
+safe. Progress is checkpointed after every batch and picked up on the next run.
+
+    python import_history.py
+    python import_history.py --source files --batch-size 20000
+    python import_history.py --reset-checkpoint
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src import jsoncodec
+from src.archive import iter_jsonl_from, iter_conversation_files, parse_timestamp
+from src.normalize import phone_number_text
+from src.database import connect, init_database, update_rollups, link_leads, lead_column_values, bump_versions, LEAD_COLUMNS
+
+CHECKPOINT_FILE = "import_checkpoint.json"
+
+INSERT_CALL = """
+    INSERT OR IGNORE INTO calls (
+        call_id, assistant_id, call_duration, call_status,
+        recording_url, summary, success_evaluation,
+        phone_number, started_at, ended_at, end_reason, cost,
+        transcript, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Only the first submission per call is imported; live ingest may already have one
+INSERT_CALLER_INFO = f"""
+    INSERT INTO caller_information (
+        call_id, timestamp, type, tool_call_id,
+        function_name, arguments, raw_payload,
+        {", ".join(LEAD_COLUMNS)}
+    )
+    SELECT ?, ?, ?, NULL, 'submit_caller_information', ?, NULL, {", ".join("?" * len(LEAD_COLUMNS))}
+    WHERE NOT EXISTS (SELECT 1 FROM caller_information WHERE call_id = ?)
+"""
+
+
+def call_row(record: Dict[str, Any]) -> tuple:
+    """Column values for `calls`, matching save_call_data"""
+    metadata = record.get("metadata") or {}
+    return (
+        record.get("call_id"),
+        record.get("assistant_id"),
+        record.get("call_duration"),
+        record.get("call_status"),
+        record.get("recording_url"),
+        record.get("summary"),
+        record.get("success_evaluation"),
+        phone_number_text(metadata.get("phone_number")),
+        metadata.get("started_at"),
+        metadata.get("ended_at"),
+        metadata.get("end_reason"),
+        metadata.get("cost"),
+        jsoncodec.dumps(record.get("transcript") or []),
+        jsoncodec.dumps(metadata),
+    )
+
+
+def caller_info_row(record: Dict[str, Any]) -> Optional[tuple]:
+    """Column values for `caller_information`, or None if the call collected nothing"""
+    caller_info = record.get("caller_info")
+    if not caller_info:
+        return None
+
+    metadata = record.get("metadata") or {}
+    submitted = parse_timestamp(metadata.get("ended_at")) or parse_timestamp(record.get("timestamp"))
+    arguments = {k: v for k, v in caller_info.items() if v is not None}
+    return (
+        record["call_id"],
+        int(submitted * 1000) if submitted else None,
+        "end-of-call-report",
+        jsoncodec.dumps(arguments),
+        *lead_column_values(arguments),
+        record["call_id"],
+    )
+
+
+class Checkpoint:
+    """Resume position per source, persisted next to the data"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.state: Dict[str, Any] = json.loads(path.read_text()) if path.exists() else {}
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2))
+        os.replace(tmp, self.path)
+
+
+def jsonl_records(data_dir: Path, checkpoint: Checkpoint) -> Iterator[tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(record, checkpoint update) pairs from all_calls.jsonl"""
+    log_file = data_dir / "all_calls.jsonl"
+    if not log_file.exists():
+        return
+
+    state = checkpoint.state.get("jsonl", {})
+    offset = state.get("offset", 0)
+    # The log was truncated or replaced since the checkpoint; start over
+    if offset > log_file.stat().st_size:
+        offset = 0
+
+    for end_offset, record in iter_jsonl_from(log_file, offset):
+        yield record, {"jsonl": {"offset": end_offset}}
+
+
+def file_records(data_dir: Path, checkpoint: Checkpoint) -> Iterator[tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(record, checkpoint update) pairs from call_*.json files"""
+    after = checkpoint.state.get("files", {}).get("last")
+    for name, record in iter_conversation_files(data_dir, after=after):
+        yield record, {"files": {"last": name}}
+
+
+def import_records(records, checkpoint: Checkpoint, batch_size: int) -> Dict[str, int]:
+    conn = connect()
+    # Bigger page cache for the bulk load; WAL and the busy timeout come from connect()
+    conn.execute("PRAGMA cache_size=-65536")
+
+    totals = {"records": 0, "calls": 0, "caller_information": 0, "skipped": 0}
+    start = time.perf_counter()
+    calls, infos = [], []
+    position: Dict[str, Any] = {}
+
+    def flush():
+        if not calls and not position:
+            return
+        with conn:
+            # Taken under the write lock so only this batch's rows are added to the rollups and leads
+            conn.execute("BEGIN IMMEDIATE")
+            last_call_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM calls").fetchone()[0]
+            last_info_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM caller_information").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(INSERT_CALL, calls)
+            inserted_calls = conn.total_changes - before
+            conn.executemany(INSERT_CALLER_INFO, infos)
+            info_changes = conn.total_changes - before - inserted_calls
+            update_rollups(conn, "id > ?", (last_call_id,))
+            link_leads(conn, "calls", "id > ?", (last_call_id,))
+            link_leads(conn, "caller_information", "id > ?", (last_info_id,))
+            bump_versions(conn, "calls", "leads")
+        totals["calls"] += inserted_calls
+        totals["caller_information"] += info_changes
+
+        # Only advance once the batch is durable; a crash re-imports at most one batch, which dedup absorbs
+        checkpoint.state.update(position)
+        checkpoint.save()
+        calls.clear()
+        infos.clear()
+
+        elapsed = time.perf_counter() - start
+        print(f"  {totals['records']:,} records, {totals['calls']:,} new calls, "
+              f"{totals['caller_information']:,} new caller rows ({totals['records'] / elapsed:,.0f} records/s)")
+
+    try:
+        for record, update in records:
+            position.update(update)
+            totals["records"] += 1
+            if not record.get("call_id"):
+                totals["skipped"] += 1
+                continue
+
+            calls.append(call_row(record))
+            info = caller_info_row(record)
+            if info:
+                infos.append(info)
+
+            if len(calls) >= batch_size:
+                flush()
+        flush()
+    finally:
+        conn.close()
+
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import all_calls.jsonl and call_*.json into SQLite")
+    parser.add_argument("--data-dir", type=Path, default=Path(os.getenv("DATA_DIR", "conversation_data")))
+    parser.add_argument("--source", action="append", choices=("jsonl", "files"),
+                        help="Which files to import; repeatable (default: both)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Records per transaction")
+    parser.add_argument("--reset-checkpoint", action="store_true", help="Ignore previous progress and start over")
+    args = parser.parse_args()
+
+    init_database()
+    checkpoint = Checkpoint(args.data_dir / CHECKPOINT_FILE)
+    if args.reset_checkpoint:
+        checkpoint.state = {}
+
+    for source in args.source or ["jsonl", "files"]:
+        print("=" * 60)
+        print(f"Importing {source} from {args.data_dir.absolute()}")
+        print("=" * 60)
+        records = jsonl_records(args.data_dir, checkpoint) if source == "jsonl" else file_records(args.data_dir, checkpoint)
+        totals = import_records(records, checkpoint, args.batch_size)
+        rate = totals["records"] / totals["seconds"] if totals["seconds"] else 0
+        print(f"Done: {totals['records']:,} records in {totals['seconds']:.1f}s ({rate:,.0f} records/s)")
+        print(f"  New calls: {totals['calls']:,}")
+        print(f"  New caller_information rows: {totals['caller_information']:,}")
+        if totals["skipped"]:
+            print(f"  Skipped (no call_id): {totals['skipped']:,}")
+
+
+if __name__ == "__main__":
+    main()
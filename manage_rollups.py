@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Maintain the hourly/daily rollup tables behind /db/timeseries
+
+Rollups are updated on every saved call, so this is only needed after
+changing `calls` by other means, or to keep the hourly tables small.
+
+    python manage_rollups.py rebuild                    # recompute everything from `calls`
+    python manage_rollups.py rebuild --since 2025-06-01
+    python manage_rollups.py compact --hourly-retention-days 30
+"""
+import argparse
+
+from src.config import ROLLUP_HOURLY_RETENTION_DAYS
+from src.database import init_database, rebuild_rollups, compact_rollups
+from src.export import parse_time_bound
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or compact call rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild", help="Recompute rollups from the calls table")
+    rebuild.add_argument("--since", help="First day to recompute (ISO date); earlier buckets are left alone")
+
+    compact = commands.add_parser("compact", help="Drop empty rows and old hourly buckets")
+    compact.add_argument("--hourly-retention-days", type=int, default=ROLLUP_HOURLY_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    init_database()
+
+    if args.command == "rebuild":
+        counted = rebuild_rollups(parse_time_bound(args.since))
+        print(f"Rebuilt rollups from {counted:,} calls" + (f" since {args.since}" if args.since else ""))
+    else:
+        removed = compact_rollups(args.hourly_retention_days)
+        print(f"Removed {removed['empty_buckets'] + removed['empty_counts']:,} empty rows")
+        print(f"Removed {removed['hourly_buckets'] + removed['hourly_counts']:,} hourly rows "
+              f"older than {args.hourly_retention_days} days")
+
+
+if __name__ == "__main__":
+    main()
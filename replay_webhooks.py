@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Replay recorded webhook deliveries into the ingest pipeline
+
+Sources are the tool-calls messages kept in caller_information.raw_payload
+and the end-of-call reports rebuilt from all_calls.jsonl / call_*.json.
+Deliveries are merged in time order and sent either in-process (into a
+separate target DATA_DIR) or over HTTP to a running server.
+
+    python replay_webhooks.py --speed 0 --concurrency 32
+    python replay_webhooks.py --url http://localhost:8000/webhook --speed 10
+    python replay_webhooks.py --source files --target-data-dir /tmp/backfill
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.archive import (
+    ArchivedDelivery,
+    conversation_to_payload,
+    iter_file_deliveries,
+    iter_jsonl,
+    iter_jsonl_deliveries,
+    iter_tool_call_deliveries,
+)
+
+SOURCES = ("db", "jsonl", "files")
+
+
+def fingerprint(value: Any) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_deliveries(data_dir: Path, db_path: Path, sources: list[str], types: Optional[set[str]],
+                    limit: Optional[int]) -> Iterator[ArchivedDelivery]:
+    """Merge the selected sources by timestamp without loading them into memory"""
+    streams = []
+    if "db" in sources:
+        streams.append(iter_tool_call_deliveries(db_path))
+    if "jsonl" in sources:
+        streams.append(iter_jsonl_deliveries(data_dir))
+    if "files" in sources:
+        streams.append(iter_file_deliveries(data_dir))
+
+    count = 0
+    for delivery in heapq.merge(*streams, key=lambda d: d.timestamp):
+        if types and delivery.message_type not in types:
+            continue
+        yield delivery
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+class Replayer:
+    """Paces deliveries by their recorded timestamps and tracks outcomes"""
+
+    def __init__(self, send, concurrency: int, speed: float):
+        self.send = send
+        self.concurrency = concurrency
+        self.speed = speed
+        self.sent = Counter()
+        self.errors = Counter()
+        self.latencies: list[float] = []
+        # call_id -> fingerprints of what we delivered, checked against the target afterwards
+        self.expected: Dict[str, Dict[str, set[str]]] = {"end-of-call-report": defaultdict(set), "tool-calls": defaultdict(set)}
+
+    async def run(self, deliveries: Iterator[ArchivedDelivery]) -> float:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        first_recorded = None
+        start = time.perf_counter()
+
+        for delivery in deliveries:
+            if self.speed > 0:
+                if first_recorded is None:
+                    first_recorded = delivery.timestamp
+                delay = (delivery.timestamp - first_recorded) / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await semaphore.acquire()
+            task = asyncio.create_task(self._deliver(delivery, semaphore))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+    async def _deliver(self, delivery: ArchivedDelivery, semaphore: asyncio.Semaphore):
+        try:
+            body = json.dumps(delivery.payload).encode()
+            started = time.perf_counter()
+            status, result = await self.send(body)
+            self.latencies.append((time.perf_counter() - started) * 1000)
+
+            self.sent[delivery.message_type] += 1
+            if status != 200 or (isinstance(result, dict) and result.get("status") == "error"):
+                self.errors[delivery.message_type] += 1
+
+            if delivery.message_type == "end-of-call-report":
+                self.expected["end-of-call-report"][delivery.call_id].add(fingerprint(delivery.payload))
+            elif delivery.message_type in ("tool-calls", "function-call"):
+                self.expected["tool-calls"][delivery.call_id].add(fingerprint(delivery.payload["message"]))
+        except Exception as e:
+            self.errors[delivery.message_type] += 1
+            print(f"Failed to replay {delivery.message_type} for {delivery.call_id}: {str(e)}")
+        finally:
+            semaphore.release()
+
+
+def find_divergence(replayer: Replayer, target_data_dir: Path) -> list[str]:
+    """Call IDs whose stored results don't match what was replayed"""
+    diverged = []
+
+    stored = defaultdict(set)
+    log_file = target_data_dir / "all_calls.jsonl"
+    if log_file.exists():
+        for record in iter_jsonl(log_file):
+            stored[record.get("call_id")].add(fingerprint(conversation_to_payload(record)))
+    for call_id, expected in replayer.expected["end-of-call-report"].items():
+        if not expected <= stored.get(call_id, set()):
+            diverged.append(call_id)
+
+    stored = defaultdict(set)
+    db_path = target_data_dir / "calls.db"
+    if db_path.exists():
+        conn = sqlite3.connect(db_path)
+        for call_id, raw_payload in conn.execute("SELECT call_id, raw_payload FROM caller_information WHERE raw_payload IS NOT NULL"):
+            stored[call_id].add(fingerprint(json.loads(raw_payload)))
+        conn.close()
+    for call_id, expected in replayer.expected["tool-calls"].items():
+        if not expected <= stored.get(call_id, set()):
+            diverged.append(call_id)
+
+    return diverged
+
+
+async def replay_inprocess(deliveries, target_data_dir: Path, concurrency: int, speed: float, quiet: bool) -> tuple[Replayer, float]:
+    # The app reads its storage locations at import time
+    os.environ["DATA_DIR"] = str(target_data_dir)
+    os.environ.pop("DB_PATH", None)
+
+    import httpx
+    from app import app
+
+    # Handler logging (including background Sheets tasks drained on shutdown) is silenced unless asked for
+    with open(os.devnull, "w") as devnull, (contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+                async def send(body: bytes):
+                    response = await client.post("/webhook", content=body, headers={"Content-Type": "application/json"})
+                    return response.status_code, response.json()
+
+                replayer = Replayer(send, concurrency, speed)
+                wall = await replayer.run(deliveries)
+    return replayer, wall
+
+
+async def replay_http(deliveries, url: str, concurrency: int, speed: float) -> tuple[Replayer, float]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def send(body: bytes):
+            response = await client.post(url, content=body, headers={"Content-Type": "application/json"})
+            try:
+                return response.status_code, response.json()
+            except ValueError:
+                return response.status_code, None
+
+        replayer = Replayer(send, concurrency, speed)
+        wall = await replayer.run(deliveries)
+    return replayer, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Vapi webhook deliveries")
+    parser.add_argument("--data-dir", type=Path, default=Path(os.getenv("DATA_DIR", "conversation_data")),
+                        help="Directory holding the recorded calls (default: DATA_DIR)")
+    parser.add_argument("--db", type=Path, help="Database holding raw tool-calls payloads (default: <data-dir>/calls.db)")
+    parser.add_argument("--source", action="append", choices=SOURCES,
+                        help="Where to read deliveries from; repeatable (default: db and jsonl)")
+    parser.add_argument("--type", action="append", dest="types", help="Only replay these message types")
+    parser.add_argument("--limit", type=int, help="Stop after this many deliveries")
+    parser.add_argument("--url", help="Send over HTTP to this webhook URL instead of in-process")
+    parser.add_argument("--target-data-dir", type=Path,
+                        help="Where in-process replays write (default: a new temp dir); with --url, the server's DATA_DIR to check for divergence")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Speed-up over recorded timing (10 = ten times faster); 0 sends as fast as possible")
+    parser.add_argument("--with-sinks", action="store_true", help="Keep Google Sheets delivery enabled during the replay")
+    parser.add_argument("--verbose", action="store_true", help="Show handler output for in-process replays")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+    db_path = args.db or data_dir / "calls.db"
+    sources = args.source or ["db", "jsonl"]
+    deliveries = load_deliveries(data_dir, db_path, sources, set(args.types) if args.types else None, args.limit)
+
+    if not args.with_sinks:
+        os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+
+    print("=" * 60)
+    print("WEBHOOK REPLAY")
+    print("=" * 60)
+    print(f"Sources: {', '.join(sources)} from {data_dir.absolute()}")
+
+    target_data_dir = args.target_data_dir
+    if args.url:
+        print(f"Target: {args.url}")
+        replayer, wall = asyncio.run(replay_http(deliveries, args.url, args.concurrency, args.speed))
+    else:
+        target_data_dir = target_data_dir or Path(tempfile.mkdtemp(prefix="realflow_replay_"))
+        if target_data_dir.resolve() == data_dir.resolve():
+            print("Refusing to replay into the source data directory; pass a different --target-data-dir")
+            sys.exit(1)
+        print(f"Target: in-process, writing to {target_data_dir.absolute()}")
+        replayer, wall = asyncio.run(replay_inprocess(deliveries, target_data_dir, args.concurrency, args.speed, not args.verbose))
+
+    total = sum(replayer.sent.values())
+    latencies = sorted(replayer.latencies)
+    print(f"\nDelivered: {total} in {wall:.2f}s ({total / wall if wall else 0:.1f} deliveries/s)")
+    for message_type, count in sorted(replayer.sent.items()):
+        print(f"  {message_type}: {count} sent, {replayer.errors[message_type]} errors")
+    if latencies:
+        print(f"Latency: p50 {latencies[len(latencies) // 2]:.2f}ms, p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms, max {latencies[-1]:.2f}ms")
+
+    if target_data_dir:
+        diverged = find_divergence(replayer, target_data_dir)
+        print(f"Divergent calls: {len(diverged)}")
+        for call_id in diverged[:10]:
+            print(f"  {call_id}")
+        if len(diverged) > 10:
+            print(f"  ... and {len(diverged) - 10} more")
+    else:
+        print("Divergence not checked (pass --target-data-dir with the server's DATA_DIR)")
+
+    if sum(replayer.errors.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Score leads in bulk for /db/leads/top
+
+New leads are scored in the background as they arrive; run this after
+changing the weights, or to score a database that predates scoring.
+
+    python score_leads.py                       # leads never scored or scored with other weights
+    python score_leads.py --weights weights.json
+    python score_leads.py --all
+"""
+import argparse
+import json
+import time
+
+from src.database import init_database
+from src.scoring import load_weights, score_leads, weights_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute lead priority scores")
+    parser.add_argument("--weights", help="JSON file overriding the default weights (default: LEAD_SCORE_WEIGHTS_FILE)")
+    parser.add_argument("--all", action="store_true", help="Rescore every lead, not just unscored or stale ones")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--show-weights", action="store_true", help="Print the effective weights and exit")
+    args = parser.parse_args()
+
+    weights = load_weights(args.weights)
+    if args.show_weights:
+        print(json.dumps(weights, indent=2))
+        return
+
+    init_database()
+    start = time.perf_counter()
+    scored = score_leads(weights, scope="all" if args.all else "stale", batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {scored:,} leads in {elapsed:.2f}s with weights {weights_version(weights)}")
+
+
+if __name__ == "__main__":
+    main()
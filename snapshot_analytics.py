@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Write day-partitioned Parquet snapshots for analytics
+
+Appends partitions for every complete day since the last run, so it can be
+scheduled (e.g. hourly or nightly from cron) without re-reading old data.
+Every tenant is snapshotted into its own data directory unless --tenant
+picks some.
+
+    python snapshot_analytics.py
+    python snapshot_analytics.py --table calls --through 2025-06-30
+    python snapshot_analytics.py --tenant acme --rebuild-from 2025-06-01   # rewrite after a backfill
+"""
+import argparse
+import time
+from datetime import date
+from pathlib import Path
+
+from src.snapshots import TABLES, snapshot_tenants, tenant_analytics_dir
+from src.tenants import TENANTS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append day-partitioned Parquet snapshots of calls and caller information")
+    parser.add_argument("--table", action="append", choices=list(TABLES), help="Table to snapshot; repeatable (default: all)")
+    parser.add_argument("--tenant", action="append", help="Tenant to snapshot; repeatable (default: all)")
+    parser.add_argument("--output-dir", type=Path,
+                        help="Write each tenant under OUTPUT_DIR/<tenant> (default: the tenant's data directory/analytics)")
+    parser.add_argument("--through", type=date.fromisoformat, help="Last day to include (default: yesterday, UTC)")
+    parser.add_argument("--rebuild-from", type=date.fromisoformat,
+                        help="Rewrite partitions from this day on, e.g. after importing history")
+    args = parser.parse_args()
+
+    tenants = None
+    if args.tenant:
+        tenants = [TENANTS.get(name) for name in args.tenant]
+        unknown = [name for name, tenant in zip(args.tenant, tenants) if tenant is None]
+        if unknown:
+            parser.error(f"unknown tenant(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    written = snapshot_tenants(args.table, tenants, args.output_dir, args.through, args.rebuild_from)
+
+    print("=" * 60)
+    print("ANALYTICS SNAPSHOT")
+    print("=" * 60)
+    for name, tables in written.items():
+        print(f"[{name}] -> {tenant_analytics_dir(TENANTS.get(name), args.output_dir).absolute()}")
+        for table, days in tables.items():
+            if not days:
+                print(f"{table}: up to date")
+                continue
+            print(f"{table}: {len(days)} partition(s), {sum(days.values()):,} rows")
+            for day, rows in days.items():
+                print(f"  date={day}: {rows:,} rows")
+    print(f"\nFinished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
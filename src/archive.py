@@ -0,0 +1,181 @@
+"""
+Streaming readers for stored call history
+
+Two sources hold recorded deliveries:
+- `caller_information.raw_payload` in SQLite: the original tool-calls message
+- `all_calls.jsonl` and `call_*.json` under DATA_DIR: ConversationData dumps
+  written by save_conversation_data for every end-of-call report
+
+Everything here is a generator so callers can walk millions of records in
+bounded memory.
+"""
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from . import jsoncodec
+
+
+class ArchivedDelivery(NamedTuple):
+    """One recorded webhook delivery, rebuilt as a Vapi payload"""
+    timestamp: float  # seconds since epoch, used to order and pace replays
+    message_type: str
+    call_id: str
+    payload: Dict[str, Any]
+    source: str
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Seconds since epoch from a Vapi millisecond timestamp or an ISO string"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Records from a JSON Lines file, skipping blank or corrupt lines"""
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield jsoncodec.loads(line)
+            except jsoncodec.JSONDecodeError:
+                print(f"Skipping corrupt line {line_number} in {path}")
+
+
+def iter_jsonl_from(path: Path, offset: int = 0) -> Iterator[tuple[int, Dict[str, Any]]]:
+    """(offset after the line, record) pairs starting at a byte offset, for resumable reads"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield offset, jsoncodec.loads(line)
+            except jsoncodec.JSONDecodeError:
+                print(f"Skipping corrupt line ending at byte {offset} in {path}")
+
+
+def conversation_file_key(name: str) -> str:
+    """Sort key for call_<call_id>_<YYYYmmdd>_<HHMMSS>.json names: the save time, then the name"""
+    stem = name[:-len(".json")]
+    # Call IDs may contain underscores, so take the last two fields
+    return "_".join(stem.rsplit("_", 2)[-2:]) + "|" + name
+
+
+def conversation_file_names(data_dir: Path) -> list[str]:
+    """Per-call JSON file names, oldest first; names only, to stay light on large directories"""
+    with os.scandir(data_dir) as entries:
+        names = [entry.name for entry in entries if entry.name.startswith("call_") and entry.name.endswith(".json")]
+    names.sort(key=conversation_file_key)
+    return names
+
+
+def iter_conversation_files(data_dir: Path, after: Optional[str] = None) -> Iterator[tuple[str, Dict[str, Any]]]:
+    """(file name, record) pairs, oldest first, optionally resuming after a file name"""
+    resume_key = conversation_file_key(after) if after else None
+    for name in conversation_file_names(data_dir):
+        if resume_key and conversation_file_key(name) <= resume_key:
+            continue
+        try:
+            with open(data_dir / name, "rb") as f:
+                yield name, jsoncodec.loads(f.read())
+        except (OSError, jsoncodec.JSONDecodeError) as e:
+            print(f"Skipping unreadable {name}: {str(e)}")
+
+
+def conversation_to_payload(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the end-of-call-report delivery a ConversationData dump came from"""
+    metadata = record.get("metadata") or {}
+
+    analysis = metadata.get("analysis")
+    if not isinstance(analysis, dict):
+        analysis = {}
+        if record.get("summary") is not None:
+            analysis["summary"] = record["summary"]
+        if record.get("success_evaluation") is not None:
+            analysis["successEvaluation"] = record["success_evaluation"]
+        if record.get("caller_info"):
+            analysis["structuredData"] = record["caller_info"]
+
+    call = {
+        "id": record.get("call_id"),
+        "assistantId": record.get("assistant_id"),
+        "duration": record.get("call_duration"),
+        "status": record.get("call_status"),
+        "phoneNumber": metadata.get("phone_number"),
+        "startedAt": metadata.get("started_at"),
+        "endedAt": metadata.get("ended_at"),
+    }
+
+    return {
+        "message": {
+            "type": "end-of-call-report",
+            "call": {k: v for k, v in call.items() if v is not None},
+            "recordingUrl": record.get("recording_url"),
+            "endedReason": metadata.get("end_reason"),
+            "cost": metadata.get("cost"),
+            "analysis": analysis,
+            "transcript": record.get("transcript") or [],
+        }
+    }
+
+
+def _conversation_delivery(record: Dict[str, Any], source: str) -> ArchivedDelivery:
+    metadata = record.get("metadata") or {}
+    timestamp = parse_timestamp(metadata.get("ended_at")) or parse_timestamp(record.get("timestamp")) or 0.0
+    return ArchivedDelivery(timestamp, "end-of-call-report", record.get("call_id") or "unknown",
+                            conversation_to_payload(record), source)
+
+
+def iter_jsonl_deliveries(data_dir: Path) -> Iterator[ArchivedDelivery]:
+    log_file = data_dir / "all_calls.jsonl"
+    if log_file.exists():
+        for record in iter_jsonl(log_file):
+            yield _conversation_delivery(record, "jsonl")
+
+
+def iter_file_deliveries(data_dir: Path) -> Iterator[ArchivedDelivery]:
+    for _, record in iter_conversation_files(data_dir):
+        yield _conversation_delivery(record, "files")
+
+
+def iter_tool_call_deliveries(db_path: Path, batch_size: int = 1000) -> Iterator[ArchivedDelivery]:
+    """tool-calls messages kept in caller_information.raw_payload, oldest first"""
+    if not db_path.exists():
+        return
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute("""
+            SELECT call_id, timestamp, raw_payload FROM caller_information
+            WHERE raw_payload IS NOT NULL
+            ORDER BY timestamp, id
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for call_id, timestamp, raw_payload in rows:
+                try:
+                    message = jsoncodec.loads(raw_payload)
+                except jsoncodec.JSONDecodeError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                message.setdefault("type", "tool-calls")
+                yield ArchivedDelivery(parse_timestamp(timestamp) or 0.0, message["type"], call_id or "unknown",
+                                       {"message": message}, "db")
+    finally:
+        conn.close()
@@ -0,0 +1,167 @@
+"""
+Declarative assistant provisioning
+
+Each brokerage has a JSON spec in ASSISTANT_SPECS_DIR, named for the
+brokerage (assistants/acme-realty.json):
+
+    {"brokerage_name": "Acme Realty", "overrides": {"voice": {"voice_id": "..."}}}
+
+A spec renders through build_assistant_config(), with `overrides` merged
+on top. The hash of the result is stored in the assistant's metadata next
+to the spec name, so sync() can match the assistants Vapi already has to
+their specs and only create or update those whose hash differs.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from .assistant_config import build_assistant_config
+
+SYNC_CONCURRENCY = 8
+
+
+def load_specs(directory: Path) -> Dict[str, Dict[str, Any]]:
+    """Spec name (file stem) -> spec, for every *.json in `directory`"""
+    specs = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        spec = json.loads(path.read_text())
+        if not spec.get("brokerage_name"):
+            raise ValueError(f"{path}: brokerage_name is required")
+        specs[path.stem] = spec
+    return specs
+
+
+def _merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """`overrides` on top of `base`; nested dicts merge, anything else replaces"""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+def render_spec(name: str, spec: Dict[str, Any], webhook_url: Optional[str] = None,
+                webhook_secret: Optional[str] = None) -> Dict[str, Any]:
+    """SDK config for a spec, tagged with the spec name and its hash"""
+    config = build_assistant_config(spec["brokerage_name"], webhook_url, webhook_secret)
+    config = _merge(config, spec.get("overrides") or {})
+    # None means "not set"; sending it on update would clear the field
+    config = {key: value for key, value in config.items() if value is not None}
+    config["metadata"] = {**config.get("metadata", {}), "spec": name}
+    config["metadata"]["config_hash"] = config_hash(config)
+    return config
+
+
+def plan_sync(assistants: List[Any], configs: Dict[str, Dict[str, Any]]) -> List[tuple]:
+    """
+    (action, spec name, assistant ID, config) for every spec
+
+    action is "create", "update" or "unchanged". Of several assistants for
+    the same spec, the one already at the spec's hash is kept, else the first.
+    """
+    existing: Dict[str, List[Any]] = {}
+    for assistant in assistants:
+        spec = (getattr(assistant, "metadata", None) or {}).get("spec")
+        if spec:
+            existing.setdefault(spec, []).append(assistant)
+
+    plan = []
+    for name, config in configs.items():
+        matches = existing.get(name, [])
+        if len(matches) > 1:
+            print(f"Warning: {len(matches)} assistants for spec {name}: {', '.join(a.id for a in matches)}")
+        wanted = config["metadata"]["config_hash"]
+        current = next((a for a in matches if a.metadata.get("config_hash") == wanted), None)
+        if current:
+            plan.append(("unchanged", name, current.id, config))
+        elif matches:
+            plan.append(("update", name, matches[0].id, config))
+        else:
+            plan.append(("create", name, None, config))
+    return plan
+
+
+def sync_assistants(client: Any, specs: Dict[str, Dict[str, Any]], webhook_url: Optional[str] = None,
+                    webhook_secret: Optional[str] = None, concurrency: int = SYNC_CONCURRENCY,
+                    dry_run: bool = False) -> List[Dict[str, Any]]:
+    """
+    Bring Vapi's assistants in line with `specs`
+
+    Returns one result per spec: {"spec", "action", "assistant_id", "error"}.
+    At most `concurrency` Vapi requests are in flight at once.
+    """
+    configs = {name: render_spec(name, spec, webhook_url, webhook_secret) for name, spec in specs.items()}
+    plan = plan_sync(client.assistants.list(limit=1000), configs)
+
+    def apply(step: tuple) -> Dict[str, Any]:
+        action, name, assistant_id, config = step
+        result = {"spec": name, "action": action, "assistant_id": assistant_id, "error": None}
+        if dry_run or action == "unchanged":
+            return result
+        try:
+            if action == "create":
+                result["assistant_id"] = client.assistants.create(**config).id
+            else:
+                client.assistants.update(assistant_id, **config)
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(apply, plan))
+
+
+class MockVapiClient:
+    """
+    Stand-in for vapi.Vapi with an in-memory assistants API
+
+    Each request sleeps `latency` seconds. `calls` counts requests by
+    method, and `max_in_flight` is the most that ran at once.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.assistants = self
+        self.calls: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._stored: Dict[str, SimpleNamespace] = {}
+        self._lock = threading.Lock()
+
+    def _request(self, method: str):
+        with self._lock:
+            self.calls[method] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+    def list(self, limit: Optional[float] = None) -> List[SimpleNamespace]:
+        self._request("list")
+        return list(self._stored.values())[:int(limit or 100)]
+
+    def create(self, **config) -> SimpleNamespace:
+        self._request("create")
+        assistant = SimpleNamespace(id=str(uuid.uuid4()), **config)
+        self._stored[assistant.id] = assistant
+        return assistant
+
+    def update(self, id: str, **config) -> SimpleNamespace:
+        self._request("update")
+        assistant = self._stored[id]
+        vars(assistant).update(config)
+        return assistant
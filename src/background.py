@@ -0,0 +1,57 @@
+"""
+Tracked background tasks
+
+Work that does not need to finish before we answer Vapi (e.g. Google Sheets
+delivery) is spawned here, so shutdown can wait for it instead of dropping it.
+"""
+import asyncio
+from typing import Coroutine, Optional
+
+from .metrics import REGISTRY
+from .tracing import detach_span, start_span, bind_call_id
+
+_pending: set[asyncio.Task] = set()
+
+BACKGROUND_PENDING = REGISTRY.gauge(
+    "realflow_background_tasks_pending",
+    "Background tasks (e.g. Sheets deliveries) not yet finished",
+)
+BACKGROUND_PENDING.set_function(lambda: len(_pending))
+
+
+async def _run(name: str, coro: Coroutine, call_id: Optional[str]):
+    # The request span has usually been exported by the time this runs,
+    # so start a fresh trace (same trace ID via the call ID)
+    detach_span()
+    with start_span(f"background.{name}"):
+        bind_call_id(call_id)
+        try:
+            return await coro
+        except Exception as e:
+            print(f"Background task {name} failed: {str(e)}")
+
+
+def spawn(name: str, coro: Coroutine, call_id: Optional[str] = None) -> asyncio.Task:
+    """Run `coro` after the response is sent, tracked until it finishes"""
+    task = asyncio.create_task(_run(name, coro, call_id), name=name)
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return task
+
+
+def pending_count() -> int:
+    return len(_pending)
+
+
+async def drain(timeout: float) -> int:
+    """Wait up to `timeout` seconds for pending tasks; returns how many were abandoned"""
+    if not _pending:
+        return 0
+
+    print(f"Draining {len(_pending)} background task(s)...")
+    done, not_done = await asyncio.wait(set(_pending), timeout=timeout)
+    for task in not_done:
+        task.cancel()
+    if not_done:
+        print(f"Abandoned {len(not_done)} background task(s) after {timeout}s")
+    return len(not_done)
@@ -13,15 +13,84 @@ PORT = int(os.getenv("PORT", 8000))
 HOST = "0.0.0.0"
 LOG_LEVEL = "info"
 
+# Production Server (python app.py --production, or SERVER_MODE=production)
+SERVER_MODE = os.getenv("SERVER_MODE", "development")
+# One per CPU unless asked for; state that must agree across workers lives in STATE_DB_PATH and PROMETHEUS_MULTIPROC_DIR
+WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", 5))
+BACKLOG = int(os.getenv("BACKLOG", 2048))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30))
+
 # Security
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "your-webhook-secret-key")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+# Webhook bodies over this many bytes get a 413; bodies over WEBHOOK_STREAM_PARSE_BYTES are spooled
+# to disk and, with ijson installed, parsed incrementally (see src/webhook_body.py)
+WEBHOOK_MAX_BODY_BYTES = int(os.getenv("WEBHOOK_MAX_BODY_BYTES", 32 * 1024 * 1024))
+WEBHOOK_STREAM_PARSE_BYTES = int(os.getenv("WEBHOOK_STREAM_PARSE_BYTES", 1024 * 1024))
+
+# Assistant requests: "+15125550100=Acme Realty,+15125550101=Other Brokerage" routes dialed
+# numbers to brokerages; anything else gets BROKERAGE_NAME
+BROKERAGE_NUMBERS = dict(
+    entry.split("=", 1) for entry in os.getenv("BROKERAGE_NUMBERS", "").split(",") if "=" in entry
+)
+# How long an assistant-request may wait on the returning-caller lookup before answering without it
+ASSISTANT_REQUEST_BUDGET_MS = float(os.getenv("ASSISTANT_REQUEST_BUDGET_MS", 50))
+CALLER_CONTEXT_TTL = int(os.getenv("CALLER_CONTEXT_TTL", 300))
+# One JSON spec per brokerage, provisioned by sync_assistants.py
+ASSISTANT_SPECS_DIR = Path(os.getenv("ASSISTANT_SPECS_DIR", "assistants"))
 
 # Google Sheets Webhook
 GOOGLE_SHEETS_WEBHOOK_URL = os.getenv("GOOGLE_SHEETS_WEBHOOK_URL", "")
 
-# Data Storage
-DATA_DIR = Path("conversation_data")
-DATA_DIR.mkdir(exist_ok=True)
+# Data Storage (created at startup, see app.lifespan)
+DATA_DIR = Path(os.getenv("DATA_DIR", "conversation_data"))
+DB_PATH = Path(os.getenv("DB_PATH", DATA_DIR / "calls.db"))
+# Live call registry behind /calls/live (shared by all workers through STATE_DB_PATH)
+LIVE_CALLS_MAX = int(os.getenv("LIVE_CALLS_MAX", 1000))
+LIVE_CALL_TTL = int(os.getenv("LIVE_CALL_TTL", 7200))  # seconds without news before a call is dropped
+LIVE_EVICT_INTERVAL = float(os.getenv("LIVE_EVICT_INTERVAL", 30))  # seconds between sweeps for expired calls
+LIVE_TRANSCRIPT_MAX = int(os.getenv("LIVE_TRANSCRIPT_MAX", 500))  # segments kept per call for late subscribers
+# State every worker process must see the same way (see src/shared_state.py)
+STATE_DB_PATH = Path(os.getenv("STATE_DB_PATH", DATA_DIR / "state.db"))
+# Lead event stream behind /events/leads (shared by all workers through STATE_DB_PATH)
+EVENT_BACKLOG = int(os.getenv("EVENT_BACKLOG", 1000))  # events kept for clients resuming after Last-Event-ID
+EVENT_SUBSCRIBER_BUFFER = int(os.getenv("EVENT_SUBSCRIBER_BUFFER", 100))  # undelivered events per subscriber
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", 0.25))  # seconds between checks for other workers' events
+# Read API responses kept per worker (see src/response_cache.py)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+# Single-call reads: bodies smaller than this go out uncompressed, and compressed bodies kept per worker
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESSED_BODY_CACHE_SIZE = int(os.getenv("COMPRESSED_BODY_CACHE_SIZE", 256))
+# Call IDs whose offset in all_calls.jsonl is kept per tenant and worker (about 300 bytes each);
+# older calls are found by scanning the log
+CALL_LOG_INDEX_SIZE = int(os.getenv("CALL_LOG_INDEX_SIZE", 100000))
+# JSON registry of brokerages with their own storage shards (see src/tenants.py); unset = single tenant
+TENANTS_FILE = os.getenv("TENANTS_FILE", "")
+
+# Hourly rollups older than this are dropped by `python manage_rollups.py compact`
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", 90))
+
+# Phone numbers without a +country prefix are read as national numbers of this country
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "1")
+# Phone number -> lead ID mappings kept in memory per worker
+LEAD_CACHE_SIZE = int(os.getenv("LEAD_CACHE_SIZE", 10000))
+
+# Lead scoring weights: a JSON file overriding src/scoring.py DEFAULT_WEIGHTS
+LEAD_SCORE_WEIGHTS_FILE = os.getenv("LEAD_SCORE_WEIGHTS_FILE", "")
+
+# Metrics: with several workers, each writes its values to this directory and /metrics merges them
+# (see src/metrics.py); production mode sets it to DATA_DIR/metrics when unset
+METRICS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_WRITE_INTERVAL = float(os.getenv("METRICS_WRITE_INTERVAL", 1))
+
+# Profiling (profiles are written to DATA_DIR/profiles)
+PROFILE_WEBHOOKS = os.getenv("PROFILE_WEBHOOKS", "").lower() in ("1", "true", "yes")
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 0))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+
+# Tracing (spans are written to DATA_DIR/traces)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "").lower() in ("1", "true", "yes")
 
 # Application Metadata
 APP_TITLE = "Webhook Server"
@@ -1,20 +1,102 @@
 import sqlite3
-import json
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
+from . import jsoncodec
+from .config import ROLLUP_HOURLY_RETENTION_DAYS, LEAD_CACHE_SIZE
 from .models import CallerInfo, ConversationData
+from .metrics import timed_db
+from .tracing import traced
+from .normalize import normalize_lead, caller_phone, e164, phone_number_text
+from .cache import LRUCache
+from .tenants import current_tenant
 
-DB_PATH = Path("conversation_data/calls.db")
+# Seconds a connection waits for another worker's write lock before failing
+BUSY_TIMEOUT = 30
 
 
+def connect(check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open a connection that tolerates concurrent writers
+
+    The database runs in WAL mode (set by init_database), so readers never
+    block the writer and several worker processes can share the file; writers
+    queue on the lock for up to BUSY_TIMEOUT seconds. Each tenant has its
+    own file (see src/tenants.py).
+    """
+    conn = sqlite3.connect(current_tenant().db_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# Normalized from the submitted arguments on insert (see src/normalize.py)
+LEAD_COLUMNS = {
+    "caller_role": "TEXT",
+    "asset_class": "TEXT",
+    "market": "TEXT",
+    "deal_size_min": "REAL",
+    "deal_size_max": "REAL",
+    "urgency": "TEXT",
+}
+
+
+# Written by src/scoring.py; a NULL score marks the lead for (re)scoring
+SCORE_COLUMNS = {
+    "score": "REAL",
+    "score_version": "TEXT",
+}
+
+# Links to the `leads` row of the caller's phone number
+LINK_COLUMNS = {
+    "lead_id": "INTEGER",
+}
+
+
+def lead_column_values(arguments: Dict[str, Any]) -> tuple:
+    """LEAD_COLUMNS values, in order, for a submitted CallerInfo dict"""
+    normalized = normalize_lead(arguments)
+    return tuple(normalized[name] for name in LEAD_COLUMNS)
+
+
+def _backfill_lead_columns(cursor, batch_size: int = 1000) -> int:
+    rows = cursor.execute("SELECT id, arguments FROM caller_information WHERE arguments IS NOT NULL").fetchall()
+    assignments = ", ".join(f"{name} = ?" for name in LEAD_COLUMNS)
+    updates = []
+    for row_id, arguments in rows:
+        try:
+            values = lead_column_values(jsoncodec.loads(arguments))
+        except (jsoncodec.JSONDecodeError, AttributeError):
+            continue
+        updates.append(values + (row_id,))
+    for start in range(0, len(updates), batch_size):
+        cursor.executemany(f"UPDATE caller_information SET {assignments} WHERE id = ?", updates[start:start + batch_size])
+    return len(updates)
+
+
+def _add_missing_columns(cursor, table: str, columns: Dict[str, str]) -> list[str]:
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, kind in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+            added.append(name)
+    return added
+
+
+@timed_db("write")
+@traced(**{"db.system": "sqlite"})
 def init_database():
     """Set up database tables if they don't exist"""
-    DB_PATH.parent.mkdir(exist_ok=True)
+    db_path = current_tenant().db_path
+    db_path.parent.mkdir(parents=True, exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     
+    # WAL is persistent, so setting it once here covers every later connection
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS caller_information (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -50,101 +132,413 @@ def init_database():
         )
     """)
     
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_call_id ON caller_information(call_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_submitted_at ON caller_information(submitted_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_calls_created_at ON calls(created_at)")
+    
+    # One row per caller phone number, with their submissions merged
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            phone TEXT UNIQUE,
+            profile TEXT,
+            call_count INTEGER DEFAULT 0,
+            submission_count INTEGER DEFAULT 0,
+            last_call_id TEXT,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Columns added to databases created before they existed, under the write
+    # lock so concurrent workers don't both migrate
+    cursor.execute("BEGIN IMMEDIATE")
+    added = _add_missing_columns(cursor, "caller_information", {**LEAD_COLUMNS, **SCORE_COLUMNS, **LINK_COLUMNS})
+    added += _add_missing_columns(cursor, "calls", LINK_COLUMNS)
+    if any(name in LEAD_COLUMNS for name in added):
+        backfilled = _backfill_lead_columns(cursor)
+        if backfilled:
+            print(f"Normalized {backfilled} existing caller_information rows")
+    if "lead_id" in added:
+        linked = link_leads(cursor, "calls") + link_leads(cursor, "caller_information")
+        if linked:
+            print(f"Linked {linked} existing rows to leads by phone number")
     conn.commit()
-    conn.close()
-    print(f"Database initialized at: {DB_PATH.absolute()}")
-
-
-def save_caller_info(caller_info: CallerInfo, call_id: str = "unknown", raw_message: Dict[str, Any] = None) -> int:
-    """Save caller info in the tool-calls format, returns database ID"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     
-    timestamp = None
-    message_type = None
-    tool_call_id = None
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_lead_id ON caller_information(lead_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_calls_lead_id ON calls(lead_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_market ON caller_information(market, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_asset_class ON caller_information(asset_class, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_urgency ON caller_information(urgency, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_deal_size ON caller_information(deal_size_max, deal_size_min)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_caller_information_score ON caller_information(score)")
     
-    if raw_message:
-        timestamp = raw_message.get("timestamp")
-        message_type = raw_message.get("type")
-        
-        tool_calls = raw_message.get("toolCalls", [])
-        if tool_calls and len(tool_calls) > 0:
-            tool_call_id = tool_calls[0].get("id")
+    # Pre-aggregated call statistics for /db/timeseries, kept current by save_call_data
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_calls (
+            granularity TEXT,
+            bucket TEXT,
+            assistant_id TEXT,
+            calls INTEGER,
+            duration_count INTEGER,
+            duration_sum REAL,
+            cost_sum REAL,
+            PRIMARY KEY (granularity, bucket, assistant_id)
+        )
+    """)
     
-    arguments_json = json.dumps(caller_info.dict(exclude_none=True))
-    raw_payload_json = json.dumps(raw_message) if raw_message else None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_counts (
+            granularity TEXT,
+            bucket TEXT,
+            assistant_id TEXT,
+            dimension TEXT,
+            value TEXT,
+            count INTEGER,
+            PRIMARY KEY (granularity, bucket, assistant_id, dimension, value)
+        )
+    """)
     
+    # Bumped by every write; see bump_versions()
     cursor.execute("""
-        INSERT INTO caller_information (
-            call_id, timestamp, type, tool_call_id,
-            function_name, arguments, raw_payload
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        call_id,
-        timestamp,
-        message_type or "tool-calls",
-        tool_call_id,
-        "submit_caller_information",
-        arguments_json,
-        raw_payload_json
-    ))
-    
-    row_id = cursor.lastrowid
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    
+    conn.commit()
+    
+    # Databases from before the rollup tables existed are backfilled once;
+    # the check runs under the write lock so concurrent workers can't both do it
+    cursor.execute("BEGIN IMMEDIATE")
+    needs_backfill = (
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM calls)").fetchone()[0]
+        and not cursor.execute("SELECT EXISTS (SELECT 1 FROM rollup_calls)").fetchone()[0]
+    )
+    if needs_backfill:
+        update_rollups(cursor, "1", ())
+        print("Backfilled call rollups from existing calls")
     conn.commit()
+    
     conn.close()
+    print(f"Database initialized at: {db_path.absolute()}")
+
+
+@timed_db("write")
+@traced(**{"db.system": "sqlite"})
+def save_caller_info(caller_info: CallerInfo, call_id: str = "unknown", raw_message: Dict[str, Any] = None,
+                     phone: Optional[str] = None) -> int:
+    """
+    Save caller info in the tool-calls format, returns database ID
+    
+    The submission is merged into the caller's `leads` row, found by `phone`
+    or else by the numbers on the raw message's call and in the submission.
+    """
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        
+        timestamp = None
+        message_type = None
+        tool_call_id = None
+        
+        if raw_message:
+            timestamp = raw_message.get("timestamp")
+            message_type = raw_message.get("type")
+        
+            tool_calls = raw_message.get("toolCalls", [])
+            if tool_calls and len(tool_calls) > 0:
+                tool_call_id = tool_calls[0].get("id")
+        
+        arguments = caller_info.dict(exclude_none=True)
+        arguments_json = jsoncodec.dumps(arguments)
+        raw_payload_json = jsoncodec.dumps(raw_message) if raw_message else None
+        
+        call = raw_message.get("call") if raw_message else None
+        phone = phone or caller_phone(call, caller_info.phone_number)
+        lead_id = upsert_lead(cursor, phone, call_id, arguments, submission=True) if phone else None
+        
+        cursor.execute(f"""
+            INSERT INTO caller_information (
+                call_id, timestamp, type, tool_call_id,
+                function_name, arguments, raw_payload, lead_id,
+                {", ".join(LEAD_COLUMNS)}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(LEAD_COLUMNS))})
+        """, (
+            call_id,
+            timestamp,
+            message_type or "tool-calls",
+            tool_call_id,
+            "submit_caller_information",
+            arguments_json,
+            raw_payload_json,
+            lead_id,
+            *lead_column_values(arguments)
+        ))
+        
+        row_id = cursor.lastrowid
+        bump_versions(cursor, "leads")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     print(f"Saved caller info to database (ID: {row_id})")
     return row_id
 
 
+@timed_db("write")
+@traced(**{"db.system": "sqlite"})
 def save_call_data(conversation: ConversationData) -> int:
     """Save full call details including transcript and metadata"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        
+        # Hold the write lock from the first read so a redelivery can't be counted twice
+        cursor.execute("BEGIN IMMEDIATE")
+        
+        # A redelivered report replaces the stored call, so take the old one out of the rollups first
+        if cursor.execute("SELECT 1 FROM calls WHERE call_id = ?", (conversation.call_id,)).fetchone():
+            update_rollups(cursor, "call_id = ?", (conversation.call_id,), sign=-1)
+        
+        transcript_json = conversation.transcript.to_json()
+        metadata_json = jsoncodec.dumps(conversation.metadata)
+        
+        caller_info = conversation.caller_info
+        phone_number = phone_number_text(conversation.metadata.get("phone_number"))
+        phone = caller_phone(
+            None,
+            conversation.metadata.get("customer_number"),
+            caller_info.phone_number if caller_info else None,
+        )
+        lead_id = upsert_lead(cursor, phone, conversation.call_id, {}) if phone else None
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO calls (
+                call_id, assistant_id, call_duration, call_status,
+                recording_url, summary, success_evaluation,
+                phone_number, started_at, ended_at, end_reason, cost,
+                transcript, metadata, lead_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            conversation.call_id,
+            conversation.assistant_id,
+            conversation.call_duration,
+            conversation.call_status,
+            conversation.recording_url,
+            conversation.summary,
+            conversation.success_evaluation,
+            phone_number,
+            conversation.metadata.get("started_at"),
+            conversation.metadata.get("ended_at"),
+            conversation.metadata.get("end_reason"),
+            conversation.metadata.get("cost"),
+            transcript_json,
+            metadata_json,
+            lead_id
+        ))
+        
+        row_id = cursor.lastrowid
+        update_rollups(cursor, "call_id = ?", (conversation.call_id,))
+        
+        # The success evaluation feeds lead scores, so leads submitted during the call are rescored
+        cursor.execute("UPDATE caller_information SET score = NULL WHERE call_id = ?", (conversation.call_id,))
+        bump_versions(cursor, "calls", "leads")
+        conn.commit()
+    except BaseException:
+        # Release the write lock now rather than when the connection is collected
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
-    transcript_json = json.dumps([msg.dict() for msg in conversation.transcript])
-    metadata_json = json.dumps(conversation.metadata)
+    # Saved on its own connection once ours has released the write lock
+    if caller_info:
+        save_caller_info(caller_info, conversation.call_id, phone=phone)
     
-    cursor.execute("""
-        INSERT OR REPLACE INTO calls (
-            call_id, assistant_id, call_duration, call_status,
-            recording_url, summary, success_evaluation,
-            phone_number, started_at, ended_at, end_reason, cost,
-            transcript, metadata
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        conversation.call_id,
-        conversation.assistant_id,
-        conversation.call_duration,
-        conversation.call_status,
-        conversation.recording_url,
-        conversation.summary,
-        conversation.success_evaluation,
-        conversation.metadata.get("phone_number"),
-        conversation.metadata.get("started_at"),
-        conversation.metadata.get("ended_at"),
-        conversation.metadata.get("end_reason"),
-        conversation.metadata.get("cost"),
-        transcript_json,
-        metadata_json
-    ))
-    
-    row_id = cursor.lastrowid
-    
-    if conversation.caller_info:
-        save_caller_info(conversation.caller_info, conversation.call_id)
+    print(f"Saved call data to database (ID: {row_id})")
+    return row_id
+
+
+# What cached responses depend on: "calls" (calls table) and "leads" (caller_information, leads, scores)
+DATA_SCOPES = ("calls", "leads")
+
+
+def bump_versions(cursor, *scopes: str):
+    """
+    Mark `scopes` as changed, in the caller's write transaction
     
-    conn.commit()
+    The versions live in the database rather than in memory so that a
+    write through any worker (or import_history.py) invalidates the
+    response cache of every worker.
+    """
+    cursor.executemany(
+        "INSERT INTO data_versions (scope, version) VALUES (?, 1) "
+        "ON CONFLICT (scope) DO UPDATE SET version = version + 1",
+        [(scope,) for scope in scopes],
+    )
+
+
+# One long-lived connection per shard for data_versions(), which runs on every cached request
+_version_readers: Dict[Path, sqlite3.Connection] = {}
+_version_lock = threading.Lock()
+
+
+def data_versions(*scopes: str) -> tuple:
+    """Current versions of `scopes` in the active tenant's shard"""
+    db_path = current_tenant().db_path
+    with _version_lock:
+        conn = _version_readers.get(db_path)
+        if conn is None:
+            conn = _version_readers[db_path] = connect(check_same_thread=False)
+        versions = dict(conn.execute(
+            f"SELECT scope, version FROM data_versions WHERE scope IN ({', '.join('?' * len(scopes))})", scopes
+        ).fetchall())
+    return tuple(versions.get(scope, 0) for scope in scopes)
+
+
+# (shard, phone number) -> lead ID; a number's lead never changes, so entries can't go stale
+_lead_ids = LRUCache(LEAD_CACHE_SIZE)
+
+
+def upsert_lead(cursor, phone: str, call_id: Optional[str], profile: Dict[str, Any], submission: bool = False) -> int:
+    """
+    Create or update the lead for an E.164 phone number, returns its ID
+
+    Runs in the caller's transaction. Non-empty profile fields overwrite the
+    stored ones, so the lead always holds the latest answer to each question;
+    the call count only grows when a different call ID comes in.
+    """
+    row = cursor.execute("""
+        INSERT INTO leads (phone, profile, call_count, submission_count, last_call_id)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT (phone) DO UPDATE SET
+            profile = json_patch(profile, excluded.profile),
+            call_count = call_count + (excluded.last_call_id IS NOT last_call_id),
+            submission_count = submission_count + excluded.submission_count,
+            last_call_id = excluded.last_call_id,
+            last_seen_at = CURRENT_TIMESTAMP
+        RETURNING id
+    """, (phone, jsoncodec.dumps(profile), int(submission), call_id)).fetchone()
+    _lead_ids.put((current_tenant().db_path, phone), row[0])
+    return row[0]
+
+
+def link_leads(cursor, table: str, where: str = "lead_id IS NULL", params: tuple = ()) -> int:
+    """
+    Attach rows of `calls` or `caller_information` to leads, oldest first
+
+    Used to backfill existing rows and by bulk imports, which bypass
+    save_call_data. Rows without a usable phone number stay unlinked.
+    Returns how many rows were linked.
+    """
+    if table == "calls":
+        query = f"""
+            SELECT id, call_id, NULL, json_extract(metadata, '$.customer_number'),
+                   (SELECT json_extract(arguments, '$.phone_number') FROM caller_information
+                    WHERE caller_information.call_id = calls.call_id ORDER BY id LIMIT 1)
+            FROM calls WHERE {where} ORDER BY id
+        """
+    else:
+        query = f"""
+            SELECT id, call_id, arguments,
+                   json_extract(raw_payload, '$.call.customer.number'),
+                   json_extract(arguments, '$.phone_number')
+            FROM caller_information WHERE {where} ORDER BY id
+        """
+    
+    links, touched = [], set()
+    for row_id, call_id, arguments, *numbers in cursor.execute(query, params).fetchall():
+        phone = caller_phone(None, *numbers)
+        if not phone:
+            continue
+        submission = table == "caller_information"
+        profile = jsoncodec.loads(arguments) if arguments else {}
+        lead_id = upsert_lead(cursor, phone, call_id, profile, submission)
+        links.append((lead_id, row_id))
+        touched.add(lead_id)
+    cursor.executemany(f"UPDATE {table} SET lead_id = ? WHERE id = ?", links)
+    
+    # Rows arrive grouped by table rather than by call, so count distinct calls directly
+    cursor.executemany("""
+        UPDATE leads SET call_count = (
+            SELECT COUNT(*) FROM (
+                SELECT call_id FROM calls WHERE lead_id = leads.id
+                UNION
+                SELECT call_id FROM caller_information WHERE lead_id = leads.id
+            )
+        ) WHERE id = ?
+    """, [(lead_id,) for lead_id in touched])
+    return len(links)
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def _select_lead_id(phone: str) -> Optional[int]:
+    conn = connect()
+    row = conn.execute("SELECT id FROM leads WHERE phone = ?", (phone,)).fetchone()
     conn.close()
+    return row[0] if row else None
+
+
+def find_lead_id(number: Any) -> Optional[int]:
+    """
+    Lead ID for a phone number in any format, or None if it has never called
     
-    print(f"Saved call data to database (ID: {row_id})")
-    return row_id
+    Served from an in-memory LRU after the first lookup, so checking for a
+    returning caller on every call costs microseconds.
+    """
+    phone = e164(number)
+    if not phone:
+        return None
+    key = (current_tenant().db_path, phone)
+    lead_id = _lead_ids.get(key)
+    if lead_id is None:
+        # Misses aren't cached: the number may call (through another worker) at any time
+        lead_id = _select_lead_id(phone)
+        if lead_id is not None:
+            _lead_ids.put(key, lead_id)
+    return lead_id
+
 
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_lead(lead_id: int, recent: int = 20) -> Optional[Dict[str, Any]]:
+    """A lead's merged profile with its most recent calls and submissions"""
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    row = cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,)).fetchone()
+    if not row:
+        conn.close()
+        return None
+    lead = dict(row)
+    lead["profile"] = jsoncodec.loads(lead["profile"]) if lead["profile"] else {}
+    
+    lead["calls"] = [dict(call) for call in cursor.execute("""
+        SELECT call_id, call_status, call_duration, success_evaluation, created_at
+        FROM calls WHERE lead_id = ?
+        ORDER BY created_at DESC LIMIT ?
+    """, (lead_id, recent))]
+    lead["submissions"] = [dict(submission) for submission in cursor.execute("""
+        SELECT id, call_id, type, submitted_at FROM caller_information WHERE lead_id = ?
+        ORDER BY id DESC LIMIT ?
+    """, (lead_id, recent))]
+    
+    conn.close()
+    return lead
 
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
 def get_caller_info_by_call_id(call_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve caller information by call ID in tool-calls format"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -161,16 +555,18 @@ def get_caller_info_by_call_id(call_id: str) -> Optional[Dict[str, Any]]:
     if row:
         data = dict(row)
         if data.get('arguments'):
-            data['arguments'] = json.loads(data['arguments'])
+            data['arguments'] = jsoncodec.loads(data['arguments'])
         if data.get('raw_payload'):
-            data['raw_payload'] = json.loads(data['raw_payload'])
+            data['raw_payload'] = jsoncodec.loads(data['raw_payload'])
         return data
     return None
 
 
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
 def get_call_by_id(call_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve complete call data by call ID"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -182,16 +578,59 @@ def get_call_by_id(call_id: str) -> Optional[Dict[str, Any]]:
     if row:
         data = dict(row)
         if data.get('transcript'):
-            data['transcript'] = json.loads(data['transcript'])
+            data['transcript'] = jsoncodec.loads(data['transcript'])
         if data.get('metadata'):
-            data['metadata'] = json.loads(data['metadata'])
+            data['metadata'] = jsoncodec.loads(data['metadata'])
         return data
     return None
 
 
+# Stored as JSON text, which _call_json() splices into response bodies as is
+CALL_JSON_COLUMNS = ("transcript", "metadata")
+
+
+def _call_version(row) -> tuple:
+    # A redelivered report replaces the row under a new id, and link_leads() only sets lead_id
+    return row["id"], row["lead_id"], row["created_at"]
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_call_version(call_id: str) -> Optional[tuple]:
+    """What identifies the stored version of a call, None if it isn't stored"""
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT id, lead_id, created_at FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+    conn.close()
+    return _call_version(row) if row else None
+
+
+def _call_json(row, extra: Optional[Dict[str, Any]] = None) -> bytes:
+    # The stored transcript and metadata are already JSON, so they go in without being parsed and encoded again
+    fields = [
+        f"{jsoncodec.encode_string(key)}:{row[key] if key in CALL_JSON_COLUMNS and row[key] else jsoncodec.dumps(row[key])}"
+        for key in row.keys()
+    ]
+    fields += [f"{jsoncodec.encode_string(key)}:{jsoncodec.dumps(value)}" for key, value in (extra or {}).items()]
+    return ("{" + ",".join(fields) + "}").encode()
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_call_json(call_id: str, extra: Optional[Dict[str, Any]] = None) -> Optional[tuple[tuple, bytes]]:
+    """The version of a call and get_call_by_id()'s result as JSON, plus `extra` keys"""
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+    conn.close()
+    return (_call_version(row), _call_json(row, extra)) if row else None
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
 def get_recent_calls(limit: int = 50) -> list[Dict[str, Any]]:
     """Get recent calls"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -208,17 +647,32 @@ def get_recent_calls(limit: int = 50) -> list[Dict[str, Any]]:
     for row in rows:
         data = dict(row)
         if data.get('transcript'):
-            data['transcript'] = json.loads(data['transcript'])
+            data['transcript'] = jsoncodec.loads(data['transcript'])
         if data.get('metadata'):
-            data['metadata'] = json.loads(data['metadata'])
+            data['metadata'] = jsoncodec.loads(data['metadata'])
         calls.append(data)
     
     return calls
 
 
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_recent_calls_json(limit: int = 50, tag_tenant: bool = False) -> list[tuple[Optional[str], bytes]]:
+    """get_recent_calls() as (created_at, JSON) pairs, each call tagged with its tenant if `tag_tenant`"""
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM calls ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    
+    extra = {"tenant": current_tenant().name} if tag_tenant else None
+    return [(row["created_at"], _call_json(row, extra)) for row in rows]
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
 def get_stats() -> Dict[str, Any]:
     """Get database statistics"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute("SELECT COUNT(*) FROM calls")
@@ -236,7 +690,7 @@ def get_stats() -> Dict[str, Any]:
     
     for row in cursor.fetchall():
         try:
-            args = json.loads(row[0])
+            args = jsoncodec.loads(row[0])
             role = args.get("caller_role")
             if role:
                 roles[role] = roles.get(role, 0) + 1
@@ -244,7 +698,7 @@ def get_stats() -> Dict[str, Any]:
             asset = args.get("asset_type")
             if asset:
                 asset_types[asset] = asset_types.get(asset, 0) + 1
-        except (json.JSONDecodeError, KeyError):
+        except (jsoncodec.JSONDecodeError, KeyError):
             pass
     
     conn.close()
@@ -258,6 +712,306 @@ def get_stats() -> Dict[str, Any]:
     }
 
 
+# Rollup buckets are UTC; a call is placed by its start time when Vapi sent one
+ROLLUP_TIME = "COALESCE(datetime(started_at), created_at)"
+ROLLUP_GRANULARITIES = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+# Upper bounds (seconds) of the call duration histogram that percentiles are estimated from
+DURATION_BUCKETS = (15, 30, 60, 120, 180, 300, 600, 900, 1800, 3600)
+
+_DURATION_BUCKET_SQL = "CASE " + " ".join(
+    f"WHEN call_duration <= {bound} THEN '{bound}'" for bound in DURATION_BUCKETS
+) + " ELSE '+Inf' END"
+
+# dimension -> (value expression, which calls it counts)
+ROLLUP_DIMENSIONS = {
+    "end_reason": ("COALESCE(end_reason, 'unknown')", "1"),
+    "success_evaluation": ("COALESCE(success_evaluation, 'unknown')", "1"),
+    "duration": (_DURATION_BUCKET_SQL, "call_duration IS NOT NULL"),
+}
+
+
+def update_rollups(cursor, where: str, params: tuple, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) the calls matching `where` in every rollup bucket
+
+    Runs inside the caller's transaction, in the same one as the write to `calls`.
+    """
+    for granularity, bucket_format in ROLLUP_GRANULARITIES.items():
+        bucket = f"strftime('{bucket_format}', {ROLLUP_TIME})"
+        cursor.execute(f"""
+            INSERT INTO rollup_calls (granularity, bucket, assistant_id, calls, duration_count, duration_sum, cost_sum)
+            SELECT '{granularity}', {bucket}, COALESCE(assistant_id, ''),
+                   {sign} * COUNT(*), {sign} * COUNT(call_duration), {sign} * TOTAL(call_duration), {sign} * TOTAL(cost)
+            FROM calls WHERE {where}
+            GROUP BY 2, 3
+            ON CONFLICT (granularity, bucket, assistant_id) DO UPDATE SET
+                calls = calls + excluded.calls,
+                duration_count = duration_count + excluded.duration_count,
+                duration_sum = duration_sum + excluded.duration_sum,
+                cost_sum = cost_sum + excluded.cost_sum
+        """, params)
+        
+        for dimension, (value, condition) in ROLLUP_DIMENSIONS.items():
+            cursor.execute(f"""
+                INSERT INTO rollup_counts (granularity, bucket, assistant_id, dimension, value, count)
+                SELECT '{granularity}', {bucket}, COALESCE(assistant_id, ''), '{dimension}', {value}, {sign} * COUNT(*)
+                FROM calls WHERE ({where}) AND {condition}
+                GROUP BY 2, 3, 5
+                ON CONFLICT (granularity, bucket, assistant_id, dimension, value) DO UPDATE SET
+                    count = count + excluded.count
+            """, params)
+
+
+@timed_db("write")
+@traced(**{"db.system": "sqlite"})
+def rebuild_rollups(since: Optional[str] = None) -> int:
+    """Recompute rollups from `calls` for days starting at `since` (default: everything); returns calls counted"""
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    
+    day_start = cursor.execute("SELECT strftime('%Y-%m-%d 00:00:00', ?)", (since,)).fetchone()[0] if since else ""
+    cursor.execute("DELETE FROM rollup_calls WHERE bucket >= ?", (day_start,))
+    cursor.execute("DELETE FROM rollup_counts WHERE bucket >= ?", (day_start,))
+    update_rollups(cursor, f"{ROLLUP_TIME} >= ?", (day_start,))
+    
+    counted = cursor.execute(
+        "SELECT COALESCE(SUM(calls), 0) FROM rollup_calls WHERE granularity = 'day' AND bucket >= ?", (day_start,)
+    ).fetchone()[0]
+    conn.commit()
+    conn.close()
+    return counted
+
+
+@timed_db("write")
+@traced(**{"db.system": "sqlite"})
+def compact_rollups(hourly_retention_days: int = ROLLUP_HOURLY_RETENTION_DAYS) -> Dict[str, int]:
+    """Drop emptied rollup rows and hourly buckets older than the retention; daily buckets are kept"""
+    conn = connect()
+    cursor = conn.cursor()
+    cutoff = f"-{hourly_retention_days} days"
+    
+    removed = {}
+    cursor.execute("DELETE FROM rollup_calls WHERE calls = 0")
+    removed["empty_buckets"] = cursor.rowcount
+    cursor.execute("DELETE FROM rollup_counts WHERE count = 0")
+    removed["empty_counts"] = cursor.rowcount
+    cursor.execute(
+        "DELETE FROM rollup_calls WHERE granularity = 'hour' AND bucket < datetime('now', ?)", (cutoff,)
+    )
+    removed["hourly_buckets"] = cursor.rowcount
+    cursor.execute(
+        "DELETE FROM rollup_counts WHERE granularity = 'hour' AND bucket < datetime('now', ?)", (cutoff,)
+    )
+    removed["hourly_counts"] = cursor.rowcount
+    
+    conn.commit()
+    conn.close()
+    return removed
+
+
+def _duration_percentile(histogram: Dict[str, int], quantile: float) -> Optional[float]:
+    """Estimate a duration percentile by interpolating within its histogram bucket"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    
+    rank = quantile * total
+    seen, lower = 0, 0.0
+    for bound in DURATION_BUCKETS:
+        count = histogram.get(str(bound), 0)
+        if count and seen + count >= rank:
+            return round(lower + (bound - lower) * (rank - seen) / count, 2)
+        seen += count
+        lower = float(bound)
+    # Falls in the open-ended bucket; the largest bound is the best we can say
+    return lower
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_timeseries(granularity: str, since: str, until: str, assistant_id: Optional[str] = None,
+                   by_assistant: bool = False) -> list[Dict[str, Any]]:
+    """
+    Per-bucket call statistics between `since` and `until`, read from the rollup tables
+
+    Buckets with no calls are omitted. With by_assistant, each bucket is
+    split into one entry per assistant_id.
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"bucket must be one of: {', '.join(ROLLUP_GRANULARITIES)}")
+    
+    conn = connect()
+    cursor = conn.cursor()
+    
+    conditions = "granularity = ? AND bucket >= strftime(?, ?) AND bucket < ?"
+    params = [granularity, ROLLUP_GRANULARITIES[granularity], since, until]
+    if assistant_id is not None:
+        conditions += " AND assistant_id = ?"
+        params.append(assistant_id)
+    group = "bucket, assistant_id" if by_assistant else "bucket, ''"
+    
+    cursor.execute(f"""
+        SELECT {group}, SUM(calls), SUM(duration_count), SUM(duration_sum), SUM(cost_sum)
+        FROM rollup_calls WHERE {conditions}
+        GROUP BY 1, 2 HAVING SUM(calls) > 0
+        ORDER BY 1, 2
+    """, params)
+    
+    series = {}
+    for bucket, assistant, calls, duration_count, duration_sum, cost_sum in cursor.fetchall():
+        series[(bucket, assistant)] = {
+            "bucket": bucket,
+            **({"assistant_id": assistant or None} if by_assistant else {}),
+            "calls": calls,
+            "average_duration": round(duration_sum / duration_count, 2) if duration_count else None,
+            "total_cost": round(cost_sum, 4),
+            "duration_histogram": {},
+            "end_reasons": {},
+            "success_evaluations": {},
+        }
+    
+    cursor.execute(f"""
+        SELECT {group}, dimension, value, SUM(count)
+        FROM rollup_counts WHERE {conditions}
+        GROUP BY 1, 2, 3, 4 HAVING SUM(count) > 0
+    """, params)
+    
+    keys = {"duration": "duration_histogram", "end_reason": "end_reasons", "success_evaluation": "success_evaluations"}
+    for bucket, assistant, dimension, value, count in cursor.fetchall():
+        entry = series.get((bucket, assistant))
+        if entry:
+            entry[keys[dimension]][value] = count
+    
+    conn.close()
+    
+    for entry in series.values():
+        histogram = entry.pop("duration_histogram")
+        entry["duration_percentiles"] = {
+            "p50": _duration_percentile(histogram, 0.50),
+            "p90": _duration_percentile(histogram, 0.90),
+            "p99": _duration_percentile(histogram, 0.99),
+        }
+    
+    return list(series.values())
+
+
+_LEAD_SELECT = f"id, call_id, submitted_at, type, arguments, score, {', '.join(LEAD_COLUMNS)}"
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def query_leads(market: Optional[str] = None, asset_class: Optional[str] = None, urgency: Optional[str] = None,
+                caller_role: Optional[str] = None, min_deal_size: Optional[float] = None,
+                max_deal_size: Optional[float] = None, since: Optional[str] = None, until: Optional[str] = None,
+                before_id: Optional[int] = None, limit: int = 50) -> list[Dict[str, Any]]:
+    """
+    Newest-first caller_information rows matching the normalized filters
+
+    Pages by keyset: pass the last row's id as `before_id` for the next page.
+    A deal size range matches leads whose own range overlaps it; open-ended
+    leads ("$25M+") have no maximum.
+    """
+    conditions, params = [], []
+    for column, value in (("market", market), ("asset_class", asset_class), ("urgency", urgency), ("caller_role", caller_role)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if min_deal_size is not None:
+        conditions.append("(deal_size_max >= ? OR (deal_size_max IS NULL AND deal_size_min IS NOT NULL))")
+        params.append(min_deal_size)
+    if max_deal_size is not None:
+        conditions.append("deal_size_min <= ?")
+        params.append(max_deal_size)
+    if since:
+        conditions.append("submitted_at >= ?")
+        params.append(since)
+    if until:
+        conditions.append("submitted_at < ?")
+        params.append(until)
+    if before_id is not None:
+        conditions.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT {_LEAD_SELECT}
+        FROM caller_information {where}
+        ORDER BY id DESC
+        LIMIT ?
+    """, params + [limit])
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [_lead_from_row(row) for row in rows]
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
+def get_top_leads(limit: int = 20, market: Optional[str] = None, asset_class: Optional[str] = None,
+                  recency_per_day: float = 0.0, recency_horizon_days: float = 0.0) -> list[Dict[str, Any]]:
+    """
+    Leads by priority: the persisted score less recency_per_day points per day of age, up to the horizon
+    
+    Every lead older than the horizon loses the same points, so only the best
+    `limit` of those by score (from idx_caller_information_score) are ranked
+    against the newer ones. Leads without a submission time count as old.
+    """
+    conditions, params = ["score IS NOT NULL"], []
+    for column, value in (("market", market), ("asset_class", asset_class)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    where = " AND ".join(conditions)
+    cutoff = f"-{recency_horizon_days} days"
+    
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        WITH candidates AS (
+            SELECT {_LEAD_SELECT} FROM caller_information
+            WHERE {where} AND submitted_at >= datetime('now', ?)
+            UNION ALL
+            SELECT * FROM (
+                SELECT {_LEAD_SELECT} FROM caller_information
+                WHERE {where} AND (submitted_at < datetime('now', ?) OR submitted_at IS NULL)
+                ORDER BY score DESC
+                LIMIT ?
+            )
+        )
+        SELECT *, score - ? * COALESCE(MIN(MAX(julianday('now') - julianday(submitted_at), 0), ?), ?) AS priority
+        FROM candidates
+        ORDER BY priority DESC
+        LIMIT ?
+    """, params + [cutoff] + params + [cutoff, limit, recency_per_day, recency_horizon_days, recency_horizon_days, limit])
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [{**_lead_from_row(row), "priority": round(row["priority"], 2)} for row in rows]
+
+
+def _lead_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "call_id": row["call_id"],
+        "submitted_at": row["submitted_at"],
+        "type": row["type"],
+        **(jsoncodec.loads(row["arguments"]) if row["arguments"] else {}),
+        "normalized": {name: row[name] for name in LEAD_COLUMNS},
+        "score": row["score"],
+    }
+
+
+@timed_db("query")
+@traced(**{"db.system": "sqlite"})
 def get_caller_info_in_tool_format(call_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve caller information formatted exactly like the tool-calls message
@@ -282,4 +1036,91 @@ def get_caller_info_in_tool_format(call_id: str) -> Optional[Dict[str, Any]]:
     }
 
 
-init_database()
+# Columns available to /db/export/*; anything else is rejected before it reaches SQL
+CALL_EXPORT_FIELDS = {
+    "id": "id",
+    "call_id": "call_id",
+    "assistant_id": "assistant_id",
+    "call_duration": "call_duration",
+    "call_status": "call_status",
+    "recording_url": "recording_url",
+    "summary": "summary",
+    "success_evaluation": "success_evaluation",
+    "phone_number": "phone_number",
+    "started_at": "started_at",
+    "ended_at": "ended_at",
+    "end_reason": "end_reason",
+    "cost": "cost",
+    "transcript": "transcript",
+    "metadata": "metadata",
+    "created_at": "created_at",
+}
+
+LEAD_EXPORT_FIELDS = {
+    "id": "id",
+    "call_id": "call_id",
+    "submitted_at": "submitted_at",
+    "timestamp": "timestamp",
+    "type": "type",
+    "tool_call_id": "tool_call_id",
+    **{
+        field: f"json_extract(arguments, '$.{field}')"
+        for field in CallerInfo.model_fields
+    },
+    "asset_class": "asset_class",
+    "market": "market",
+    "deal_size_min": "deal_size_min",
+    "deal_size_max": "deal_size_max",
+    "arguments": "arguments",
+    "raw_payload": "raw_payload",
+}
+
+# Columns holding JSON text, decoded for NDJSON output
+JSON_COLUMNS = {"transcript", "metadata", "arguments", "raw_payload"}
+
+
+def _export_query(table: str, time_column: str, available: Dict[str, str], fields: list[str],
+                  since: Optional[str], until: Optional[str]) -> tuple[str, list[Any]]:
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    columns = ", ".join(f"{available[field]} AS {field}" for field in fields)
+    conditions, params = [], []
+    if since:
+        conditions.append(f"{time_column} >= ?")
+        params.append(since)
+    if until:
+        conditions.append(f"{time_column} < ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM {table} {where} ORDER BY {time_column}, id", params
+
+
+def _iter_rows(query: str, params: list[Any], batch_size: int) -> Iterator[sqlite3.Row]:
+    # Export responses are consumed from a threadpool, one batch per thread hop
+    conn = connect(check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def iter_calls_for_export(fields: list[str], since: Optional[str] = None, until: Optional[str] = None,
+                          batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    """Stream `calls` rows by created_at without materializing the result set"""
+    query, params = _export_query("calls", "created_at", CALL_EXPORT_FIELDS, fields, since, until)
+    return _iter_rows(query, params, batch_size)
+
+
+def iter_leads_for_export(fields: list[str], since: Optional[str] = None, until: Optional[str] = None,
+                          batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    """Stream caller_information rows by submitted_at, with the submitted fields flattened"""
+    query, params = _export_query("caller_information", "submitted_at", LEAD_EXPORT_FIELDS, fields, since, until)
+    return _iter_rows(query, params, batch_size)
@@ -0,0 +1,214 @@
+"""
+Lead events for broker dashboards
+
+New caller information submissions ("lead") and finished calls ("call")
+are published once to LEAD_EVENTS and fanned out to every subscriber of
+/events/leads (SSE) or /events/leads/ws (WebSocket), instead of each
+dashboard polling the database.
+
+Publishing appends the event to a table in the shared state file (see
+src/shared_state.py), whose autoincrement ID is the event ID, so IDs are
+global and a client can resume with Last-Event-ID on any worker. Each
+worker with subscribers tails that table every EVENT_POLL_INTERVAL seconds
+(at once for events it published itself) and serializes each new event
+once. Delivering it appends a reference to each subscriber's bounded
+buffer; a full buffer either drops its oldest event or disconnects the
+subscriber, as the subscriber chose. An idle subscriber is a small object
+and one waiting coroutine. The last EVENT_BACKLOG events are kept in the
+table for clients resuming after their Last-Event-ID.
+
+Subscribers are only used from the event loop.
+"""
+import asyncio
+import sqlite3
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from . import jsoncodec
+from .config import EVENT_BACKLOG, EVENT_POLL_INTERVAL, EVENT_SUBSCRIBER_BUFFER, STATE_DB_PATH
+from .metrics import REGISTRY
+from .shared_state import connect_state
+from .sse import format_raw_event
+
+# What a subscriber's full buffer does with the next event
+OVERFLOW_POLICIES = ("drop-oldest", "disconnect")
+
+EVENT_OVERFLOWS = REGISTRY.counter(
+    "realflow_event_subscriber_overflows_total",
+    "Events dropped (drop-oldest) or subscribers disconnected (disconnect) by a full /events/leads buffer",
+    ("policy",),
+)
+
+
+class Event(NamedTuple):
+    id: int
+    name: str
+    tenant: Optional[str]
+    sse: bytes  # ready-to-send SSE frame
+    text: str  # ready-to-send WebSocket message
+
+    @classmethod
+    def from_row(cls, event_id: int, name: str, tenant: Optional[str], data: str) -> "Event":
+        text = f'{{"id":{event_id},"event":{jsoncodec.dumps(name)},"data":{data}}}'
+        return cls(event_id, name, tenant, format_raw_event(data, name, event_id), text)
+
+
+class Subscriber:
+    __slots__ = ("tenant", "policy", "buffer", "dropped", "overflowed", "_ready")
+
+    def __init__(self, tenant: Optional[str], policy: str, size: int):
+        self.tenant = tenant
+        self.policy = policy
+        self.buffer: deque = deque(maxlen=size)
+        self.dropped = 0
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event):
+        if len(self.buffer) == self.buffer.maxlen:
+            if self.policy == "disconnect":
+                if not self.overflowed:
+                    EVENT_OVERFLOWS.labels(self.policy).inc()
+                self.overflowed = True
+                self._ready.set()
+                return
+            EVENT_OVERFLOWS.labels(self.policy).inc()
+            self.dropped += 1
+        self.buffer.append(event)
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> List[Event]:
+        """Events buffered since the last call, waiting up to `timeout` for one"""
+        if not self.buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+
+class EventBus:
+    def __init__(self, path: Path, backlog: int, buffer_size: int, poll_interval: float = EVENT_POLL_INTERVAL):
+        self.path = path
+        self.backlog = backlog
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        # ID of the last event delivered to this worker's subscribers
+        self.last_id = 0
+        self._subscribers: set[Subscriber] = set()
+        self._poller: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def publish(self, name: str, data: Dict[str, Any], tenant: Optional[str] = None) -> Optional[int]:
+        """Append an event for every worker's subscribers; returns its ID, or None if it couldn't be stored"""
+        text = jsoncodec.dumps({**data, "tenant": tenant}, default=str)
+        try:
+            conn = connect_state(self.path)
+            try:
+                event_id = conn.execute(
+                    "INSERT INTO lead_events (name, tenant, data) VALUES (?, ?, ?)", (name, tenant, text)
+                ).lastrowid
+                conn.execute("DELETE FROM lead_events WHERE id <= ?", (event_id - self.backlog,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Dashboards missing an event is better than failing the webhook that stored it
+            print(f"Could not publish {name} event: {e}")
+            return None
+        if self._poller is not None:
+            # Publishers may be on a threadpool thread; the poller's event loop is woken from its own thread
+            self._poller.get_loop().call_soon_threadsafe(self._wake.set)
+        return event_id
+
+    def _read(self, after: int, until: Optional[int] = None) -> List[Event]:
+        conn = connect_state(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT id, name, tenant, data FROM lead_events WHERE id > ? AND id <= ? ORDER BY id",
+                (after, until if until is not None else 2**63 - 1),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [Event.from_row(*row) for row in rows]
+
+    def _bounds(self) -> tuple[int, int]:
+        """(oldest kept ID, newest ID); (0, 0) when nothing was ever published"""
+        conn = connect_state(self.path)
+        try:
+            oldest, = conn.execute("SELECT COALESCE(MIN(id), 0) FROM lead_events").fetchone()
+            newest = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'lead_events'").fetchone()
+        finally:
+            conn.close()
+        return oldest, newest[0] if newest else 0
+
+    async def _poll(self):
+        while self._subscribers:
+            try:
+                events = await asyncio.to_thread(self._read, self.last_id)
+            except sqlite3.Error as e:
+                print(f"Could not read lead events: {e}")
+                events = []
+            for event in events:
+                self.last_id = event.id
+                for subscriber in self._subscribers:
+                    if subscriber.tenant is None or subscriber.tenant == event.tenant:
+                        subscriber.push(event)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+        self._poller = None
+
+    async def subscribe(self, tenant: Optional[str] = None, policy: str = "drop-oldest",
+                        last_event_id: Optional[int] = None) -> tuple[Subscriber, Optional[List[Event]]]:
+        """
+        A new subscriber, with the stored events after `last_event_id`
+
+        The backlog is None when events after `last_event_id` have already
+        been dropped from it, meaning the client has to reload its state.
+        """
+        if self._poller is None or self._poller.done():
+            oldest, newest = await asyncio.to_thread(self._bounds)
+            if self._poller is None or self._poller.done():
+                self.last_id = newest
+                self._wake = asyncio.Event()
+                self._poller = asyncio.create_task(self._poll())
+        else:
+            oldest, _ = await asyncio.to_thread(self._bounds)
+
+        # Events after `upto` reach the subscriber through the poller, the rest through the backlog
+        upto = self.last_id
+        subscriber = Subscriber(tenant, policy, self.buffer_size)
+        self._subscribers.add(subscriber)
+        if last_event_id is None:
+            return subscriber, []
+        # Events were missed, or the ID is from a state file that has since been replaced
+        if last_event_id < oldest - 1 or last_event_id > upto:
+            return subscriber, None
+        events = await asyncio.to_thread(self._read, last_event_id, upto)
+        return subscriber, [event for event in events if tenant is None or event.tenant == tenant]
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def buffered(self) -> int:
+        """Events waiting in this worker's subscriber buffers"""
+        # Read at scrape time, possibly from a threadpool thread; list() copies the set without yielding the GIL
+        return sum(len(subscriber.buffer) for subscriber in list(self._subscribers))
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+LEAD_EVENTS = EventBus(STATE_DB_PATH, EVENT_BACKLOG, EVENT_SUBSCRIBER_BUFFER)
+
+EVENT_SUBSCRIBERS = REGISTRY.gauge("realflow_event_subscribers", "Connected /events/leads subscribers in this worker")
+EVENT_SUBSCRIBERS.set_function(lambda: len(LEAD_EVENTS))
+EVENT_BUFFERED = REGISTRY.gauge("realflow_event_subscriber_buffered",
+                                "Undelivered events in /events/leads subscriber buffers in this worker")
+EVENT_BUFFERED.set_function(LEAD_EVENTS.buffered)
@@ -0,0 +1,80 @@
+"""
+Streaming NDJSON/CSV encoders for bulk exports
+
+Rows are encoded one at a time and flushed in chunks, so memory stays flat
+however many rows the cursor yields.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from . import jsoncodec
+from .database import JSON_COLUMNS
+
+# Flush to the client once this much encoded output has accumulated
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_time_bound(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize an ISO date/datetime query parameter to SQLite's CURRENT_TIMESTAMP format
+
+    Raises ValueError for anything fromisoformat can't read.
+    """
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def encode_ndjson(rows: Iterable, fields: list[str]) -> Iterator[str]:
+    json_fields = [field for field in fields if field in JSON_COLUMNS]
+    for row in rows:
+        record = dict(zip(fields, row))
+        for field in json_fields:
+            if record[field]:
+                try:
+                    record[field] = jsoncodec.loads(record[field])
+                except jsoncodec.JSONDecodeError:
+                    pass
+        yield jsoncodec.dumps(record) + "\n"
+
+
+def encode_csv(rows: Iterable, fields: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        # JSON columns go out as their stored JSON text
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(pieces: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """Group encoded pieces into ~CHUNK_SIZE byte chunks, optionally gzip-compressed"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    parts, size = [], 0
+
+    for piece in pieces:
+        data = piece.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            chunk = b"".join(parts)
+            parts, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    tail = b"".join(parts)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -1,11 +1,83 @@
-import json
-from typing import Dict, Any
+import asyncio
+import time
+from typing import Dict, Any, Optional
 
-from .models import CallerInfo, ConversationData, Message
+from . import jsoncodec
+from .config import ASSISTANT_REQUEST_BUDGET_MS, CALLER_CONTEXT_TTL, LEAD_CACHE_SIZE
+from .models import CallerInfo, ConversationData, Transcript
 from .utils import save_conversation_data, format_caller_summary, send_to_google_sheets
-from .database import save_caller_info
+from .database import save_caller_info, save_call_data, find_lead_id, get_lead
+from .normalize import caller_phone, phone_number_text
+from .assistant_config import ASSISTANTS, caller_context
+from .cache import LRUCache
+from .jsoncodec import RawJSONResponse
+from .tenants import current_tenant
+from .live import LIVE_CALLS
+from .events import LEAD_EVENTS
+from .tracing import traced
+from .background import spawn
 
 
+async def score_new_leads():
+    """Score leads saved since the last run, off the event loop"""
+    # numpy is only loaded once the first lead arrives, keeping startup fast
+    from .scoring import score_leads
+    await asyncio.to_thread(score_leads, scope="new")
+
+
+# (tenant, caller phone) -> (expires at, returning-caller snippet or None)
+_caller_contexts = LRUCache(LEAD_CACHE_SIZE)
+
+
+def _load_caller_context(phone: str) -> Optional[str]:
+    lead_id = find_lead_id(phone)
+    lead = get_lead(lead_id, recent=0) if lead_id else None
+    context = caller_context(lead) if lead else None
+    _caller_contexts.put((current_tenant().name, phone), (time.monotonic() + CALLER_CONTEXT_TTL, context))
+    return context
+
+
+async def lookup_caller_context(phone: Optional[str]) -> Optional[str]:
+    """
+    Returning-caller snippet for the assistant's prompt, or None
+
+    Vapi holds the call until the assistant-request is answered, so the
+    lookup gets ASSISTANT_REQUEST_BUDGET_MS; past that the call goes ahead
+    without context while the lookup finishes and fills the cache.
+    """
+    if not phone:
+        return None
+    cached = _caller_contexts.get((current_tenant().name, phone))
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(_load_caller_context, phone), ASSISTANT_REQUEST_BUDGET_MS / 1000
+        )
+    except asyncio.TimeoutError:
+        print(f"Caller context lookup over {ASSISTANT_REQUEST_BUDGET_MS:g}ms, answering without it")
+    except Exception as e:
+        print(f"Caller context lookup failed: {e}")
+    return None
+
+
+@traced()
+async def handle_assistant_request(payload: Dict[str, Any]) -> RawJSONResponse:
+    """Answer an inbound call with the dialed brokerage's assistant"""
+    message = payload.get("message", {})
+    call = message.get("call") if isinstance(message.get("call"), dict) else {}
+
+    dialed = message.get("phoneNumber") or call.get("phoneNumber")
+    if isinstance(dialed, dict):
+        dialed = dialed.get("number")
+    brokerage = ASSISTANTS.brokerage_for(dialed)
+
+    customer = call.get("customer")
+    context = await lookup_caller_context(caller_phone({"customer": customer}))
+    return RawJSONResponse(ASSISTANTS.response(brokerage, context))
+
+
+@traced()
 async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process the end-of-call report with full conversation data
@@ -24,17 +96,12 @@ async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
         
         call_id = call_obj.get("id", "unknown")
         assistant_id = call_obj.get("assistantId", "unknown")
+        customer = call_obj.get("customer")
         
-        transcript_messages = []
-        transcript_list = call_data.get("transcript", [])
-        if isinstance(transcript_list, list):
-            for msg in transcript_list:
-                if isinstance(msg, dict):
-                    transcript_messages.append(Message(
-                        role=msg.get("role", "unknown"),
-                        content=msg.get("content", ""),
-                        timestamp=msg.get("timestamp")
-                    ))
+        transcript = Transcript.from_messages(call_data.get("transcript"))
+        # Only the compact copy is kept; Vapi's message log isn't used at all
+        call_data.pop("transcript", None)
+        call_data.pop("messages", None)
         
         caller_info = None
         call_summary = None
@@ -54,14 +121,15 @@ async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
             call_id=call_id,
             assistant_id=assistant_id,
             caller_info=caller_info,
-            transcript=transcript_messages,
+            transcript=transcript,
             call_duration=call_obj.get("duration"),
             call_status=call_obj.get("status"),
             recording_url=call_data.get("recordingUrl"),
             summary=call_summary,
             success_evaluation=success_evaluation,
             metadata={
-                "phone_number": call_obj.get("phoneNumber"),
+                "phone_number": phone_number_text(call_obj.get("phoneNumber")),
+                "customer_number": customer.get("number") if isinstance(customer, dict) else None,
                 "started_at": call_obj.get("startedAt"),
                 "ended_at": call_obj.get("endedAt"),
                 "end_reason": call_data.get("endedReason"),
@@ -70,11 +138,27 @@ async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
             }
         )
         
-        save_conversation_data(conversation, call_id)
+        # The report is the last word on a call, even if its "ended" status update was lost
+        await asyncio.to_thread(LIVE_CALLS.end, call_id, call_data.get("endedReason"))
+        
+        # File and database writes run in the threadpool so other webhooks keep flowing meanwhile
+        await asyncio.to_thread(save_conversation_data, conversation, call_id)
+        # Also stores caller_info and keeps the /db/timeseries rollups current
+        await asyncio.to_thread(save_call_data, conversation)
+        spawn("score_leads", score_new_leads(), call_id)
+        # Publishing writes to the shared state file
+        await asyncio.to_thread(LEAD_EVENTS.publish, "call", {
+            "call_id": call_id,
+            "assistant_id": assistant_id,
+            "duration": conversation.call_duration,
+            "end_reason": call_data.get("endedReason"),
+            "success_evaluation": success_evaluation,
+            "summary": call_summary,
+            "caller_info": caller_info.model_dump(exclude_none=True) if caller_info else None,
+        }, current_tenant().name)
         
         if caller_info:
-            save_caller_info(caller_info, call_id, raw_message=None)
-            await send_to_google_sheets(caller_info, call_id)
+            spawn("send_to_google_sheets", send_to_google_sheets(caller_info, call_id), call_id)
         
         print("\n" + "CALL SUMMARY ".center(60, "="))
         print(f"\nCall ID: {call_id}")
@@ -95,14 +179,14 @@ async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
             print("-" * 60)
             print(format_caller_summary(caller_info))
         
-        if transcript_messages:
-            print(f"\nTRANSCRIPT ({len(transcript_messages)} messages):")
+        if transcript:
+            print(f"\nTRANSCRIPT ({len(transcript)} messages):")
             print("-" * 60)
-            for msg in transcript_messages[:10]:
-                role_label = "ASSISTANT" if msg.role == "assistant" else "USER"
-                print(f"{role_label}: {msg.content[:100]}...")
-            if len(transcript_messages) > 10:
-                print(f"... and {len(transcript_messages) - 10} more messages")
+            for role, content in zip(transcript.roles[:10], transcript.contents[:10]):
+                role_label = "ASSISTANT" if role == "assistant" else "USER"
+                print(f"{role_label}: {content[:100]}...")
+            if len(transcript) > 10:
+                print(f"... and {len(transcript) - 10} more messages")
         
         print("\n" + "=" * 60 + "\n")
         
@@ -110,10 +194,13 @@ async def handle_end_of_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     
     except Exception as e:
         print(f"Error in handle_end_of_call: {str(e)}")
-        print(f"Payload received: {json.dumps(payload, indent=2)}")
+        # Not the payload itself: a long call's report runs to megabytes
+        message = payload.get("message")
+        print(f"Message keys: {list(message.keys()) if isinstance(message, dict) else type(message).__name__}")
         return {"status": "error", "message": str(e)}
 
 
+@traced()
 async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process function calls when assistant collects caller info
@@ -133,7 +220,7 @@ async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     if not function_call:
         function_call = {}
         print("WARNING: No function call found in message!")
-        print(f"Full message: {json.dumps(message, indent=2)}")
+        print(f"Full message: {jsoncodec.dumps(message)}")
     
     tool_call_id = function_call.get("id")
     function_name = function_call.get("name") or function_call.get("function", {}).get("name")
@@ -141,20 +228,25 @@ async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     parameters = function_call.get("parameters") or function_call.get("function", {}).get("arguments", {})
     if isinstance(parameters, str):
         try:
-            parameters = json.loads(parameters)
-        except (json.JSONDecodeError, ValueError):
+            parameters = jsoncodec.loads(parameters)
+        except ValueError:
             parameters = {}
     
     print(f"\nFunction called: {function_name}")
     print(f"Tool Call ID: {tool_call_id}")
-    print(f"Parameters: {json.dumps(parameters, indent=2)}")
+    print(f"Parameters: {jsoncodec.dumps(parameters)}")
     
     if function_name == "submit_caller_information":
         try:
             caller_info = CallerInfo(**parameters)
             
             msg_call_id = message.get("call", {}).get("id", "unknown") if isinstance(message.get("call"), dict) else "unknown"
-            db_id = save_caller_info(caller_info, msg_call_id, raw_message=message)
+            db_id = await asyncio.to_thread(save_caller_info, caller_info, msg_call_id, raw_message=message)
+            spawn("score_leads", score_new_leads(), msg_call_id)
+            await asyncio.to_thread(
+                LEAD_EVENTS.publish, "lead",
+                {"id": db_id, "call_id": msg_call_id, **caller_info.model_dump(exclude_none=True)}, current_tenant().name
+            )
             
             print("\nCALLER INFORMATION SUBMITTED:")
             print("-" * 60)
@@ -162,7 +254,8 @@ async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
             print(f"Database ID: {db_id}")
             print("-" * 60)
             
-            await send_to_google_sheets(caller_info, msg_call_id)
+            # Vapi is waiting on the tool result, so deliver to Sheets after responding
+            spawn("send_to_google_sheets", send_to_google_sheets(caller_info, msg_call_id), msg_call_id)
             
             result_message = "Thank you! I've recorded your information. Our team will reach out to you within 24 hours."
             
@@ -173,7 +266,7 @@ async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
             if tool_call_id:
                 response["toolCallId"] = tool_call_id
             
-            print(f"Returning response: {json.dumps(response, indent=2)}")
+            print(f"Returning response: {jsoncodec.dumps(response)}")
             return response
             
         except Exception as e:
@@ -188,16 +281,25 @@ async def handle_function_call(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {"result": "Function call received"}
 
 
+@traced()
 async def handle_status_update(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Track call status changes"""
     message = payload.get("message", {})
     status = message.get("status")
+    call = message.get("call") if isinstance(message.get("call"), dict) else {}
     
     print(f"Status update: {status}")
+    await asyncio.to_thread(LIVE_CALLS.update_status, call, status, current_tenant().name, message.get("endedReason"))
+    
+    if status == "in-progress":
+        lead_id = await asyncio.to_thread(find_lead_id, caller_phone(call))
+        if lead_id:
+            print(f"Returning caller: lead {lead_id}")
     
     return {"status": "received"}
 
 
+@traced()
 async def handle_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Log transcript as conversation happens"""
     message = payload.get("message", {})
@@ -206,5 +308,7 @@ async def handle_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
     
     if transcript_type == "final":
         print(f"Transcript: {transcript}")
+        call = message.get("call") if isinstance(message.get("call"), dict) else {}
+        await asyncio.to_thread(LIVE_CALLS.add_segment, call, message.get("role"), transcript, current_tenant().name)
     
     return {"status": "received"}
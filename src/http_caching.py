@@ -0,0 +1,102 @@
+"""
+Conditional GETs and compression for single-call reads
+
+A call's transcript and metadata are tens of kilobytes of JSON that rarely
+change once the end-of-call report is in. Responses carry an ETag derived
+from the stored version of the call; a client sending it back in
+If-None-Match gets a bodyless 304, which the routes answer from the
+version alone, before loading the body. Large bodies are compressed with
+brotli (when the optional `brotli` package is installed) or gzip, per the
+client's Accept-Encoding, and the compressed bytes are kept by ETag so
+repeat fetches of the same version don't compress again.
+"""
+import gzip
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from .cache import LRUCache
+from .config import COMPRESS_MIN_BYTES, COMPRESSED_BODY_CACHE_SIZE
+from .jsoncodec import RawJSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Server preference, best first
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Clients may keep the body but must revalidate it before use
+CACHE_HEADERS = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+# (etag, encoding) -> compressed body
+_compressed = LRUCache(COMPRESSED_BODY_CACHE_SIZE)
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from the parts identifying a version of a resource"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag from a body's content"""
+    return f'W/"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag` (compared weakly)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The preferred encoding the client accepts, or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **CACHE_HEADERS})
+
+
+def json_response(request: Request, body: bytes, etag: str) -> Response:
+    """200 with `body`, compressed when it is large enough and the client accepts it"""
+    headers = {"ETag": etag, **CACHE_HEADERS}
+    encoding = negotiate(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        compressed = _compressed.get((etag, encoding))
+        if compressed is None:
+            compressed = _compress(body, encoding)
+            _compressed.put((etag, encoding), compressed)
+        body = compressed
+        headers["Content-Encoding"] = encoding
+    return RawJSONResponse(body, headers=headers)
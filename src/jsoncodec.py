@@ -0,0 +1,75 @@
+"""
+JSON encoding and decoding for the whole app
+
+Webhook bodies, stored transcripts and metadata, log lines, events and API
+responses all go through loads()/dumps()/dumpb() here. With the optional
+`orjson` package installed (`pip install .[speedups]`) they run in native
+code; otherwise they use the standard library. Both produce the same
+compact UTF-8 JSON, so what one writes the other reads back unchanged.
+
+Responses whose body is already encoded JSON (cached responses, call rows
+assembled from the stored JSON text) are sent with RawJSONResponse, which
+passes the bytes through instead of decoding and re-encoding them.
+"""
+import json
+from typing import Any, Callable, Optional, Union
+
+from fastapi.responses import JSONResponse as _JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+# Raised by loads(); orjson's error is a subclass
+JSONDecodeError = json.JSONDecodeError
+
+# Same escaping as the strings inside dumps() output
+encode_string = json.encoder.encode_basestring
+
+
+def _stdlib_dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Compact UTF-8 JSON bytes"""
+    if orjson:
+        try:
+            return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Values orjson rejects but the standard library takes, e.g. integers over 64 bits
+            pass
+    return _stdlib_dumps(value, default).encode()
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Compact JSON text, for TEXT columns, log lines and messages"""
+    if orjson:
+        return dumpb(value, default).decode()
+    return _stdlib_dumps(value, default)
+
+
+class JSONResponse(_JSONResponse):
+    """FastAPI's JSONResponse, encoded with dumpb()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumpb(content)
+
+
+class RawJSONResponse(Response):
+    """A JSON response whose body is already encoded"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, str)):
+            return super().render(content)
+        return dumpb(content)
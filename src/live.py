@@ -0,0 +1,317 @@
+"""
+Calls in progress, shared by every worker process
+
+status-update and final transcript webhooks feed a bounded registry keyed
+by call ID. /calls/live lists what is in progress and
+/calls/live/{call_id}/stream pushes each transcript segment to supervisors
+over SSE as it arrives.
+
+Vapi spreads a call's webhooks over whichever workers accept them, so the
+registry lives in the shared state file (see src/shared_state.py), not in
+process memory or the tenant databases: calls in live_calls, and every
+status change, transcript segment and end in live_events, whose
+autoincrement ID orders them across workers. Each webhook costs one short
+write transaction there. Each worker with supervisors streaming tails
+live_events every EVENT_POLL_INTERVAL seconds (at once for its own writes)
+and hands new events to the streams of their call. Streams are only touched
+from the event loop.
+
+A call leaves the registry when it ends. Calls whose end never arrives
+stop being listed after LIVE_CALL_TTL seconds without news, and beyond
+LIVE_CALLS_MAX only the most recently updated are listed; every
+LIVE_EVICT_INTERVAL seconds a sweep ends those calls for good and deletes
+events nobody can still need. Writes never sweep.
+"""
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import jsoncodec
+from .config import (
+    EVENT_POLL_INTERVAL, LIVE_CALLS_MAX, LIVE_CALL_TTL, LIVE_EVICT_INTERVAL, LIVE_TRANSCRIPT_MAX, STATE_DB_PATH
+)
+from .metrics import REGISTRY
+from .shared_state import connect_state
+
+# Events a supervisor's stream may fall behind by before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Seconds the events of a finished call are kept, so every worker's streams see its `ended`
+ENDED_RETENTION = 60
+
+LIVE_STREAM_DROPPED = REGISTRY.counter(
+    "realflow_live_stream_dropped_total", "Live call events dropped from the queue of a supervisor's stream that fell behind"
+)
+
+_SUMMARY_COLUMNS = "call_id, assistant_id, tenant, customer_number, status, started_at, updated_at, seq"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _summary(row: Tuple) -> Dict[str, Any]:
+    call_id, assistant_id, tenant, customer_number, status, started_at, updated_at, seq = row
+    return {
+        "call_id": call_id,
+        "assistant_id": assistant_id,
+        "tenant": tenant,
+        "customer_number": customer_number,
+        "status": status,
+        "started_at": started_at,
+        "updated_at": updated_at,
+        "segments": seq,
+    }
+
+
+class LiveCallRegistry:
+    """Live calls by ID, in the shared state file"""
+
+    def __init__(self, path: Path, max_calls: int, ttl: float, transcript_max: int = LIVE_TRANSCRIPT_MAX,
+                 poll_interval: float = EVENT_POLL_INTERVAL):
+        self.path = path
+        self.max_calls = max_calls
+        self.ttl = ttl
+        self.transcript_max = transcript_max
+        self.poll_interval = poll_interval
+        # ID of the last live event handed to this worker's streams
+        self.last_id = 0
+        # Calls in progress as of the last sweep, for the gauge
+        self.count = 0
+        self._subscribers: Dict[str, set[asyncio.Queue]] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _write(self, write, *args) -> Any:
+        """Run write(conn, *args) in one transaction, logging rather than raising on failure"""
+        try:
+            conn = connect_state(self.path)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    result = write(conn, *args)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Supervisors missing an update is better than failing the webhook
+            print(f"Could not update live calls: {e}")
+            return None
+        if self._poller is not None:
+            # Writers may be on a threadpool thread; the poller's event loop is woken from its own thread
+            self._poller.get_loop().call_soon_threadsafe(self._wake.set)
+        return result
+
+    @staticmethod
+    def _publish(conn: sqlite3.Connection, call_id: str, event: str, data: Dict[str, Any], seq: Optional[int] = None):
+        conn.execute(
+            "INSERT INTO live_events (call_id, event, seq, data, created) VALUES (?, ?, ?, ?, ?)",
+            (call_id, event, seq, jsoncodec.dumps(data), time.time()),
+        )
+
+    def _touch(self, conn: sqlite3.Connection, call: Dict[str, Any], tenant: Optional[str]) -> Optional[str]:
+        call_id = call.get("id")
+        if not call_id:
+            return None
+        now = _now()
+        customer = call.get("customer") if isinstance(call.get("customer"), dict) else {}
+        conn.execute(
+            f"""
+            INSERT INTO live_calls ({_SUMMARY_COLUMNS}, touched) VALUES (?, ?, ?, ?, NULL, ?, ?, 0, ?)
+            ON CONFLICT (call_id) DO UPDATE SET updated_at = excluded.updated_at, touched = excluded.touched
+            """,
+            (call_id, call.get("assistantId"), tenant, customer.get("number"), now, now, time.time()),
+        )
+        return call_id
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        cutoff = time.time() - self.ttl
+        expired = conn.execute(
+            """
+            SELECT call_id FROM live_calls WHERE touched < ?
+            UNION SELECT call_id FROM (SELECT call_id FROM live_calls ORDER BY touched DESC LIMIT -1 OFFSET ?)
+            """,
+            (cutoff, self.max_calls),
+        ).fetchall()
+        for call_id, in expired:
+            self._end(conn, call_id, "evicted")
+        conn.execute(
+            "DELETE FROM live_events WHERE created < ? AND call_id NOT IN (SELECT call_id FROM live_calls)",
+            (time.time() - ENDED_RETENTION,),
+        )
+        return conn.execute("SELECT COUNT(*) FROM live_calls").fetchone()[0]
+
+    def _end(self, conn: sqlite3.Connection, call_id: Optional[str], reason: Optional[str]):
+        if conn.execute("DELETE FROM live_calls WHERE call_id = ?", (call_id,)).rowcount:
+            self._publish(conn, call_id, "ended", {"reason": reason, "at": _now()})
+
+    def update_status(self, call: Dict[str, Any], status: Optional[str], tenant: Optional[str] = None,
+                      ended_reason: Optional[str] = None):
+        if status == "ended":
+            self.end(call.get("id"), ended_reason)
+            return
+
+        def write(conn):
+            call_id = self._touch(conn, call, tenant)
+            if call_id:
+                at, = conn.execute(
+                    "UPDATE live_calls SET status = ? WHERE call_id = ? RETURNING updated_at", (status, call_id)
+                ).fetchall()[0]
+                self._publish(conn, call_id, "status", {"status": status, "at": at})
+
+        self._write(write)
+
+    def add_segment(self, call: Dict[str, Any], role: Optional[str], text: Optional[str],
+                    tenant: Optional[str] = None):
+        def write(conn):
+            call_id = self._touch(conn, call, tenant)
+            if call_id and text:
+                seq, at = conn.execute(
+                    "UPDATE live_calls SET seq = seq + 1 WHERE call_id = ? RETURNING seq, updated_at", (call_id,)
+                ).fetchall()[0]
+                self._publish(conn, call_id, "transcript", {"seq": seq, "role": role, "text": text, "at": at}, seq)
+                # The latest transcript_max segments are kept for late subscribers
+                conn.execute(
+                    "DELETE FROM live_events WHERE call_id = ? AND event = 'transcript' AND seq <= ?",
+                    (call_id, seq - self.transcript_max),
+                )
+
+        self._write(write)
+
+    def end(self, call_id: Optional[str], reason: Optional[str] = None):
+        """Drop a call, telling its subscribers why"""
+        if call_id:
+            self._write(self._end, call_id, reason)
+
+    def evict(self):
+        """End calls past LIVE_CALL_TTL or beyond max_calls, and drop events of finished calls"""
+        count = self._write(self._evict)
+        if count is not None:
+            self.count = count
+
+    async def evict_periodically(self):
+        """Sweep every LIVE_EVICT_INTERVAL seconds while the app runs"""
+        while True:
+            await asyncio.to_thread(self.evict)
+            await asyncio.sleep(LIVE_EVICT_INTERVAL)
+
+    def _read(self, sql: str, params: Tuple) -> List[Tuple]:
+        conn = connect_state(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """A live call's summary, or None if it isn't in progress"""
+        rows = self._read(
+            f"SELECT {_SUMMARY_COLUMNS} FROM live_calls WHERE call_id = ? AND touched >= ?",
+            (call_id, time.time() - self.ttl),
+        )
+        return _summary(rows[0]) if rows else None
+
+    def transcript(self, call_id: str, after: int = 0, upto: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A live call's kept segments after seq `after`, up to live event `upto`"""
+        rows = self._read(
+            "SELECT data FROM live_events WHERE call_id = ? AND event = 'transcript' AND seq > ? AND id <= ? ORDER BY id",
+            (call_id, after, upto if upto is not None else 2**63 - 1),
+        )
+        return [jsoncodec.loads(data) for data, in rows]
+
+    def calls(self, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Summaries of the live calls, most recently updated first"""
+        rows = self._read(
+            f"SELECT {_SUMMARY_COLUMNS} FROM live_calls WHERE touched >= ? AND (? IS NULL OR tenant = ?) "
+            "ORDER BY touched DESC LIMIT ?",
+            (time.time() - self.ttl, tenant, tenant, self.max_calls),
+        )
+        return [_summary(row) for row in rows]
+
+    def _newest(self) -> int:
+        rows = self._read("SELECT seq FROM sqlite_sequence WHERE name = 'live_events'", ())
+        return rows[0][0] if rows else 0
+
+    async def _poll(self):
+        while self._subscribers:
+            try:
+                rows = await asyncio.to_thread(
+                    self._read, "SELECT id, call_id, event, data FROM live_events WHERE id > ? ORDER BY id",
+                    (self.last_id,),
+                )
+            except sqlite3.Error as e:
+                print(f"Could not read live events: {e}")
+                rows = []
+            for event_id, call_id, event, data in rows:
+                self.last_id = event_id
+                queues = self._subscribers.get(call_id)
+                if not queues:
+                    continue
+                data = jsoncodec.loads(data)
+                for queue in queues:
+                    # A slow supervisor loses its oldest unread event rather than holding up the others
+                    if queue.full():
+                        queue.get_nowait()
+                        LIVE_STREAM_DROPPED.inc()
+                    queue.put_nowait((event, data))
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+        self._poller = None
+
+    async def subscribe(self, call_id: str, after: int = 0) -> Tuple[Optional[Dict[str, Any]], asyncio.Queue, List[Dict[str, Any]]]:
+        """
+        A queue of a call's events, with its summary and its kept segments after seq `after`
+
+        The summary is None (and nothing is subscribed) if the call isn't in progress.
+        """
+        if self._poller is None or self._poller.done():
+            newest = await asyncio.to_thread(self._newest)
+            if self._poller is None or self._poller.done():
+                self.last_id = newest
+                self._wake = asyncio.Event()
+                self._poller = asyncio.create_task(self._poll())
+
+        # Events after `upto` reach the queue through the poller, the rest through the backlog
+        upto = self.last_id
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(call_id, set()).add(queue)
+        summary = await asyncio.to_thread(self.get, call_id)
+        if summary is None:
+            self.unsubscribe(call_id, queue)
+            return None, queue, []
+        return summary, queue, await asyncio.to_thread(self.transcript, call_id, after, upto)
+
+    def unsubscribe(self, call_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(call_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[call_id]
+
+    def queued(self) -> int:
+        """Events waiting in this worker's stream queues"""
+        # Read at scrape time, possibly from a threadpool thread; list() copies without yielding the GIL
+        return sum(queue.qsize() for queues in list(self._subscribers.values()) for queue in list(queues))
+
+    def __len__(self) -> int:
+        rows = self._read("SELECT COUNT(*) FROM live_calls WHERE touched >= ?", (time.time() - self.ttl,))
+        return rows[0][0]
+
+
+LIVE_CALLS = LiveCallRegistry(STATE_DB_PATH, LIVE_CALLS_MAX, LIVE_CALL_TTL)
+
+# Every worker counts the same shared calls, so their values aren't added up
+LIVE_CALLS_GAUGE = REGISTRY.gauge("realflow_live_calls", "Calls in progress in the shared live registry at the last sweep",
+                                  multiprocess_mode="max")
+LIVE_CALLS_GAUGE.set_function(lambda: LIVE_CALLS.count)
+LIVE_STREAM_QUEUED = REGISTRY.gauge("realflow_live_stream_queued",
+                                    "Undelivered events in live call stream queues in this worker")
+LIVE_STREAM_QUEUED.set_function(LIVE_CALLS.queued)
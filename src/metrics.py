@@ -0,0 +1,459 @@
+"""
+In-process metrics registry rendered in Prometheus text exposition format
+
+Recording is a dict lookup plus a couple of integer/float updates, so it is
+cheap enough to sit on the webhook hot path. Values are per-process.
+
+With several workers, set PROMETHEUS_MULTIPROC_DIR (app.py does so in
+production mode). Each worker then writes a snapshot of its values to
+<dir>/<pid>.json every METRICS_WRITE_INTERVAL seconds, and /metrics merges
+every worker's file: counters and histograms are summed, including those
+of workers that have exited, and gauges are combined across live workers
+by their multiprocess_mode. Other workers' values lag by at most one
+interval.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import METRICS_MULTIPROC_DIR, METRICS_WRITE_INTERVAL
+
+# Seconds; covers sub-millisecond SQLite writes up to slow Sheets deliveries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bytes; status updates are a few hundred bytes, end-of-call reports can be megabytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Message types we label individually; anything else is folded into "other"
+# so arbitrary payloads can't blow up label cardinality
+KNOWN_MESSAGE_TYPES = frozenset({
+    "end-of-call-report",
+    "function-call",
+    "tool-calls",
+    "status-update",
+    "transcript",
+    "assistant-request",
+    "conversation-update",
+    "speech-update",
+    "hang",
+})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metric families"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Children are added from the event loop and from threadpool threads (timed_db)
+        # while snapshots and /metrics iterate them
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Return the child for these label values, creating it on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def snapshot(self) -> List[list]:
+        """[label values, state] per child, as JSON-friendly lists"""
+        return [[list(values), self._state(child)] for values, child in self._items()]
+
+    def merged(self, snapshots: Iterable[List[list]]) -> "_Metric":
+        """A copy of this family holding the combined states of several snapshots"""
+        merged = object.__new__(type(self))
+        merged.__dict__.update(self.__dict__)
+        merged._children = {}
+        merged._lock = threading.Lock()
+        for snapshot in snapshots:
+            for values, state in snapshot:
+                merged._merge(merged.labels(*values), state)
+        return merged
+
+    def _state(self, child) -> Any:
+        raise NotImplementedError
+
+    def _merge(self, child, state: Any):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _state(self, child):
+        return child.value
+
+    def _merge(self, child, state):
+        child.value += state
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Evaluate `function` at scrape time instead of tracking a value"""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function else self.value
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, or be computed at scrape time
+
+    multiprocess_mode says how workers' values combine: "sum" for
+    per-worker quantities (in-flight requests), "max" for values every
+    worker reads from shared state.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "sum"):
+        if multiprocess_mode not in ("sum", "max"):
+            raise ValueError(f"Unknown multiprocess_mode: {multiprocess_mode}")
+        super().__init__(name, documentation, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+    def _state(self, child):
+        return child.get()
+
+    def _merge(self, child, state):
+        child.value = max(child.value, state) if self.multiprocess_mode == "max" else child.value + state
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _state(self, child):
+        return [child.counts, child.sum, child.count]
+
+    def _merge(self, child, state):
+        counts, total, count = state
+        child.counts = [a + b for a, b in zip(child.counts, counts)]
+        child.sum += total
+        child.count += count
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metric families rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "sum") -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, multiprocess_mode))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render_merged(self, snapshots: Iterable[Tuple[bool, Dict[str, List[list]]]]) -> str:
+        """Render the combination of (from a live process, snapshot) pairs"""
+        snapshots = list(snapshots)
+        lines = []
+        for name, metric in self._metrics.items():
+            # A gauge from a worker that has exited no longer describes anything
+            parts = [snapshot.get(name, []) for alive, snapshot in snapshots if alive or metric.kind != "gauge"]
+            lines.extend(metric.merged(parts).render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Webhook ingest
+WEBHOOK_REQUESTS = REGISTRY.counter(
+    "realflow_webhook_requests_total",
+    "Webhook deliveries by Vapi message type and outcome",
+    ("message_type", "status"),
+)
+WEBHOOK_LATENCY = REGISTRY.histogram(
+    "realflow_webhook_request_duration_seconds",
+    "Time spent handling a webhook delivery",
+    ("message_type",),
+)
+WEBHOOK_PAYLOAD_BYTES = REGISTRY.histogram(
+    "realflow_webhook_payload_bytes",
+    "Size of webhook request bodies",
+    ("message_type",),
+    buckets=SIZE_BUCKETS,
+)
+WEBHOOK_IN_FLIGHT = REGISTRY.gauge(
+    "realflow_webhook_in_flight",
+    "Webhook deliveries currently being handled",
+)
+
+# SQLite
+DB_LATENCY = REGISTRY.histogram(
+    "realflow_db_operation_duration_seconds",
+    "Latency of functions in src.database",
+    ("function", "kind"),
+)
+DB_ERRORS = REGISTRY.counter(
+    "realflow_db_operation_errors_total",
+    "Exceptions raised by functions in src.database",
+    ("function",),
+)
+
+# Google Sheets
+SHEETS_LATENCY = REGISTRY.histogram(
+    "realflow_sheets_delivery_duration_seconds",
+    "Time spent delivering a row to the Google Sheets webhook",
+    ("outcome",),
+)
+SHEETS_ERRORS = REGISTRY.counter(
+    "realflow_sheets_delivery_errors_total",
+    "Failed Google Sheets deliveries by reason",
+    ("reason",),
+)
+
+
+def message_type_label(message_type: Optional[str]) -> str:
+    """Bound the message_type label to known Vapi types"""
+    if message_type in KNOWN_MESSAGE_TYPES:
+        return message_type
+    return "other" if message_type else "missing"
+
+
+def timed_db(kind: str):
+    """Record latency and errors of a src.database function"""
+    def decorator(func):
+        latency = DB_LATENCY.labels(func.__name__, kind)
+        errors = DB_ERRORS.labels(func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    if kind not in ("write", "query"):
+        raise ValueError(f"Unknown database operation kind: {kind}")
+    return decorator
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def write_snapshot(directory: Path, registry: "Registry" = None, pid: Optional[int] = None):
+    """Replace this process's snapshot file in `directory`"""
+    _write_snapshot_file(directory, (registry or REGISTRY).snapshot(), pid)
+
+
+def _write_snapshot_file(directory: Path, snapshot: Dict[str, List[list]], pid: Optional[int] = None):
+    path = Path(directory) / f"{pid or os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+def read_snapshots(directory: Path) -> List[Tuple[bool, Dict[str, List[list]]]]:
+    """(process alive, snapshot) for every process that has written to `directory`"""
+    snapshots = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            pid = int(path.stem)
+            snapshot = json.loads(path.read_text())
+        except (ValueError, OSError):
+            continue
+        snapshots.append((pid == os.getpid() or _alive(pid), snapshot))
+    return snapshots
+
+
+def clear_snapshots(directory: Path):
+    """Remove snapshots left by a previous run; called before workers start"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+async def write_snapshots_periodically():
+    """Keep this worker's snapshot current while the app runs (multiprocess mode only)"""
+    while True:
+        # Gauge functions read loop-owned state, so the snapshot is taken here; only the file write goes to a thread
+        snapshot = REGISTRY.snapshot()
+        try:
+            await asyncio.to_thread(_write_snapshot_file, METRICS_MULTIPROC_DIR, snapshot)
+        except OSError as e:
+            # The next interval tries again; other workers serve the previous snapshot meanwhile
+            print(f"Could not write metrics snapshot: {e}")
+        await asyncio.sleep(METRICS_WRITE_INTERVAL)
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format, merged across workers when configured"""
+    if not METRICS_MULTIPROC_DIR:
+        return REGISTRY.render()
+    write_snapshot(METRICS_MULTIPROC_DIR)
+    return REGISTRY.render_merged(read_snapshots(METRICS_MULTIPROC_DIR))
@@ -1,6 +1,9 @@
+import sys
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, Iterator
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+
+from . import jsoncodec
 
 
 class CallerInfo(BaseModel):
@@ -25,12 +28,85 @@ class Message(BaseModel):
     timestamp: Optional[str] = None
 
 
+class Transcript:
+    """
+    A call's transcript as columns of role, content and timestamp
+
+    Entries have Message's shape and are validated the same way, but a long
+    call costs three lists instead of one model per message, and the JSON
+    every sink stores is encoded once (see to_json()).
+    """
+    __slots__ = ("roles", "contents", "timestamps", "_json")
+
+    def __init__(self):
+        self.roles: list[str] = []
+        self.contents: list[str] = []
+        self.timestamps: list[Optional[str]] = []
+        self._json: Optional[str] = None
+
+    @classmethod
+    def from_messages(cls, messages: Any) -> "Transcript":
+        """From Vapi's transcript list; anything that isn't a dict is skipped"""
+        if isinstance(messages, Transcript):
+            # Already built while the body was parsed (see src/webhook_body.py)
+            return messages
+        transcript = cls()
+        if not isinstance(messages, list):
+            return transcript
+        for index, message in enumerate(messages):
+            transcript.append(message, index)
+        return transcript
+
+    def append(self, message: Any, index: int):
+        """Add one entry of Vapi's transcript list; anything that isn't a dict is skipped"""
+        if not isinstance(message, dict):
+            return
+        role = message.get("role", "unknown")
+        content = message.get("content", "")
+        timestamp = message.get("timestamp")
+        if not isinstance(role, str) or not isinstance(content, str):
+            raise ValueError(f"transcript[{index}]: role and content must be strings")
+        if timestamp is not None and not isinstance(timestamp, str):
+            raise ValueError(f"transcript[{index}]: timestamp must be a string")
+        # A handful of distinct roles, repeated on every message
+        self.roles.append(sys.intern(role))
+        self.contents.append(content)
+        self.timestamps.append(timestamp)
+        self._json = None
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def __iter__(self) -> Iterator[tuple[str, str, Optional[str]]]:
+        return zip(self.roles, self.contents, self.timestamps)
+
+    def dicts(self) -> list[Dict[str, Any]]:
+        return [{"role": role, "content": content, "timestamp": timestamp} for role, content, timestamp in self]
+
+    def to_json(self) -> str:
+        """Same text as jsoncodec.dumps(self.dicts()), encoded on first use and kept"""
+        if self._json is None:
+            if jsoncodec.orjson:
+                self._json = jsoncodec.dumps(self.dicts())
+            else:
+                # Without building a dict per message
+                encode = jsoncodec.encode_string
+                self._json = "[" + ",".join(
+                    f'{{"role":{encode(role)},"content":{encode(content)},'
+                    f'"timestamp":{"null" if timestamp is None else encode(timestamp)}}}'
+                    for role, content, timestamp in self
+                ) + "]"
+        return self._json
+
+
 class ConversationData(BaseModel):
     """Complete conversation data"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     call_id: str
     assistant_id: str
     caller_info: Optional[CallerInfo] = None
-    transcript: list[Message] = []
+    transcript: Transcript = Field(default_factory=Transcript)
     call_duration: Optional[float] = None
     call_status: Optional[str] = None
     recording_url: Optional[str] = None
@@ -38,3 +114,15 @@ class ConversationData(BaseModel):
     success_evaluation: Optional[str] = None  # Whether call objectives were met
     timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
     metadata: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_serializer("transcript")
+    def _dump_transcript(self, transcript: Transcript) -> list[Dict[str, Any]]:
+        return transcript.dicts()
+
+    def to_json(self) -> str:
+        """Same text as jsoncodec.dumps(self.model_dump()), reusing the transcript's encoded JSON"""
+        dumped = self.model_dump(exclude={"transcript"})
+        return "{" + ",".join(
+            f'"{name}":{self.transcript.to_json() if name == "transcript" else jsoncodec.dumps(dumped[name])}'
+            for name in type(self).model_fields
+        ) + "}"
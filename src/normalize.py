@@ -0,0 +1,202 @@
+"""
+Normalization of free-text caller fields into filterable values
+
+The assistant collects deal size, asset type, location and urgency as
+whatever the caller said ("$2-3M", "warehouse", "Phoenix metro"). These
+helpers turn them into numbers and canonical keys that are stored in
+indexed columns next to the raw submission. Phone numbers are reduced to
+E.164 so a repeat caller maps to the same lead however the number was written.
+"""
+import re
+from typing import Any, Dict, Optional
+
+from .config import DEFAULT_COUNTRY_CODE
+
+# Canonical asset types, checked in order so the more specific names win
+ASSET_TYPES = {
+    "medical_office": ["medical office", "medical", "mob", "clinic"],
+    "mixed_use": ["mixed use", "mixed-use", "mixeduse"],
+    "self_storage": ["self storage", "self-storage", "mini storage", "storage"],
+    "multifamily": ["multifamily", "multi-family", "multi family", "apartment", "apartments", "duplex", "fourplex", "residential"],
+    "industrial": ["industrial", "warehouse", "distribution", "logistics", "flex", "manufacturing"],
+    "hospitality": ["hospitality", "hotel", "motel"],
+    "retail": ["retail", "shopping center", "strip center", "strip mall", "storefront", "restaurant"],
+    "land": ["land", "lot", "lots", "parcel", "acre", "acres"],
+    "office": ["office", "offices"],
+}
+
+_ASSET_PATTERNS = [
+    (asset_type, re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b"))
+    for asset_type, names in ASSET_TYPES.items()
+]
+
+# Values of the urgency enum in the assistant's tool schema, with spoken variants
+URGENCIES = {
+    "immediate": ["immediate", "immediately", "asap", "urgent", "right away", "now"],
+    "within_month": ["within_month", "this month", "within a month", "30 days", "few weeks", "couple weeks", "weeks"],
+    "within_quarter": ["within_quarter", "this quarter", "90 days", "few months", "couple months", "3 months", "three months"],
+    "exploring": ["exploring", "just looking", "browsing", "no rush", "researching", "curious"],
+}
+
+_URGENCY_PATTERNS = [
+    (urgency, re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b"))
+    for urgency, names in URGENCIES.items()
+]
+
+_UNITS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mm": 1e6, "mil": 1e6, "mill": 1e6, "million": 1e6, "millions": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+}
+
+_AMOUNT = re.compile(r"(\d+(?:,\d{3})*(?:\.\d+)?)\s*(thousand|millions?|mill?|mm|bn|billion|k|m|b)?\b")
+_BELOW = re.compile(r"\b(under|below|less than|up to|at most|max(imum)?|no more than)\b")
+_ABOVE = re.compile(r"\b(over|above|more than|at least|min(imum)?|north of|plus)\b|\+")
+
+# Words that qualify a place without changing which market it is
+_MARKET_NOISE = re.compile(r"\b(greater|metro|metropolitan|area|region|downtown|suburbs|suburban|outskirts|city of|near)\b")
+_STATES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "fl", "ga", "hi", "id", "il", "in", "ia", "ks", "ky", "la",
+    "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh", "nj", "nm", "ny", "nc", "nd", "oh", "ok",
+    "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy", "dc",
+}
+
+
+def parse_deal_size(text: Optional[str]) -> tuple[Optional[float], Optional[float]]:
+    """
+    Dollar (min, max) from a spoken deal size
+
+    "$2-3M" -> (2e6, 3e6), "under $750,000" -> (0, 750000), "$25M+" -> (25e6, None).
+    Returns (None, None) when no amount is mentioned.
+    """
+    if not text:
+        return None, None
+    lowered = text.lower()
+
+    amounts = []
+    for number, unit in _AMOUNT.findall(lowered):
+        amounts.append([float(number.replace(",", "")), _UNITS[unit] if unit else None])
+    if not amounts:
+        return None, None
+
+    # "2-3M": a bare number borrows the unit of the next one
+    for index in range(len(amounts) - 2, -1, -1):
+        if amounts[index][1] is None:
+            amounts[index][1] = amounts[index + 1][1]
+    values = [number * (unit or 1) for number, unit in amounts]
+
+    if len(values) >= 2:
+        return min(values[:2]), max(values[:2])
+    if _BELOW.search(lowered):
+        return 0.0, values[0]
+    if _ABOVE.search(lowered):
+        return values[0], None
+    return values[0], values[0]
+
+
+def canonical_asset_type(text: Optional[str]) -> Optional[str]:
+    """One of ASSET_TYPES, "other" for anything unrecognized, or None if empty"""
+    if not text or not text.strip():
+        return None
+    lowered = text.lower().replace("_", " ")
+    for asset_type, pattern in _ASSET_PATTERNS:
+        if pattern.search(lowered):
+            return asset_type
+    return "other"
+
+
+def canonical_urgency(text: Optional[str]) -> Optional[str]:
+    """One of the assistant's urgency values, "unspecified" if unrecognized, or None if empty"""
+    if not text or not text.strip():
+        return None
+    lowered = text.lower()
+    for urgency, pattern in _URGENCY_PATTERNS:
+        if pattern.search(lowered):
+            return urgency
+    return "unspecified"
+
+
+def market_key(text: Optional[str]) -> Optional[str]:
+    """
+    Slug of the city or region a location names
+
+    "Phoenix metro" and "Phoenix, AZ" both give "phoenix"; "Dallas-Fort Worth"
+    gives "dallas-fort-worth". State names after the city are dropped.
+    """
+    if not text or not text.strip():
+        return None
+    place = text.lower().split(",")[0]
+    place = _MARKET_NOISE.sub(" ", place)
+    words = re.findall(r"[a-z0-9]+", place)
+    # "Denver CO"
+    if len(words) > 1 and words[-1] in _STATES:
+        words = words[:-1]
+    return "-".join(words) or None
+
+
+def phone_number_text(value: Any) -> Optional[str]:
+    """A phone number field as text; Vapi sends either a string or a phone number object"""
+    if isinstance(value, dict):
+        value = value.get("number")
+    return value if isinstance(value, str) else None
+
+
+def e164(number: Any, country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    E.164 form of a phone number ("+15125550123"), or None if it can't be one
+
+    Numbers without a leading + are taken as national numbers of
+    DEFAULT_COUNTRY_CODE (NANP by default: 10 digits, or 11 starting with 1).
+    """
+    if not isinstance(number, str):
+        return None
+    text = number.strip()
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("+") or text.startswith("00"):
+        digits = digits[2:] if text.startswith("00") else digits
+    elif country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+        pass
+    elif country_code == "1" and len(digits) == 10:
+        digits = country_code + digits
+    elif country_code != "1" and len(digits) >= 6:
+        digits = country_code + digits.lstrip("0")
+    else:
+        return None
+    # E.164 allows at most 15 digits, and no country code starts with 0
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+    return "+" + digits
+
+
+def caller_phone(call: Optional[Dict[str, Any]] = None, *fallbacks: Any) -> Optional[str]:
+    """
+    E.164 key for the person on a call
+
+    Tries the call's customer.number, then each fallback (e.g. the number the
+    caller gave). call.phoneNumber is the number that was dialed, not the
+    caller's, so it is never used.
+    """
+    candidates = []
+    if isinstance(call, dict):
+        customer = call.get("customer")
+        if isinstance(customer, dict):
+            candidates.append(customer.get("number"))
+    for candidate in (*candidates, *fallbacks):
+        normalized = e164(candidate)
+        if normalized:
+            return normalized
+    return None
+
+
+def normalize_lead(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized column values for a submitted CallerInfo dict"""
+    deal_size_min, deal_size_max = parse_deal_size(fields.get("deal_size"))
+    role = fields.get("caller_role")
+    return {
+        "caller_role": role.strip().lower() if isinstance(role, str) and role.strip() else None,
+        "asset_class": canonical_asset_type(fields.get("asset_type")),
+        "market": market_key(fields.get("location")),
+        "deal_size_min": deal_size_min,
+        "deal_size_max": deal_size_max,
+        "urgency": canonical_urgency(fields.get("urgency")),
+    }
@@ -0,0 +1,182 @@
+"""
+Opt-in profiling of webhook deliveries
+
+Profiles are written to DATA_DIR/profiles as a cProfile dump (`.prof`, open
+with pstats or snakeviz) and a collapsed stack file (`.collapsed`, feed to
+flamegraph.pl or speedscope).
+
+A request is profiled when:
+- PROFILE_WEBHOOKS is enabled, or
+- it carries an X-Profile-Request header signed with WEBHOOK_SECRET, or
+- PROFILE_SLOW_MS is set and the request turns out slower than that
+  (only the sampled stacks are kept in this mode, since a deterministic
+  profiler is too expensive to run on every request)
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .config import (
+    DATA_DIR,
+    WEBHOOK_SECRET,
+    PROFILE_WEBHOOKS,
+    PROFILE_SLOW_MS,
+    PROFILE_SAMPLE_INTERVAL_MS,
+)
+
+PROFILE_DIR = DATA_DIR / "profiles"
+PROFILE_HEADER = b"x-profile-request"
+PROFILE_PATHS = ("/webhook",)
+
+# Signed profile requests are accepted for this long after their timestamp
+SIGNATURE_MAX_AGE_SECONDS = 300
+
+
+def sign_profile_request(timestamp: Optional[int] = None) -> str:
+    """Build an X-Profile-Request header value: `<unix ts>.<hmac-sha256 hex>`"""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    digest = hmac.new(WEBHOOK_SECRET.encode(), str(timestamp).encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{digest}"
+
+
+def verify_profile_request(header_value: str) -> bool:
+    """Check an X-Profile-Request header against WEBHOOK_SECRET"""
+    if not WEBHOOK_SECRET or WEBHOOK_SECRET == "your-webhook-secret-key":
+        return False
+
+    timestamp, _, digest = header_value.partition(".")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+
+    expected = sign_profile_request(int(timestamp)).partition(".")[2]
+    return hmac.compare_digest(expected, digest)
+
+
+class StackSampler:
+    """
+    Single background thread sampling one target thread's stack
+
+    Samples are shared by every active capture, so overlapping requests cost
+    one sampler rather than one thread each.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._captures: list[Counter] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+
+    def start_capture(self) -> Counter:
+        capture = Counter()
+        with self._lock:
+            self._target = threading.get_ident()
+            self._captures.append(capture)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+        return capture
+
+    def stop_capture(self, capture: Counter):
+        with self._lock:
+            self._captures = [c for c in self._captures if c is not capture]
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._captures:
+                    self._thread = None
+                    return
+                captures = list(self._captures)
+                target = self._target
+
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+
+            for capture in captures:
+                capture[key] += 1
+
+
+_sampler = StackSampler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
+_deterministic_lock = threading.Lock()
+
+
+def _write_profile(name: str, samples: Counter, profiler: Optional[cProfile.Profile]) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    base = PROFILE_DIR / name
+
+    if profiler is not None:
+        profiler.dump_stats(f"{base}.prof")
+
+    with open(f"{base}.collapsed", "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+    return base
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles webhook deliveries on demand"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in PROFILE_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        requested = PROFILE_WEBHOOKS
+        if not requested:
+            for key, value in scope["headers"]:
+                if key == PROFILE_HEADER:
+                    requested = verify_profile_request(value.decode("latin-1"))
+                    break
+
+        if not requested and PROFILE_SLOW_MS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        # cProfile can only have one active profiler per interpreter
+        profiler = None
+        if requested and _deterministic_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+
+        samples = _sampler.start_capture()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _deterministic_lock.release()
+            _sampler.stop_capture(samples)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if requested or elapsed_ms >= PROFILE_SLOW_MS:
+            state = scope.get("state", {})
+            label = state.get("call_id") or state.get("message_type") or "webhook"
+            label = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(label))[:64]
+            name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{label}_{elapsed_ms:.0f}ms"
+            base = await asyncio.to_thread(_write_profile, name, samples, profiler)
+            print(f"Saved webhook profile to: {base}.*")
@@ -0,0 +1,69 @@
+"""
+Cached responses for the read API
+
+Entries are keyed on endpoint, tenant and query params and tagged with the
+version of the data they were computed from: the data_versions counters
+the ingest path bumps with every write (see database.bump_versions), or
+the size and mtime of a log file. A request whose version matches the
+entry's is served from memory; any write makes the next request recompute.
+The per-endpoint TTL only bounds staleness from writes that bypass the
+counters, such as editing the database by hand.
+
+Concurrent misses for the same key and version share one computation, so
+a burst of dashboard refreshes after a write costs a single query. Values
+are stored as encoded JSON, so a hit also skips serialization, which for
+transcript-heavy call lists costs more than the query.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable
+
+from . import jsoncodec
+from .cache import LRUCache
+from .metrics import REGISTRY
+
+RESPONSE_CACHE_REQUESTS = REGISTRY.counter(
+    "realflow_response_cache_requests_total",
+    "Read API requests by cache outcome (hit, miss, coalesced)",
+    ("endpoint", "outcome"),
+)
+
+
+def _encode(value: Any) -> bytes:
+    # compute() may assemble the body from stored JSON itself
+    return value if isinstance(value, bytes) else jsoncodec.dumpb(value)
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int):
+        # key -> (version, expires at, value)
+        self._entries = LRUCache(maxsize)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, endpoint: str, key: Hashable, version: Hashable, ttl: float,
+                  compute: Callable[[], Any]) -> bytes:
+        """The JSON body for `key` at `version`, running compute() in a thread on a miss"""
+        entry = self._entries.get(key)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            RESPONSE_CACHE_REQUESTS.labels(endpoint, "hit").inc()
+            return entry[2]
+
+        flight = (key, version)
+        pending = self._inflight.get(flight)
+        if pending is None:
+            RESPONSE_CACHE_REQUESTS.labels(endpoint, "miss").inc()
+            pending = asyncio.ensure_future(self._compute(key, version, ttl, compute))
+            self._inflight[flight] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(flight, None))
+        else:
+            RESPONSE_CACHE_REQUESTS.labels(endpoint, "coalesced").inc()
+        # A client that disconnects mid-computation must not cancel it for the others waiting
+        return await asyncio.shield(pending)
+
+    async def _compute(self, key: Hashable, version: Hashable, ttl: float, compute: Callable[[], Any]) -> bytes:
+        body = await asyncio.to_thread(lambda: _encode(compute()))
+        self._entries.put(key, (version, time.monotonic() + ttl, body))
+        return body
+
+    def clear(self):
+        self._entries.clear()
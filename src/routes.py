@@ -1,13 +1,39 @@
+import asyncio
 import json
-from datetime import datetime
-from typing import Optional
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-from .config import DATA_DIR, WEBHOOK_SECRET, BROKERAGE_NAME
+from .config import DATA_DIR, WEBHOOK_SECRET, BROKERAGE_NAME, RESPONSE_CACHE_SIZE, WEBHOOK_STREAM_PARSE_BYTES
+from .config import CALL_LOG_INDEX_SIZE
 from .utils import verify_webhook_signature
-from .database import get_recent_calls as db_get_recent_calls, get_call_by_id as db_get_call_by_id, get_stats as db_get_stats
+from .webhook_body import read_body, parse_body
+from .tracing import start_span, bind_call_id
+from .background import pending_count
+from .live import LIVE_CALLS
+from .events import LEAD_EVENTS, OVERFLOW_POLICIES
+from .sse import SSE_HEADERS, HEARTBEAT, HEARTBEAT_INTERVAL, TIMED_OUT, format_event, next_or_timeout
+from .tenants import TENANTS, DEFAULT_TENANT_NAME, activate, fan_out, run_as
+from .metrics import WEBHOOK_REQUESTS, WEBHOOK_LATENCY, WEBHOOK_PAYLOAD_BYTES, WEBHOOK_IN_FLIGHT, message_type_label, render_metrics
+from .database import get_recent_calls_json as db_get_recent_calls_json, get_stats as db_get_stats
+from .database import get_call_version as db_get_call_version, get_call_json as db_get_call_json
+from .database import get_timeseries as db_get_timeseries, query_leads as db_query_leads, get_top_leads as db_get_top_leads
+from .database import find_lead_id, get_lead as db_get_lead, data_versions
+from .response_cache import ResponseCache
+from .jsoncodec import RawJSONResponse
+from . import jsoncodec
+from .http_caching import make_etag, content_etag, not_modified, not_modified_response, json_response
+from .storage import LineIndex
+from .database import iter_calls_for_export, iter_leads_for_export, CALL_EXPORT_FIELDS, LEAD_EXPORT_FIELDS
+from .export import parse_time_bound, encode_ndjson, encode_csv, chunked
+from .normalize import canonical_asset_type, canonical_urgency, market_key
 from .handlers import (
+    handle_assistant_request,
     handle_end_of_call,
     handle_function_call,
     handle_status_update,
@@ -36,10 +62,17 @@ async def health_check():
         "status": "healthy",
         "data_directory": str(DATA_DIR),
         "data_directory_exists": DATA_DIR.exists(),
-        "webhook_secret_configured": bool(WEBHOOK_SECRET and WEBHOOK_SECRET != "your-webhook-secret-key")
+        "webhook_secret_configured": bool(WEBHOOK_SECRET and WEBHOOK_SECRET != "your-webhook-secret-key"),
+        "background_tasks_pending": pending_count()
     }
 
 
+@webhook_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics, merged across workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @webhook_router.post("/webhook")
 async def handle_vapi_webhook(
     request: Request,
@@ -48,134 +81,631 @@ async def handle_vapi_webhook(
     """
     Main webhook endpoint for Vapi callbacks
     """
-    try:
-        body = await request.body()
+    start = time.perf_counter()
+    message_label = "missing"
+    status = "error"
+    WEBHOOK_IN_FLIGHT.inc()
+    
+    with start_span("webhook", **{"http.route": "/webhook"}) as span:
+        try:
+            body, size = await read_body(request)
+            with body:
+                if x_vapi_signature and not verify_webhook_signature(body, x_vapi_signature):
+                    raise HTTPException(status_code=401, detail="Invalid webhook signature")
+                body.seek(0)
+                if size > WEBHOOK_STREAM_PARSE_BYTES:
+                    # Spooled to disk; don't hold the event loop while it is read through
+                    payload = await asyncio.to_thread(parse_body, body, size)
+                else:
+                    payload = parse_body(body, size)
         
-        if x_vapi_signature and not verify_webhook_signature(body, x_vapi_signature):
-            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+            message_type = payload.get("message", {}).get("type")
+            message_label = message_type_label(message_type)
+            request.state.message_type = message_label
+            call = payload.get("message", {}).get("call")
+            if isinstance(call, dict) and call.get("id"):
+                request.state.call_id = call["id"]
+                bind_call_id(call["id"])
+            # Everything this delivery writes, now or in background tasks, goes to its tenant's shard
+            tenant = activate(TENANTS.for_call(call, payload.get("message", {}).get("phoneNumber")))
+            if span:
+                span.set_attribute("vapi.message_type", message_type)
+                span.set_attribute("realflow.tenant", tenant.name)
+                span.set_attribute("http.request.body.size", size)
+            WEBHOOK_PAYLOAD_BYTES.labels(message_label).observe(size)
         
-        payload = json.loads(body)
-        message_type = payload.get("message", {}).get("type")
+            # Vapi holds the inbound call until this is answered, so skip the debug output
+            if message_type == "assistant-request":
+                result = await handle_assistant_request(payload)
+                status = "ok"
+                return result
         
-        print(f"\n{'=' * 60}")
-        print(f"Received webhook: {message_type}")
-        print(f"{'=' * 60}")
-        print(f"Payload keys: {list(payload.keys())}")
-        print(f"Message keys: {list(payload.get('message', {}).keys())}")
+            print(f"\n{'=' * 60}")
+            print(f"Received webhook: {message_type}")
+            print(f"{'=' * 60}")
+            print(f"Payload keys: {list(payload.keys())}")
+            print(f"Message keys: {list(payload.get('message', {}).keys())}")
         
-        if message_type == "end-of-call-report":
-            return await handle_end_of_call(payload)
+            if message_type == "end-of-call-report":
+                result = await handle_end_of_call(payload)
         
-        elif message_type == "function-call" or message_type == "tool-calls":
-            return await handle_function_call(payload)
+            elif message_type == "function-call" or message_type == "tool-calls":
+                result = await handle_function_call(payload)
         
-        elif message_type == "status-update":
-            return await handle_status_update(payload)
+            elif message_type == "status-update":
+                result = await handle_status_update(payload)
         
-        elif message_type == "transcript":
-            return await handle_transcript(payload)
+            elif message_type == "transcript":
+                result = await handle_transcript(payload)
         
-        else:
-            print(f"Unhandled message type: {message_type}")
-            return {"status": "received", "message_type": message_type}
+            else:
+                print(f"Unhandled message type: {message_type}")
+                result = {"status": "received", "message_type": message_type}
+        
+            status = "error" if result.get("status") == "error" else "ok"
+            return result
     
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON payload")
-    except Exception as e:
-        print(f"Error processing webhook: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        except jsoncodec.JSONDecodeError:
+            status = "invalid"
+            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        except HTTPException as e:
+            status = "rejected" if e.status_code < 500 else "error"
+            raise
+        except Exception as e:
+            print(f"Error processing webhook: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            WEBHOOK_IN_FLIGHT.dec()
+            WEBHOOK_REQUESTS.labels(message_label, status).inc()
+            WEBHOOK_LATENCY.labels(message_label).observe(time.perf_counter() - start)
+
+
+# Seconds a cached response is served if no write invalidates it first (see src/response_cache.py)
+CACHE_TTLS = {
+    "/calls": 60,
+    "/stats": 60,
+    "/db/calls": 60,
+    "/db/stats": 300,
+    "/db/leads": 60,
+}
+
+RESPONSES = ResponseCache(RESPONSE_CACHE_SIZE)
+
+
+def _file_version(path) -> Optional[tuple]:
+    """Changes whenever a line is appended to `path`"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _call_log_file(tenant: Optional[str]) -> Path:
+    """The all_calls.jsonl of the requested tenant (the default one when unset)"""
+    if tenant == ALL_TENANTS:
+        raise HTTPException(status_code=400, detail="tenant=all is only supported by the /db/* endpoints")
+    return _select_tenant(tenant).data_dir / "all_calls.jsonl"
+
+
+async def _cached_log_read(endpoint: str, params: dict, log_file: Path, compute):
+    key = (endpoint, str(log_file), tuple(sorted(params.items())))
+    body = await RESPONSES.get(endpoint, key, _file_version(log_file), CACHE_TTLS[endpoint], compute)
+    return RawJSONResponse(body)
 
 
 @api_router.get("/calls")
-async def list_calls(limit: int = 50):
+async def list_calls(limit: int = 50, tenant: Optional[str] = None):
     """List recent calls"""
-    log_file = DATA_DIR / "all_calls.jsonl"
+    log_file = _call_log_file(tenant)
     
-    if not log_file.exists():
-        return {"calls": [], "total": 0}
+    def compute():
+        if not log_file.exists():
+            return {"calls": [], "total": 0}
+        
+        # The logged lines are already JSON; only the last `limit` are kept while reading
+        with open(log_file, "rb") as f:
+            lines = deque((line.rstrip(b"\n") for line in f if line.strip()), maxlen=limit) if limit > 0 else []
+        
+        return b'{"calls":[' + b",".join(reversed(lines)) + b'],"total":%d}' % len(lines)
     
-    calls = []
-    with open(log_file, "r") as f:
-        for line in f:
-            calls.append(json.loads(line))
+    return await _cached_log_read("/calls", {"limit": limit}, log_file, compute)
+
+
+# Registered before /calls/{call_id}, which would otherwise match "live"
+@api_router.get("/calls/live")
+def list_live_calls(tenant: Optional[str] = None):
+    """Calls in progress, most recently active first"""
+    calls = LIVE_CALLS.calls(tenant)
+    return {"calls": calls, "total": len(calls)}
+
+
+@api_router.get("/calls/live/{call_id}")
+def get_live_call(call_id: str):
+    """A call in progress with its transcript so far"""
+    live = LIVE_CALLS.get(call_id)
     
-    calls = calls[-limit:][::-1]
+    if not live:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} is not in progress")
     
-    return {"calls": calls, "total": len(calls)}
+    return {**live, "transcript": LIVE_CALLS.transcript(call_id)}
+
+
+@api_router.get("/calls/live/{call_id}/stream")
+async def stream_live_call(call_id: str, request: Request, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events for a call in progress
+    
+    Opens with a `call` event and the transcript so far (after Last-Event-ID
+    when reconnecting), then pushes `transcript` and `status` events as the
+    webhooks arrive, and `ended` before closing.
+    """
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    # Subscribes before reading the backlog, so no segment is missed or repeated
+    live, queue, backlog = await LIVE_CALLS.subscribe(call_id, after)
+    if not live:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} is not in progress")
+    
+    async def events():
+        try:
+            yield format_event(live, "call")
+            for segment in backlog:
+                yield format_event(segment, "transcript", segment["seq"])
+            while True:
+                item = await next_or_timeout(queue)
+                if item is TIMED_OUT:
+                    if await request.is_disconnected():
+                        return
+                    yield HEARTBEAT
+                    continue
+                event, data = item
+                yield format_event(data, event, data["seq"] if event == "transcript" else None)
+                if event == "ended":
+                    return
+        finally:
+            LIVE_CALLS.unsubscribe(call_id, queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# save_conversation_data() logs ConversationData, whose first field is the call ID
+CALL_LOG_PREFIX = b'{"call_id":'
+
+
+def _logged_call_id(line: bytes) -> Optional[str]:
+    try:
+        if line.startswith(CALL_LOG_PREFIX):
+            # Lines written before the compact encoding have a space after the colon
+            return json.JSONDecoder().raw_decode(line[len(CALL_LOG_PREFIX):].decode().lstrip())[0]
+        return jsoncodec.loads(line).get("call_id")
+    except (ValueError, AttributeError):
+        return None
+
+
+# Index of each tenant's call log, by path
+CALL_LOGS: Dict[Path, LineIndex] = {}
 
 
 @api_router.get("/calls/{call_id}")
-async def get_call(call_id: str):
-    """Get specific call data"""
-    log_file = DATA_DIR / "all_calls.jsonl"
+def get_call(call_id: str, request: Request, tenant: Optional[str] = None):
+    """
+    Get specific call data
+    
+    Served as logged, with an ETag from the line's content for If-None-Match.
+    A def, so the log reads run in the threadpool.
+    """
+    log_file = _call_log_file(tenant)
     
     if not log_file.exists():
         raise HTTPException(status_code=404, detail="No calls found")
     
-    with open(log_file, "r") as f:
-        for line in f:
-            call_data = json.loads(line)
-            if call_data.get("call_id") == call_id:
-                return call_data
+    call_log = CALL_LOGS.get(log_file)
+    if call_log is None:
+        call_log = CALL_LOGS.setdefault(log_file, LineIndex(log_file, _logged_call_id, CALL_LOG_INDEX_SIZE))
+    line = call_log.read(call_id)
+    if line is None:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} not found")
     
-    raise HTTPException(status_code=404, detail=f"Call {call_id} not found")
+    etag = content_etag(line)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return json_response(request, line, etag)
 
 
 @api_router.get("/stats")
-async def get_statistics():
+async def get_statistics(tenant: Optional[str] = None):
     """Get call statistics"""
-    log_file = DATA_DIR / "all_calls.jsonl"
+    log_file = _call_log_file(tenant)
     
-    if not log_file.exists():
-        return {"total_calls": 0, "stats": {}}
-    
-    total_calls = 0
-    total_duration = 0
-    roles = {}
-    asset_types = {}
-    
-    with open(log_file, "r") as f:
-        for line in f:
-            call_data = json.loads(line)
-            total_calls += 1
-            
-            if call_data.get("call_duration"):
-                total_duration += call_data["call_duration"]
-            
-            if call_data.get("caller_info"):
-                info = call_data["caller_info"]
-                if info.get("caller_role"):
-                    roles[info["caller_role"]] = roles.get(info["caller_role"], 0) + 1
-                if info.get("asset_type"):
-                    asset_types[info["asset_type"]] = asset_types.get(info["asset_type"], 0) + 1
+    def compute():
+        if not log_file.exists():
+            return {"total_calls": 0, "stats": {}}
+        
+        total_calls = 0
+        total_duration = 0
+        roles = {}
+        asset_types = {}
+        
+        with open(log_file, "r") as f:
+            for line in f:
+                call_data = jsoncodec.loads(line)
+                total_calls += 1
+                
+                if call_data.get("call_duration"):
+                    total_duration += call_data["call_duration"]
+                
+                if call_data.get("caller_info"):
+                    info = call_data["caller_info"]
+                    if info.get("caller_role"):
+                        roles[info["caller_role"]] = roles.get(info["caller_role"], 0) + 1
+                    if info.get("asset_type"):
+                        asset_types[info["asset_type"]] = asset_types.get(info["asset_type"], 0) + 1
+        
+        return {
+            "total_calls": total_calls,
+            "average_duration": total_duration / total_calls if total_calls > 0 else 0,
+            "caller_roles": roles,
+            "asset_types": asset_types
+        }
     
-    return {
+    return await _cached_log_read("/stats", {}, log_file, compute)
+
+
+# `tenant=all` on a /db/* endpoint queries every tenant's shard
+ALL_TENANTS = "all"
+
+
+def _select_tenant(tenant: Optional[str]):
+    selected = TENANTS.get(tenant or DEFAULT_TENANT_NAME)
+    if not selected:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant {tenant}")
+    return selected
+
+
+def _per_tenant(tenant: Optional[str], func, *args, **kwargs) -> dict:
+    """
+    Tenant name -> func's result on that tenant's shard
+    
+    One entry for a named tenant (the default one when unset), one per
+    tenant for `tenant=all`, with the shards queried in parallel.
+    """
+    if tenant == ALL_TENANTS:
+        return fan_out(func, *args, **kwargs)
+    selected = _select_tenant(tenant)
+    return {selected.name: run_as(selected, func, *args, **kwargs)}
+
+
+async def _cached_db_read(endpoint: str, params: dict, scopes: tuple, compute):
+    """
+    compute() through the response cache, versioned by the data `scopes` of the requested shard
+    
+    Fan-out reads (tenant=all) aren't cached.
+    """
+    tenant = params.get("tenant")
+    if tenant == ALL_TENANTS:
+        return RawJSONResponse(await asyncio.to_thread(compute))
+    selected = _select_tenant(tenant)
+    key = (endpoint, selected.name, tuple(sorted(params.items())))
+    version = await asyncio.to_thread(run_as, selected, data_versions, *scopes)
+    body = await RESPONSES.get(endpoint, key, version, CACHE_TTLS[endpoint], compute)
+    return RawJSONResponse(body)
+
+
+def _merge_rows(results: dict, sort_key, limit: int) -> list:
+    """One list from per-tenant lists, each row tagged with its tenant"""
+    if len(results) == 1:
+        return next(iter(results.values()))
+    rows = [{**row, "tenant": name} for name, tenant_rows in results.items() for row in tenant_rows]
+    rows.sort(key=sort_key, reverse=True)
+    return rows[:limit]
+
+
+def _merge_stats(results: dict) -> dict:
+    if len(results) == 1:
+        return next(iter(results.values()))
+    total_calls = sum(stats["total_calls"] for stats in results.values())
+    merged = {
         "total_calls": total_calls,
-        "average_duration": total_duration / total_calls if total_calls > 0 else 0,
-        "caller_roles": roles,
-        "asset_types": asset_types
+        "total_submissions": sum(stats["total_submissions"] for stats in results.values()),
+        "average_duration": round(
+            sum(stats["average_duration"] * stats["total_calls"] for stats in results.values()) / total_calls, 2
+        ) if total_calls else 0,
+        "caller_roles": {},
+        "asset_types": {},
     }
+    for stats in results.values():
+        for field in ("caller_roles", "asset_types"):
+            for value, count in stats[field].items():
+                merged[field][value] = merged[field].get(value, 0) + count
+    merged["tenants"] = results
+    return merged
 
 
 @api_router.get("/db/calls")
-async def list_calls_from_db(limit: int = 50):
+async def list_calls_from_db(limit: int = 50, tenant: Optional[str] = None):
     """List recent calls from SQLite database"""
-    calls = db_get_recent_calls(limit)
-    return {"calls": calls, "total": len(calls), "source": "database"}
+    def compute():
+        # Assembled from the stored JSON; see database.get_recent_calls_json
+        results = _per_tenant(tenant, db_get_recent_calls_json, limit, tag_tenant=tenant == ALL_TENANTS)
+        calls = [call for rows in results.values() for call in rows]
+        if len(results) > 1:
+            calls.sort(key=lambda call: call[0] or "", reverse=True)
+            calls = calls[:limit]
+        return b'{"calls":[' + b",".join(body for _, body in calls) + b'],"total":%d,"source":"database"}' % len(calls)
+    
+    return await _cached_db_read("/db/calls", {"limit": limit, "tenant": tenant}, ("calls",), compute)
 
 
 @api_router.get("/db/calls/{call_id}")
-async def get_call_from_db(call_id: str):
-    """Get specific call data from SQLite database"""
-    call_data = db_get_call_by_id(call_id)
+def get_call_from_db(call_id: str, request: Request, tenant: Optional[str] = None):
+    """
+    Get specific call data from SQLite database
+    
+    If-None-Match is checked against the stored version before the call is loaded.
+    """
+    versions = {name: version for name, version in _per_tenant(tenant, db_get_call_version, call_id).items() if version}
+    
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} not found in database")
     
-    if not call_data:
+    name, version = next(iter(versions.items()))
+    etag = make_etag(name, tenant == ALL_TENANTS, *version)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    extra = {"tenant": name} if tenant == ALL_TENANTS else None
+    found = run_as(TENANTS.get(name), db_get_call_json, call_id, extra)
+    if not found:
         raise HTTPException(status_code=404, detail=f"Call {call_id} not found in database")
     
-    return call_data
+    version, body = found
+    return json_response(request, body, make_etag(name, tenant == ALL_TENANTS, *version))
 
 
 @api_router.get("/db/stats")
-async def get_database_statistics():
+async def get_database_statistics(tenant: Optional[str] = None):
     """Get call statistics from SQLite database"""
-    return db_get_stats()
+    return await _cached_db_read(
+        "/db/stats", {"tenant": tenant}, ("calls", "leads"), lambda: _merge_stats(_per_tenant(tenant, db_get_stats))
+    )
+
+
+@api_router.get("/db/leads")
+async def list_leads_from_db(market: Optional[str] = None, asset_type: Optional[str] = None,
+                             urgency: Optional[str] = None, caller_role: Optional[str] = None,
+                             min_deal_size: Optional[float] = None, max_deal_size: Optional[float] = None,
+                             since: Optional[str] = None, until: Optional[str] = None,
+                             cursor: Optional[int] = None, limit: int = 50, tenant: Optional[str] = None):
+    """Filter leads on their normalized market, asset type, urgency, role and deal size, newest first"""
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    if cursor is not None and tenant == ALL_TENANTS:
+        raise HTTPException(status_code=400, detail="cursor pages through a single tenant")
+    try:
+        since, until = parse_time_bound(since), parse_time_bound(until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Filters go through the same normalization as the stored values, so "Phoenix, AZ" finds "phoenix"
+    filters = {
+        "market": market_key(market) if market else None,
+        "asset_class": canonical_asset_type(asset_type) if asset_type else None,
+        "urgency": canonical_urgency(urgency) if urgency else None,
+        "caller_role": caller_role.strip().lower() if caller_role else None,
+        "min_deal_size": min_deal_size,
+        "max_deal_size": max_deal_size,
+        "since": since,
+        "until": until,
+        "before_id": cursor,
+        "limit": limit,
+    }
+    
+    def compute():
+        results = _per_tenant(tenant, db_query_leads, **filters)
+        leads = _merge_rows(results, lambda lead: (lead["submitted_at"] or "", lead["id"]), limit)
+        next_cursor = leads[-1]["id"] if len(leads) == limit and len(results) == 1 else None
+        return {"leads": leads, "total": len(leads), "next_cursor": next_cursor, "source": "database"}
+    
+    # Keyed on the normalized filters, so "Phoenix, AZ" and "phoenix" share an entry
+    return await _cached_db_read("/db/leads", {**filters, "tenant": tenant}, ("leads",), compute)
+
+
+@api_router.get("/db/leads/top")
+def list_top_leads_from_db(limit: int = 20, market: Optional[str] = None, asset_type: Optional[str] = None,
+                           tenant: Optional[str] = None):
+    """Leads ranked by their persisted priority score (see src/scoring.py)"""
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    
+    # Imported here so numpy isn't loaded at startup
+    from .scoring import load_weights
+    
+    weights = load_weights()
+    results = _per_tenant(
+        tenant,
+        db_get_top_leads,
+        limit=limit,
+        market=market_key(market) if market else None,
+        asset_class=canonical_asset_type(asset_type) if asset_type else None,
+        recency_per_day=weights["recency_per_day"],
+        recency_horizon_days=weights["recency_horizon_days"],
+    )
+    # Priorities share one scale across tenants, the weights being deployment-wide
+    leads = _merge_rows(results, lambda lead: lead["priority"], limit)
+    return {"leads": leads, "total": len(leads), "source": "database"}
+
+
+@api_router.get("/db/leads/by-phone/{phone}")
+def get_lead_by_phone(phone: str, tenant: Optional[str] = None):
+    """Has this number called before? The merged lead for a phone number in any format"""
+    def lookup():
+        lead_id = find_lead_id(phone)
+        return db_get_lead(lead_id) if lead_id else None
+    
+    found = {name: lead for name, lead in _per_tenant(tenant, lookup).items() if lead}
+    
+    if not found:
+        raise HTTPException(status_code=404, detail=f"No lead for {phone}")
+    
+    # Each tenant keeps its own lead for a number
+    return {"leads": found} if tenant == ALL_TENANTS else next(iter(found.values()))
+
+
+# Range covered when /db/timeseries is called without `since`
+DEFAULT_TIMESERIES_RANGE = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+
+
+@api_router.get("/db/timeseries")
+def get_database_timeseries(bucket: str = "hour", since: Optional[str] = None, until: Optional[str] = None,
+                            assistant_id: Optional[str] = None, by_assistant: bool = False,
+                            tenant: Optional[str] = None):
+    """Calls, duration percentiles, cost and outcome breakdowns per hour or day, from the rollup tables"""
+    if bucket not in DEFAULT_TIMESERIES_RANGE:
+        raise HTTPException(status_code=400, detail="bucket must be hour or day")
+    
+    try:
+        until = parse_time_bound(until) or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        since = parse_time_bound(since) or (
+            datetime.fromisoformat(until) - DEFAULT_TIMESERIES_RANGE[bucket]
+        ).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    
+    results = _per_tenant(tenant, db_get_timeseries, bucket, since, until, assistant_id, by_assistant)
+    if tenant == ALL_TENANTS:
+        # Duration percentiles can't be combined across shards, so each tenant keeps its own series
+        return {"bucket": bucket, "since": since, "until": until, "tenants": results}
+    return {"bucket": bucket, "since": since, "until": until, "series": next(iter(results.values()))}
+
+
+# Leads default to the flattened submission; the raw JSON columns are opt-in
+DEFAULT_LEAD_EXPORT_FIELDS = [field for field in LEAD_EXPORT_FIELDS if field not in ("arguments", "raw_payload")]
+
+
+def _export_response(iter_rows, default_fields: list[str], name: str, format: str, fields: Optional[str],
+                     since: Optional[str], until: Optional[str], gzip: bool, tenant: Optional[str]) -> StreamingResponse:
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    # The rows are read while the response streams, still in this request's context
+    activate(_select_tenant(tenant))
+    
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else default_fields
+    try:
+        rows = iter_rows(selected, parse_time_bound(since), parse_time_bound(until))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    encoded = encode_ndjson(rows, selected) if format == "ndjson" else encode_csv(rows, selected)
+    filename = f"{name}.{format}" + (".gz" if gzip else "")
+    # A gzip download is a .gz file, not a compressed transfer of the plain one that clients would undo
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    
+    return StreamingResponse(
+        chunked(encoded, compress=gzip),
+        media_type="application/gzip" if gzip else media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@api_router.get("/db/export/calls")
+async def export_calls(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    gzip: bool = False,
+    tenant: Optional[str] = None
+):
+    """Stream calls as NDJSON or CSV, optionally filtered by created_at range and fields"""
+    return _export_response(iter_calls_for_export, list(CALL_EXPORT_FIELDS), "calls", format, fields, since, until, gzip, tenant)
+
+
+@api_router.get("/db/export/leads")
+async def export_leads(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    gzip: bool = False,
+    tenant: Optional[str] = None
+):
+    """Stream caller information as NDJSON or CSV, optionally filtered by submitted_at range and fields"""
+    return _export_response(iter_leads_for_export, DEFAULT_LEAD_EXPORT_FIELDS, "leads", format, fields, since, until, gzip, tenant)
+
+
+async def _event_subscription(tenant: Optional[str], policy: str, last_event_id: Optional[str]):
+    if policy not in OVERFLOW_POLICIES:
+        raise HTTPException(status_code=400, detail=f"policy must be one of {', '.join(OVERFLOW_POLICIES)}")
+    if tenant:
+        _select_tenant(tenant)
+    resume_after = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return await LEAD_EVENTS.subscribe(tenant, policy, resume_after)
+
+
+@api_router.get("/events/leads")
+async def stream_lead_events(request: Request, tenant: Optional[str] = None, policy: str = "drop-oldest",
+                             last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events for new leads (`lead`) and finished calls (`call`)
+    
+    Reconnecting with Last-Event-ID replays what was missed; a `reset` event
+    means too much was missed and the client should reload from /db/*.
+    `policy` picks what happens when this client falls EVENT_SUBSCRIBER_BUFFER
+    events behind: `drop-oldest` skips events, `disconnect` closes the stream.
+    """
+    subscriber, backlog = await _event_subscription(tenant, policy, last_event_id)
+    
+    async def events():
+        try:
+            if backlog is None:
+                yield format_event({"last_event_id": LEAD_EVENTS.last_id}, "reset", LEAD_EVENTS.last_id)
+            for event in backlog or []:
+                yield event.sse
+            while not subscriber.overflowed:
+                pending = await subscriber.wait(HEARTBEAT_INTERVAL)
+                if not pending:
+                    if await request.is_disconnected():
+                        return
+                    yield HEARTBEAT
+                for event in pending:
+                    yield event.sse
+            yield format_event({"buffer_size": LEAD_EVENTS.buffer_size}, "overflow")
+        finally:
+            LEAD_EVENTS.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+HEARTBEAT_MESSAGE = jsoncodec.dumps({"event": "heartbeat"})
+
+
+@api_router.websocket("/events/leads/ws")
+async def lead_events_websocket(websocket: WebSocket, tenant: Optional[str] = None, policy: str = "drop-oldest",
+                                last_event_id: Optional[str] = None):
+    """The /events/leads stream over a WebSocket, one JSON message per event"""
+    try:
+        subscriber, backlog = await _event_subscription(tenant, policy, last_event_id)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    await websocket.accept()
+    try:
+        if backlog is None:
+            await websocket.send_text(jsoncodec.dumps({"id": LEAD_EVENTS.last_id, "event": "reset", "data": {}}))
+        for event in backlog or []:
+            await websocket.send_text(event.text)
+        while not subscriber.overflowed:
+            pending = await subscriber.wait(HEARTBEAT_INTERVAL)
+            # Also how a client that went away without closing is noticed
+            if not pending:
+                await websocket.send_text(HEARTBEAT_MESSAGE)
+            for event in pending:
+                await websocket.send_text(event.text)
+        await websocket.close(code=1013, reason="Subscriber fell too far behind")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        LEAD_EVENTS.unsubscribe(subscriber)
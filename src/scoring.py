@@ -0,0 +1,186 @@
+"""
+Batch lead scoring
+
+Each lead's features (urgency, caller role, deal size, whether the call's
+success evaluation passed, submission time) are pulled from SQLite a batch
+at a time into NumPy arrays and combined with configurable weights. Scores
+are persisted to caller_information.score for /db/leads/top.
+
+The persisted score holds the feature points only. Recency is applied when
+leads are ranked (database.get_top_leads): a lead loses recency_per_day
+points for each day since it was submitted, up to recency_horizon_days, so
+a strong lead from last month still outranks a weak one from today, and
+nobody has to rescore leads as time passes. A lead needs scoring only when
+it is new, its call's evaluation arrives, or the weights change.
+"""
+import copy
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .config import LEAD_SCORE_WEIGHTS_FILE
+from .database import connect, bump_versions
+
+DEFAULT_WEIGHTS: Dict[str, Any] = {
+    # Points contributed by each feature at its best value
+    "urgency": 30.0,
+    "caller_role": 20.0,
+    "deal_size": 25.0,
+    "success": 15.0,
+    # Points a lead loses against a brand new one for each day of age, counted up to the horizon
+    "recency_per_day": 1.0,
+    "recency_horizon_days": 30,
+    "urgency_levels": {
+        "immediate": 1.0,
+        "within_month": 0.75,
+        "within_quarter": 0.5,
+        "exploring": 0.2,
+        "unspecified": 0.1,
+    },
+    "caller_role_levels": {
+        "owner": 1.0,
+        "buyer": 0.9,
+        "investor": 0.9,
+        "landlord": 0.7,
+        "tenant": 0.6,
+        "lender": 0.4,
+        "broker": 0.4,
+        "other": 0.2,
+    },
+    # Deal sizes score on a log scale from 0 at the floor to 1 at the ceiling
+    "deal_size_floor": 100_000,
+    "deal_size_ceiling": 100_000_000,
+    # Evaluations that count as a pass; numeric rubrics pass at or above the threshold
+    "success_values": ["true", "pass", "passed", "yes", "success", "successful", "excellent", "good", "agree", "strongly agree"],
+    "success_threshold": 7,
+}
+
+BATCH_SIZE = 10_000
+
+
+# Parsed weights files by path, with the (mtime, size) they were read at
+_LOADED_WEIGHTS: Dict[str, tuple[tuple[int, int], Dict[str, Any]]] = {}
+
+
+def load_weights(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    DEFAULT_WEIGHTS overridden by a JSON file (LEAD_SCORE_WEIGHTS_FILE by default)
+
+    The file is read again only when its mtime or size changes. Each call
+    returns its own copy.
+    """
+    path = path or LEAD_SCORE_WEIGHTS_FILE
+    if not path:
+        return copy.deepcopy(DEFAULT_WEIGHTS)
+
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    loaded = _LOADED_WEIGHTS.get(path)
+    if loaded is None or loaded[0] != stamp:
+        with open(path, "rb") as f:
+            weights = {**copy.deepcopy(DEFAULT_WEIGHTS), **json.load(f)}
+        loaded = _LOADED_WEIGHTS[path] = (stamp, weights)
+    return copy.deepcopy(loaded[1])
+
+
+def weights_version(weights: Dict[str, Any]) -> str:
+    """Stored with each score so a change of weights marks every lead for rescoring"""
+    return hashlib.sha1(json.dumps(weights, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _feature_query(weights: Dict[str, Any]) -> tuple[str, list[Any]]:
+    """Per-lead feature columns, with categorical levels resolved in SQL"""
+    params: list[Any] = []
+
+    def levels(column: str, mapping: Dict[str, float]) -> str:
+        cases = " ".join("WHEN ? THEN ?" for _ in mapping)
+        for value, level in mapping.items():
+            params.extend([value, level])
+        return f"CASE {column} {cases} ELSE 0.0 END"
+
+    urgency = levels("ci.urgency", weights["urgency_levels"])
+    role = levels("ci.caller_role", weights["caller_role_levels"])
+    passing = ", ".join("?" for _ in weights["success_values"])
+    params.extend(weights["success_values"])
+    params.append(weights["success_threshold"])
+
+    query = f"""
+        SELECT ci.id,
+               {urgency},
+               {role},
+               COALESCE((ci.deal_size_min + ci.deal_size_max) / 2, ci.deal_size_min, ci.deal_size_max),
+               CASE WHEN lower(trim(c.success_evaluation)) IN ({passing}) THEN 1.0
+                    WHEN CAST(c.success_evaluation AS REAL) >= ? THEN 1.0
+                    ELSE 0.0 END
+        FROM caller_information ci
+        LEFT JOIN calls c ON c.call_id = ci.call_id
+    """
+    return query, params
+
+
+def score_features(features: np.ndarray, weights: Dict[str, Any]) -> np.ndarray:
+    """
+    Scores for a (rows, 4) array of urgency, role, deal size, success
+
+    Missing values (NaN) contribute nothing.
+    """
+    urgency, role, deal_size, success = np.nan_to_num(features, nan=0.0).T
+
+    floor, ceiling = np.log10(weights["deal_size_floor"]), np.log10(weights["deal_size_ceiling"])
+    with np.errstate(divide="ignore"):
+        deal_level = np.clip((np.log10(deal_size) - floor) / (ceiling - floor), 0.0, 1.0)
+
+    return (
+        weights["urgency"] * urgency
+        + weights["caller_role"] * role
+        + weights["deal_size"] * deal_level
+        + weights["success"] * success
+    )
+
+
+# Which leads score_leads() picks up
+SCOPES = {
+    "new": "ci.score IS NULL",  # indexed; what runs after each ingest
+    "stale": "(ci.score IS NULL OR ci.score_version IS NOT ?)",  # also leads scored with other weights
+    "all": "1",
+}
+
+
+def score_leads(weights: Optional[Dict[str, Any]] = None, scope: str = "stale", batch_size: int = BATCH_SIZE) -> int:
+    """Score the leads in `scope` (see SCOPES); returns how many were scored"""
+    weights = weights or load_weights()
+    version = weights_version(weights)
+    query, params = _feature_query(weights)
+    condition = SCOPES[scope]
+    if scope == "stale":
+        params.append(version)
+
+    conn = connect()
+    scored, last_id = 0, 0
+    try:
+        while True:
+            rows = conn.execute(
+                f"{query} WHERE {condition} AND ci.id > ? ORDER BY ci.id LIMIT ?", params + [last_id, batch_size]
+            ).fetchall()
+            if not rows:
+                break
+
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            features = np.array([row[1:] for row in rows], dtype=np.float64)
+            scores = score_features(features, weights)
+
+            with conn:
+                conn.executemany(
+                    "UPDATE caller_information SET score = ?, score_version = ? WHERE id = ?",
+                    zip(np.round(scores, 4).tolist(), [version] * len(rows), ids.tolist()),
+                )
+                bump_versions(conn, "leads")
+            scored += len(rows)
+            last_id = int(ids[-1])
+    finally:
+        conn.close()
+    return scored
+
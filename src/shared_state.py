@@ -0,0 +1,68 @@
+"""
+State shared by every worker process, in a small SQLite file
+
+Lead events (src/events.py) and calls in progress (src/live.py) must look
+the same whichever worker a client is connected to, so they are kept in
+STATE_DB_PATH rather than in process memory. Unlike the tenant shards, this file holds only short-lived state:
+it can be deleted while the server is stopped.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+# Seconds a connection waits for another worker's write lock before failing
+BUSY_TIMEOUT = 5
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS lead_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        tenant TEXT,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS live_calls (
+        call_id TEXT PRIMARY KEY,
+        assistant_id TEXT,
+        tenant TEXT,
+        customer_number TEXT,
+        status TEXT,
+        started_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        seq INTEGER NOT NULL DEFAULT 0,
+        touched REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_live_calls_touched ON live_calls(touched);
+    CREATE TABLE IF NOT EXISTS live_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        call_id TEXT NOT NULL,
+        event TEXT NOT NULL,
+        seq INTEGER,
+        data TEXT NOT NULL,
+        created REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_live_events_call ON live_events(call_id, id);
+    CREATE INDEX IF NOT EXISTS idx_live_events_created ON live_events(created);
+"""
+
+# Files whose tables exist in this process
+_ready: set[Path] = set()
+_ready_lock = threading.Lock()
+
+
+def connect_state(path: Path) -> sqlite3.Connection:
+    """Open the shared state file, creating its tables on first use in this process"""
+    if path not in _ready:
+        with _ready_lock:
+            if path not in _ready:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+                try:
+                    # WAL is persistent, so setting it once covers every later connection
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                finally:
+                    conn.close()
+                _ready.add(path)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
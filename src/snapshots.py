@@ -0,0 +1,205 @@
+"""
+Day-partitioned Parquet snapshots of calls and caller information
+
+Snapshots are laid out Hive-style so DuckDB, pandas or pyarrow.dataset can
+query them directly without touching the live database:
+
+    DATA_DIR/analytics/calls/date=2025-06-01/part-0.parquet
+    DATA_DIR/analytics/caller_information/date=2025-06-01/part-0.parquet
+
+snapshot() covers the current tenant (see src/tenants.py); snapshot_tenants()
+runs it for each tenant into that tenant's own data directory, e.g.
+DATA_DIR/tenants/acme/analytics/.
+
+Only complete (past, UTC) days are written, and each run appends just the
+days after the newest existing partition. Requires the optional `pyarrow`
+dependency (pip install "myvapi[analytics]").
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from .config import DATA_DIR
+from .database import connect
+from .models import CallerInfo
+from .tenants import TENANTS, Tenant, run_as
+
+ANALYTICS_DIR = DATA_DIR / "analytics"
+
+# Rows per Parquet row group / cursor batch
+BATCH_SIZE = 10_000
+
+CALL_COLUMNS = [
+    ("call_id", "string", "call_id"),
+    ("assistant_id", "string", "assistant_id"),
+    ("call_status", "string", "call_status"),
+    ("end_reason", "string", "end_reason"),
+    ("success_evaluation", "string", "success_evaluation"),
+    ("call_duration", "float64", "call_duration"),
+    ("cost", "float64", "cost"),
+    ("started_at", "timestamp", "started_at"),
+    ("ended_at", "timestamp", "ended_at"),
+    ("created_at", "timestamp", "created_at"),
+]
+
+CALLER_COLUMNS = [
+    ("id", "int64", "id"),
+    ("call_id", "string", "call_id"),
+    ("type", "string", "type"),
+    ("submitted_at", "timestamp", "submitted_at"),
+] + [(field, "string", f"json_extract(arguments, '$.{field}')") for field in CallerInfo.model_fields]
+
+TABLES = {
+    "calls": ("calls", "created_at", CALL_COLUMNS),
+    "caller_information": ("caller_information", "submitted_at", CALLER_COLUMNS),
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet snapshots need pyarrow: pip install pyarrow (or the 'analytics' extra)")
+    return pyarrow, pyarrow.parquet
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """ISO strings from Vapi and 'YYYY-MM-DD HH:MM:SS' from SQLite, as naive UTC"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _schema(pa, columns):
+    types = {"string": pa.string(), "float64": pa.float64(), "int64": pa.int64(), "timestamp": pa.timestamp("us", tz="UTC")}
+    return pa.schema([(name, types[kind]) for name, kind, _ in columns])
+
+
+def partition_path(table: str, day: date, output_dir: Path = ANALYTICS_DIR) -> Path:
+    return output_dir / table / f"date={day.isoformat()}" / "part-0.parquet"
+
+
+def existing_partitions(table: str, output_dir: Path = ANALYTICS_DIR) -> list[date]:
+    table_dir = output_dir / table
+    if not table_dir.exists():
+        return []
+    days = []
+    for entry in table_dir.iterdir():
+        if entry.name.startswith("date=") and (entry / "part-0.parquet").exists():
+            days.append(date.fromisoformat(entry.name[len("date="):]))
+    return sorted(days)
+
+
+def pending_days(table: str, output_dir: Path = ANALYTICS_DIR, through: Optional[date] = None,
+                 rebuild_from: Optional[date] = None) -> list[date]:
+    """Days with rows that are newer than the last partition and no later than `through`"""
+    source, time_column, _ = TABLES[table]
+    through = through or (datetime.now(timezone.utc).date() - timedelta(days=1))
+
+    if rebuild_from:
+        start = rebuild_from
+    else:
+        existing = existing_partitions(table, output_dir)
+        start = existing[-1] + timedelta(days=1) if existing else None
+
+    conditions, params = [f"{time_column} < ?"], [(through + timedelta(days=1)).isoformat()]
+    if start:
+        conditions.append(f"{time_column} >= ?")
+        params.append(start.isoformat())
+
+    conn = connect()
+    try:
+        rows = conn.execute(
+            f"SELECT DISTINCT date({time_column}) FROM {source} WHERE {' AND '.join(conditions)}", params
+        ).fetchall()
+    finally:
+        conn.close()
+    return sorted(date.fromisoformat(row[0]) for row in rows if row[0])
+
+
+def write_partition(table: str, day: date, output_dir: Path = ANALYTICS_DIR) -> int:
+    """Write one day of `table` to Parquet; returns the row count"""
+    pa, pq = _require_pyarrow()
+    source, time_column, columns = TABLES[table]
+    schema = _schema(pa, columns)
+    timestamp_columns = {index for index, (_, kind, _) in enumerate(columns) if kind == "timestamp"}
+
+    path = partition_path(table, day, output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+
+    select = ", ".join(f"{expression} AS {name}" for name, _, expression in columns)
+    query = f"""
+        SELECT {select} FROM {source}
+        WHERE {time_column} >= ? AND {time_column} < ?
+        ORDER BY {time_column}, id
+    """
+    conn = connect()
+    rows_written = 0
+    try:
+        cursor = conn.execute(query, (day.isoformat(), (day + timedelta(days=1)).isoformat()))
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                arrays = []
+                for index, (name, kind, _) in enumerate(columns):
+                    values = [row[index] for row in rows]
+                    if index in timestamp_columns:
+                        values = [_parse_timestamp(value) for value in values]
+                    elif kind == "string":
+                        values = [None if value is None else str(value) for value in values]
+                    elif kind == "float64":
+                        values = [None if value is None else float(value) for value in values]
+                    arrays.append(pa.array(values, type=schema.field(name).type))
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows_written += len(rows)
+    finally:
+        conn.close()
+
+    # Readers never see a half-written partition
+    os.replace(tmp, path)
+    return rows_written
+
+
+def snapshot(tables: Optional[list[str]] = None, output_dir: Path = ANALYTICS_DIR, through: Optional[date] = None,
+             rebuild_from: Optional[date] = None) -> dict[str, dict[str, int]]:
+    """Append every pending day partition of the current tenant; returns {table: {day: rows}}"""
+    _require_pyarrow()
+    written = {}
+    for table in tables or list(TABLES):
+        written[table] = {}
+        for day in pending_days(table, output_dir, through, rebuild_from):
+            written[table][day.isoformat()] = write_partition(table, day, output_dir)
+    return written
+
+
+def tenant_analytics_dir(tenant: Tenant, output_dir: Optional[Path] = None) -> Path:
+    """The tenant's data_dir/analytics, or output_dir/<tenant name> when an output directory is given"""
+    return output_dir / tenant.name if output_dir else tenant.data_dir / "analytics"
+
+
+def snapshot_tenants(tables: Optional[list[str]] = None, tenants: Optional[list[Tenant]] = None,
+                     output_dir: Optional[Path] = None, through: Optional[date] = None,
+                     rebuild_from: Optional[date] = None) -> dict[str, dict[str, dict[str, int]]]:
+    """snapshot() for each tenant (all of them by default); returns {tenant: {table: {day: rows}}}"""
+    _require_pyarrow()
+    through = through or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    written = {}
+    for tenant in tenants or TENANTS.tenants():
+        # A tenant that has never taken a call has no database yet
+        if not tenant.db_path.exists():
+            continue
+        written[tenant.name] = run_as(
+            tenant, snapshot, tables, tenant_analytics_dir(tenant, output_dir), through, rebuild_from
+        )
+    return written
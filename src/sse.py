@@ -0,0 +1,40 @@
+"""
+Server-sent events helpers
+"""
+import asyncio
+from typing import Any, Optional
+
+from . import jsoncodec
+
+# Seconds between keep-alive comments, so proxies don't close an idle stream
+HEARTBEAT_INTERVAL = 15
+
+HEARTBEAT = b": keep-alive\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Returned by next_or_timeout() when nothing arrived in time
+TIMED_OUT = object()
+
+
+def format_event(data: Any, event: Optional[str] = None, event_id: Optional[int] = None) -> bytes:
+    """One SSE frame with `data` as JSON"""
+    return format_raw_event(jsoncodec.dumps(data), event, event_id)
+
+
+def format_raw_event(data: str, event: Optional[str] = None, event_id: Optional[int] = None) -> bytes:
+    """One SSE frame with `data` already encoded as single-line JSON"""
+    frame = ""
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    if event:
+        frame += f"event: {event}\n"
+    return (frame + f"data: {data}\n\n").encode()
+
+
+async def next_or_timeout(queue: asyncio.Queue, timeout: float = HEARTBEAT_INTERVAL) -> Any:
+    """The next item on `queue`, or TIMED_OUT once `timeout` passes without one"""
+    try:
+        return await asyncio.wait_for(queue.get(), timeout)
+    except asyncio.TimeoutError:
+        return TIMED_OUT
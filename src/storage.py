@@ -0,0 +1,116 @@
+"""
+File storage helpers that are safe with several worker processes
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def append_line(path: Union[str, Path], line: str):
+    """
+    Append one line to a shared log file
+
+    The line goes out in a single write under an exclusive lock, so lines
+    from concurrent workers never interleave.
+    """
+    data = line.encode("utf-8") if line.endswith("\n") else (line + "\n").encode("utf-8")
+
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+class LineIndex:
+    """
+    Byte offsets of the lines of an append-only log, by key
+
+    Each line is read once: a lookup first indexes whatever was appended
+    since the last one, then reads just the line it needs. The first line
+    for a key wins. A file that shrank or was replaced is indexed again from
+    the start.
+
+    Only the newest `max_keys` keys are held (about 300 bytes each). Older
+    keys are found by scanning the head of the file the dropped ones came
+    from, so they stay readable, just slower; a key seen again after it was
+    dropped is indexed at its new line. Lookups block on file I/O, so call
+    them from a thread, not the event loop.
+    """
+
+    def __init__(self, path: Union[str, Path], key: Callable[[bytes], Optional[Hashable]], max_keys: int = 100_000):
+        self.path = Path(path)
+        self.key = key
+        self.max_keys = max_keys
+        self._offsets: OrderedDict[Hashable, tuple[int, int]] = OrderedDict()
+        self._indexed = 0
+        self._inode = None
+        # Lines before this offset may have keys that are no longer held
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def _catch_up(self, f):
+        stat = os.fstat(f.fileno())
+        if stat.st_ino != self._inode or stat.st_size < self._indexed:
+            self._offsets.clear()
+            self._indexed = 0
+            self._dropped = 0
+            self._inode = stat.st_ino
+        if stat.st_size == self._indexed:
+            return
+
+        f.seek(self._indexed)
+        offset = self._indexed
+        for line in f:
+            # Only whole lines; one still being written is picked up next time
+            if not line.endswith(b"\n"):
+                break
+            key = self.key(line)
+            if key is not None and key not in self._offsets:
+                self._offsets[key] = (offset, len(line))
+                if len(self._offsets) > self.max_keys:
+                    start, length = self._offsets.popitem(last=False)[1]
+                    self._dropped = start + length
+            offset += len(line)
+        self._indexed = offset
+
+    def _scan(self, f, key: Hashable, end: int) -> Optional[bytes]:
+        f.seek(0)
+        offset = 0
+        for line in f:
+            if offset >= end:
+                break
+            if self.key(line) == key:
+                return line
+            offset += len(line)
+        return None
+
+    def read(self, key: Hashable) -> Optional[bytes]:
+        """The first line for `key` without its newline, None if there is none (or no file)"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            with self._lock:
+                self._catch_up(f)
+                entry = self._offsets.get(key)
+                dropped = self._dropped
+            if entry is not None:
+                f.seek(entry[0])
+                return f.read(entry[1]).rstrip(b"\n")
+            line = self._scan(f, key, dropped) if dropped else None
+            return line.rstrip(b"\n") if line is not None else None
@@ -0,0 +1,161 @@
+"""
+Brokerages sharing one deployment, each with its own storage shard
+
+TENANTS_FILE maps tenant names to their settings:
+
+    {"acme": {"brokerage_name": "Acme Realty",
+              "assistant_ids": ["..."], "phone_numbers": ["+15125550100"],
+              "google_sheets_webhook_url": "https://script.google.com/..."}}
+
+A webhook's call.assistantId (or, for assistants served by
+assistant-request, the number that was dialed) picks its tenant. Its rows
+go to DATA_DIR/tenants/<name>/calls.db, so one brokerage's write traffic
+never waits on another's lock. Anything unmatched, and everything when
+TENANTS_FILE is unset, uses the default tenant: DATA_DIR and DB_PATH as
+before.
+
+The active tenant is a context variable, which asyncio tasks and
+asyncio.to_thread() inherit, so connect() and the sinks follow the
+request without it being passed around.
+"""
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .config import BROKERAGE_NAME, DATA_DIR, DB_PATH, GOOGLE_SHEETS_WEBHOOK_URL, TENANTS_FILE
+from .normalize import e164
+
+DEFAULT_TENANT_NAME = "default"
+
+
+class Tenant(NamedTuple):
+    name: str
+    brokerage_name: str
+    data_dir: Path
+    db_path: Path
+    google_sheets_webhook_url: Optional[str]
+
+
+DEFAULT_TENANT = Tenant(DEFAULT_TENANT_NAME, BROKERAGE_NAME, DATA_DIR, DB_PATH, GOOGLE_SHEETS_WEBHOOK_URL)
+
+_current: contextvars.ContextVar[Tenant] = contextvars.ContextVar("tenant", default=DEFAULT_TENANT)
+
+
+def current_tenant() -> Tenant:
+    return _current.get()
+
+
+class TenantRegistry:
+    """TENANTS_FILE, read once and indexed by assistant ID and phone number"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._tenants: Optional[Dict[str, Tenant]] = None
+        self._by_assistant: Dict[str, Tenant] = {}
+        self._by_number: Dict[str, Tenant] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Tenant]:
+        with self._lock:
+            if self._tenants is not None:
+                return self._tenants
+            tenants = {DEFAULT_TENANT_NAME: DEFAULT_TENANT}
+            settings = json.loads(Path(self.path).read_text()) if self.path else {}
+            for name, entry in settings.items():
+                if name == DEFAULT_TENANT_NAME or not name.replace("-", "").replace("_", "").isalnum():
+                    raise ValueError(f"{self.path}: invalid tenant name {name!r}")
+                data_dir = DATA_DIR / "tenants" / name
+                tenant = Tenant(
+                    name,
+                    entry.get("brokerage_name") or BROKERAGE_NAME,
+                    data_dir,
+                    data_dir / "calls.db",
+                    entry.get("google_sheets_webhook_url"),
+                )
+                tenants[name] = tenant
+                for assistant_id in entry.get("assistant_ids", []):
+                    self._by_assistant[assistant_id] = tenant
+                for number in entry.get("phone_numbers", []):
+                    self._by_number[e164(number) or number] = tenant
+            self._tenants = tenants
+            return tenants
+
+    def reload(self):
+        with self._lock:
+            self._tenants = None
+            self._by_assistant.clear()
+            self._by_number.clear()
+
+    def tenants(self) -> List[Tenant]:
+        return list(self._load().values())
+
+    def get(self, name: str) -> Optional[Tenant]:
+        return self._load().get(name)
+
+    def for_call(self, call: Optional[Dict[str, Any]], dialed_number: Any = None) -> Tenant:
+        """The tenant owning a call: by assistant ID, then by the number dialed"""
+        self._load()
+        call = call if isinstance(call, dict) else {}
+        tenant = self._by_assistant.get(call.get("assistantId"))
+        if tenant:
+            return tenant
+        number = dialed_number or call.get("phoneNumber")
+        if isinstance(number, dict):
+            number = number.get("number")
+        return self._by_number.get(e164(number), DEFAULT_TENANT)
+
+    def brokerage_numbers(self) -> Dict[str, str]:
+        """Dialed number -> brokerage name, for answering assistant-request"""
+        self._load()
+        return {number: tenant.brokerage_name for number, tenant in self._by_number.items()}
+
+
+TENANTS = TenantRegistry(TENANTS_FILE)
+
+# Shards whose tables exist in this process
+_ready: set[Path] = set()
+_ready_lock = threading.Lock()
+
+
+def ensure_storage(tenant: Tenant):
+    """Create a tenant's directory and tables, once per process"""
+    if tenant.db_path in _ready:
+        return
+    from .database import init_database
+
+    with _ready_lock:
+        if tenant.db_path not in _ready:
+            tenant.data_dir.mkdir(parents=True, exist_ok=True)
+            token = _current.set(tenant)
+            try:
+                init_database()
+            finally:
+                _current.reset(token)
+            _ready.add(tenant.db_path)
+
+
+def activate(tenant: Tenant) -> Tenant:
+    """Make `tenant` current for the rest of this task (and what it spawns), creating its shard on first use"""
+    ensure_storage(tenant)
+    _current.set(tenant)
+    return tenant
+
+
+def run_as(tenant: Tenant, func: Callable, *args, **kwargs) -> Any:
+    """Call `func` with `tenant` current, leaving the caller's tenant alone"""
+    def call():
+        activate(tenant)
+        return func(*args, **kwargs)
+
+    return contextvars.copy_context().run(call)
+
+
+def fan_out(func: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """Tenant name -> `func(*args, **kwargs)` run against that tenant's shard, shards queried in parallel"""
+    tenants = TENANTS.tenants()
+    with ThreadPoolExecutor(max_workers=min(8, len(tenants))) as pool:
+        futures = {tenant.name: pool.submit(run_as, tenant, func, *args, **kwargs) for tenant in tenants}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,181 @@
+"""
+Minimal tracing: spans with attributes, correlated by Vapi call ID
+
+Every delivery for the same call shares one trace ID (derived from the call
+ID), so the stages of a call can be lined up across webhook deliveries.
+Finished traces are appended to DATA_DIR/traces/spans-YYYYMMDD.jsonl, one
+OTLP/JSON `ExportTraceServiceRequest` per line, which OTLP-aware tools
+(otel-collector's file receiver, Jaeger, etc.) can ingest directly.
+
+Tracing is disabled unless TRACING_ENABLED is set; disabled spans cost one
+boolean check.
+"""
+import contextvars
+import functools
+import hashlib
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from . import jsoncodec
+from .config import DATA_DIR, TRACING_ENABLED, BROKERAGE_NAME
+from .storage import append_line
+
+TRACE_DIR = DATA_DIR / "traces"
+SERVICE_NAME = "realflow-webhook"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def trace_id_for_call(call_id: str) -> str:
+    """Stable 128-bit trace ID for a Vapi call ID"""
+    return hashlib.sha256(call_id.encode()).hexdigest()[:32]
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed unit of work within a trace"""
+    __slots__ = ("name", "trace_id", "span_id", "parent", "start_ns", "end_ns", "attributes", "error", "children")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        # Finished descendants; only populated on the root span
+        self.children: list["Span"] = []
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self.parent is None else 1,  # SERVER for the root, INTERNAL otherwise
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+def _root(span: Span) -> Span:
+    while span.parent is not None:
+        span = span.parent
+    return span
+
+
+def bind_call_id(call_id: Optional[str]):
+    """Attach the current trace to a Vapi call ID once it is known"""
+    span = _current_span.get()
+    if span is None or not call_id:
+        return
+
+    root = _root(span)
+    root.trace_id = trace_id_for_call(call_id)
+    root.set_attribute("vapi.call_id", call_id)
+
+
+def detach_span():
+    """Start the current context over with no active span"""
+    _current_span.set(None)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return _root(span).trace_id if span else None
+
+
+def _export(root: Span):
+    spans = [root.to_otlp()] + [child.to_otlp() for child in root.children]
+    for span in spans:
+        span["traceId"] = root.trace_id
+
+    record = {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "brokerage.name", "value": {"stringValue": BROKERAGE_NAME}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": spans}],
+        }]
+    }
+
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    path = TRACE_DIR / f"spans-{datetime.utcnow().strftime('%Y%m%d')}.jsonl"
+    append_line(path, jsoncodec.dumps(record))
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """Run a block inside a span; the outermost span exports the trace"""
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent = _current_span.get()
+    span = Span(name, parent, {k: v for k, v in attributes.items() if v is not None})
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+        if parent is None:
+            try:
+                _export(span)
+            except OSError as e:
+                print(f"Failed to export trace: {str(e)}")
+        else:
+            _root(parent).children.append(span)
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not TRACING_ENABLED:
+                    return await func(*args, **kwargs)
+                with start_span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            with start_span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
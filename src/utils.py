@@ -1,36 +1,46 @@
 import json
-import httpx
+import time
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Optional
 
-from .config import DATA_DIR, GOOGLE_SHEETS_WEBHOOK_URL
 from .models import CallerInfo, ConversationData
+from .metrics import SHEETS_LATENCY, SHEETS_ERRORS
+from .tracing import traced
+from .storage import append_line
+from .tenants import current_tenant
 
 
-def verify_webhook_signature(payload: bytes, signature: str) -> bool:
+def verify_webhook_signature(payload: BinaryIO, signature: str) -> bool:
     """
     Verify webhook signature for security
+    
+    `payload` is the raw body as a file (see webhook_body.read_body), so
+    large bodies can be hashed in chunks.
     """
     # TODO: Implement webhook signature verification
 
     return True
     
 
+@traced()
 def save_conversation_data(data: ConversationData, call_id: str):
     """
     Save conversation data to JSON file
+    
+    The call's file and its all_calls.jsonl line share one encoding.
     """
-    filename = DATA_DIR / f"call_{call_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    data_dir = current_tenant().data_dir
+    filename = data_dir / f"call_{call_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    line = data.to_json()
     
-    with open(filename, "w") as f:
-        json.dump(data.model_dump(), f, indent=2)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(line)
     
     print(f"Saved conversation data to: {filename}")
     
     # Also append to a master log file
-    log_file = DATA_DIR / "all_calls.jsonl"
-    with open(log_file, "a") as f:
-        f.write(json.dumps(data.model_dump()) + "\n")
+    log_file = data_dir / "all_calls.jsonl"
+    append_line(log_file, line)
 
 
 def format_caller_summary(caller_info: CallerInfo) -> str:
@@ -63,6 +73,7 @@ def format_caller_summary(caller_info: CallerInfo) -> str:
     return "\n".join(summary_parts) if summary_parts else "No caller information collected"
 
 
+@traced()
 async def send_to_google_sheets(caller_info: CallerInfo, call_id: Optional[str] = None) -> bool:
     """
     Send caller information to Google Sheets via webhook
@@ -71,19 +82,25 @@ async def send_to_google_sheets(caller_info: CallerInfo, call_id: Optional[str]
     
     Returns True if successful, False otherwise
     """
+    # Each tenant can deliver to its own sheet
+    sheets_url = current_tenant().google_sheets_webhook_url
+    
     print("\n" + "=" * 60)
     print("GOOGLE SHEETS WEBHOOK ATTEMPT")
     print("=" * 60)
-    print(f"Webhook URL configured: {bool(GOOGLE_SHEETS_WEBHOOK_URL)}")
-    print(f"Webhook URL: {GOOGLE_SHEETS_WEBHOOK_URL[:50] + '...' if GOOGLE_SHEETS_WEBHOOK_URL and len(GOOGLE_SHEETS_WEBHOOK_URL) > 50 else GOOGLE_SHEETS_WEBHOOK_URL or 'NOT SET'}")
+    print(f"Webhook URL configured: {bool(sheets_url)}")
+    print(f"Webhook URL: {sheets_url[:50] + '...' if sheets_url and len(sheets_url) > 50 else sheets_url or 'NOT SET'}")
     print(f"Caller info: {caller_info.caller_name}")
     
-    if not GOOGLE_SHEETS_WEBHOOK_URL:
+    if not sheets_url:
         print("Google Sheets webhook URL not configured - skipping")
-        print("To enable: Set GOOGLE_SHEETS_WEBHOOK_URL in your .env file")
+        print("To enable: Set GOOGLE_SHEETS_WEBHOOK_URL in your .env file (or google_sheets_webhook_url in TENANTS_FILE)")
         print("=" * 60 + "\n")
         return False
     
+    # Imported on first delivery so deployments without Sheets never load it
+    import httpx
+    
     try:
         # Combine additional_notes and reason_for_calling into notes field
         notes_parts = []
@@ -115,9 +132,10 @@ async def send_to_google_sheets(caller_info: CallerInfo, call_id: Optional[str]
         print("\nSending data to webhook...")
         print(f"Data payload: {json.dumps(sheet_data, indent=2)}")
         
+        start = time.perf_counter()
         async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
             response = await client.post(
-                GOOGLE_SHEETS_WEBHOOK_URL,
+                sheets_url,
                 json=sheet_data,
                 headers={"Content-Type": "application/json"}
             )
@@ -126,19 +144,25 @@ async def send_to_google_sheets(caller_info: CallerInfo, call_id: Optional[str]
             print(f"Response body: {response.text[:200]}")
             
             if response.status_code in [200, 201, 202]:
+                SHEETS_LATENCY.labels("success").observe(time.perf_counter() - start)
                 print(f"Successfully sent to Google Sheets: {caller_info.caller_name}")
                 print("=" * 60 + "\n")
                 return True
             else:
+                SHEETS_LATENCY.labels("http_error").observe(time.perf_counter() - start)
+                SHEETS_ERRORS.labels(f"http_{response.status_code}").inc()
                 print(f"Google Sheets webhook returned status {response.status_code}: {response.text}")
                 print("=" * 60 + "\n")
                 return False
                 
     except httpx.TimeoutException:
+        SHEETS_LATENCY.labels("timeout").observe(time.perf_counter() - start)
+        SHEETS_ERRORS.labels("timeout").inc()
         print("Google Sheets webhook timeout - data not sent")
         print("=" * 60 + "\n")
         return False
     except Exception as e:
+        SHEETS_ERRORS.labels(type(e).__name__).inc()
         print(f"Error sending to Google Sheets: {str(e)}")
         print(f"Error type: {type(e).__name__}")
         import traceback
@@ -0,0 +1,131 @@
+"""
+Reading and parsing webhook bodies with bounded memory
+
+A ten-minute call's end-of-call report runs to several megabytes, most of it
+Vapi's message log (`message.messages`) and artifacts that no handler reads.
+read_body() refuses bodies over WEBHOOK_MAX_BODY_BYTES and spools anything
+over WEBHOOK_STREAM_PARSE_BYTES to a temporary file instead of memory.
+parse_body() decodes small bodies in one go. With the optional `ijson`
+package installed (`pip install .[streaming]`), it parses spooled bodies
+incrementally: the unused fields are skipped as they go by, and transcript
+entries go straight into a Transcript's columns. The parsed payload then
+holds only what the handlers use, however long the call was.
+"""
+import tempfile
+from typing import Any, BinaryIO, Iterator, Tuple, Union
+
+from fastapi import HTTPException, Request
+
+from . import jsoncodec
+from .config import WEBHOOK_MAX_BODY_BYTES, WEBHOOK_STREAM_PARSE_BYTES
+from .models import Transcript
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Fields of `message` that no handler reads, dropped unparsed from streamed bodies
+SKIPPED_MESSAGE_FIELDS = frozenset({"messages", "artifact"})
+
+_OPEN = ("start_map", "start_array")
+_CLOSE = ("end_map", "end_array")
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Payload larger than {WEBHOOK_MAX_BODY_BYTES} bytes")
+
+
+async def read_body(request: Request) -> Tuple[BinaryIO, int]:
+    """The request body as a file positioned at its start, and its size"""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > WEBHOOK_MAX_BODY_BYTES:
+        raise _too_large()
+
+    body = tempfile.SpooledTemporaryFile(max_size=WEBHOOK_STREAM_PARSE_BYTES)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > WEBHOOK_MAX_BODY_BYTES:
+                raise _too_large()
+            body.write(chunk)
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
+    return body, size
+
+
+def parse_body(body: BinaryIO, size: int) -> Any:
+    """Decode a body from read_body(), streaming it when it is large and ijson is installed"""
+    if ijson is None or size <= WEBHOOK_STREAM_PARSE_BYTES:
+        return jsoncodec.loads(body.read())
+    try:
+        return _parse_streaming(ijson.parse(body, use_float=True))
+    except ijson.JSONError as e:
+        raise jsoncodec.JSONDecodeError(str(e), "", 0) from None
+
+
+def _take(events: Iterator, event: str, value: Any, build: bool = True) -> Any:
+    """Consume the value starting with (event, value) and return it, or just skip it"""
+    builder = ijson.ObjectBuilder() if build else None
+    depth = 0
+    while True:
+        if builder:
+            builder.event(event, value)
+        if event in _OPEN:
+            depth += 1
+        elif event in _CLOSE:
+            depth -= 1
+        if depth == 0:
+            return builder.value if builder else None
+        _, event, value = next(events)
+
+
+def _take_transcript(events: Iterator) -> Union[Transcript, list]:
+    """Consume the rest of a transcript array (after its start_array) into columns"""
+    transcript = Transcript()
+    index = 0
+    for _, event, value in events:
+        if event == "end_array":
+            break
+        if event == "start_map":
+            # Entries are flat maps; build them without an ObjectBuilder apiece
+            entry = {}
+            for _, event, key in events:
+                if event == "end_map":
+                    break
+                _, event, value = next(events)
+                entry[key] = _take(events, event, value) if event in _OPEN else value
+            try:
+                transcript.append(entry, index)
+            except ValueError:
+                # Left as a list for handle_end_of_call to reject, as it would a decoded body
+                return transcript.dicts() + [entry] + _take(events, "start_array", None)
+        else:
+            _take(events, event, value, build=False)
+        index += 1
+    return transcript
+
+
+def _parse_streaming(events: Iterator) -> Any:
+    builder = ijson.ObjectBuilder()
+    transcript = None
+    for prefix, event, value in events:
+        if prefix == "message" and event == "map_key" and (value in SKIPPED_MESSAGE_FIELDS or value == "transcript"):
+            _, event, first = next(events)
+            if value != "transcript":
+                _take(events, event, first, build=False)
+            elif event == "start_array":
+                transcript = _take_transcript(events)
+            else:
+                # Live transcript updates carry a string here
+                transcript = _take(events, event, first)
+            continue
+        builder.event(event, value)
+
+    payload = builder.value
+    if transcript is not None:
+        payload["message"]["transcript"] = transcript
+    return payload
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Create or update one Vapi assistant per brokerage spec in assistants/
+
+Only assistants whose rendered config changed since the last sync are
+sent to Vapi; the rest are left alone, so re-running is cheap and never
+creates duplicates.
+
+    python sync_assistants.py                      # apply
+    python sync_assistants.py --dry-run            # show what would change
+    python sync_assistants.py --mock --mock-latency-ms 200
+"""
+import argparse
+import os
+import time
+
+from src.config import ASSISTANT_SPECS_DIR
+from src.assistant_sync import load_specs, sync_assistants, MockVapiClient, SYNC_CONCURRENCY
+
+
+def report(results, elapsed, client=None):
+    for result in results:
+        line = f"  {result['action']:<9} {result['spec']:<30} {result['assistant_id'] or '-'}"
+        if result["error"]:
+            line += f"  ERROR: {result['error']}"
+        print(line)
+    actions = [result["action"] for result in results]
+    failed = sum(1 for result in results if result["error"])
+    print(f"{actions.count('create')} created, {actions.count('update')} updated, "
+          f"{actions.count('unchanged')} unchanged, {failed} failed in {elapsed:.2f}s")
+    if isinstance(client, MockVapiClient):
+        calls = ", ".join(f"{method} {count}" for method, count in sorted(client.calls.items()))
+        print(f"Vapi calls: {calls}; at most {client.max_in_flight} in flight")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync Vapi assistants with the brokerage specs")
+    parser.add_argument("--specs-dir", default=str(ASSISTANT_SPECS_DIR), help="Directory of <brokerage>.json specs")
+    parser.add_argument("--concurrency", type=int, default=SYNC_CONCURRENCY, help="Vapi requests in flight at once")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be created or updated")
+    parser.add_argument("--mock", action="store_true",
+                        help="Sync twice against an in-memory Vapi instead of the real API, reporting calls and time")
+    parser.add_argument("--mock-latency-ms", type=float, default=50, help="Simulated Vapi request latency")
+    args = parser.parse_args()
+
+    specs = load_specs(args.specs_dir)
+    if not specs:
+        print(f"No specs in {args.specs_dir}")
+        return
+    webhook_url, webhook_secret = os.getenv("WEBHOOK_URL"), os.getenv("WEBHOOK_SECRET")
+
+    if args.mock:
+        client = MockVapiClient(latency=args.mock_latency_ms / 1000)
+        # The second pass shows an unchanged tree costs a single list request
+        for attempt in ("First sync", "Re-sync"):
+            client.calls.clear()
+            client.max_in_flight = 0
+            start = time.perf_counter()
+            results = sync_assistants(client, specs, webhook_url, webhook_secret, args.concurrency, args.dry_run)
+            print(f"{attempt} ({len(specs)} specs, mock latency {args.mock_latency_ms:g}ms):")
+            report(results, time.perf_counter() - start, client)
+        return
+
+    from vapi import Vapi
+
+    client = Vapi(token=os.getenv("VAPI_API_KEY"))
+    start = time.perf_counter()
+    results = sync_assistants(client, specs, webhook_url, webhook_secret, args.concurrency, args.dry_run)
+    report(results, time.perf_counter() - start)
+    if any(result["error"] for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
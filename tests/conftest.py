@@ -0,0 +1,42 @@
+"""
+Shared setup: every test session runs against a scratch DATA_DIR
+
+src.config reads the environment on import, so it is set here, before any
+test module imports the app.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_data_dir = Path(tempfile.mkdtemp(prefix="realflow-tests-"))
+os.environ["DATA_DIR"] = str(_data_dir)
+os.environ["DB_PATH"] = str(_data_dir / "calls.db")
+os.environ["TENANTS_FILE"] = ""
+os.environ["GOOGLE_SHEETS_WEBHOOK_URL"] = ""
+os.environ["TRACING_ENABLED"] = "false"
+os.environ["PROFILE_WEBHOOKS"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def tenant(tmp_path):
+    """A tenant with its own empty shard under tmp_path"""
+    from src.tenants import Tenant, ensure_storage
+
+    tenant = Tenant("test", "Test Realty", tmp_path, tmp_path / "calls.db", "")
+    ensure_storage(tenant)
+    return tenant
+
+
+@pytest.fixture
+def client():
+    """The app, started, with requests going through TestClient"""
+    from fastapi.testclient import TestClient
+    from app import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,42 @@
+import json
+
+from src.assistant_config import AssistantCache, build_assistant_config, caller_context, to_api_format
+
+WEBHOOK = ("https://example.com/webhook", "s3cret")
+
+
+def _cache():
+    return AssistantCache("Acme Realty", {"(512) 555-0100": "Beta Brokers"}, *WEBHOOK)
+
+
+def test_cached_response_matches_the_built_config():
+    cache = _cache()
+    cache.warm()
+
+    for brokerage in ("Acme Realty", "Beta Brokers"):
+        expected = {"assistant": to_api_format(build_assistant_config(brokerage, *WEBHOOK))}
+        assert json.loads(cache.response(brokerage)) == expected
+    assert len(cache) == 2
+    assert json.loads(cache.response("Acme Realty"))["assistant"]["server"] == {"url": WEBHOOK[0], "secret": WEBHOOK[1]}
+
+
+def test_caller_context_is_spliced_into_the_prompt():
+    cache = _cache()
+    lead = {"call_count": 2, "profile": {"caller_name": 'Dana "DL" Lee', "location": "Phoenix\\AZ"}}
+    context = caller_context(lead)
+
+    assistant = json.loads(cache.response("Beta Brokers", context))["assistant"]
+
+    expected = build_assistant_config("Beta Brokers", *WEBHOOK)["model"]["messages"][0]["content"] + context
+    assert assistant["model"]["messages"][0]["content"] == expected
+    assert "called 2 times before" in expected and 'Dana "DL" Lee' in expected
+
+
+def test_dialed_number_picks_the_brokerage():
+    cache = _cache()
+
+    assert cache.brokerage_for("+1 512 555 0100") == "Beta Brokers"
+    assert cache.brokerage_for("+15125550199") == "Acme Realty"
+    assert cache.brokerage_for(None) == "Acme Realty"
+    # Unknown brokerages fall back to the default's response
+    assert cache.response("Nobody") == cache.response("Acme Realty")
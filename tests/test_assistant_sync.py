@@ -0,0 +1,48 @@
+import json
+
+from src.assistant_sync import MockVapiClient, load_specs, sync_assistants
+
+
+def _write_specs(directory, **specs):
+    directory.mkdir(exist_ok=True)
+    for name, spec in specs.items():
+        (directory / f"{name}.json").write_text(json.dumps(spec))
+    return load_specs(directory)
+
+
+def _actions(results):
+    return {result["spec"]: result["action"] for result in results}
+
+
+def test_sync_creates_then_updates_only_changed_specs(tmp_path):
+    client = MockVapiClient(latency=0)
+    specs_dir = tmp_path / "assistants"
+    specs = _write_specs(specs_dir, acme={"brokerage_name": "Acme Realty"}, beta={"brokerage_name": "Beta Brokers"})
+
+    first = sync_assistants(client, specs)
+    assert _actions(first) == {"acme": "create", "beta": "create"}
+    assert client.calls == {"list": 1, "create": 2}
+    assert not any(result["error"] for result in first)
+
+    client.calls.clear()
+    again = sync_assistants(client, specs)
+    assert _actions(again) == {"acme": "unchanged", "beta": "unchanged"}
+    assert client.calls == {"list": 1}
+
+    client.calls.clear()
+    specs = _write_specs(specs_dir, beta={"brokerage_name": "Beta Brokers", "overrides": {"max_duration_seconds": 300}})
+    changed = sync_assistants(client, specs)
+    assert _actions(changed) == {"acme": "unchanged", "beta": "update"}
+    assert client.calls == {"list": 1, "update": 1}
+    # The update keeps the assistant created for the spec
+    beta = {result["spec"]: result["assistant_id"] for result in first}["beta"]
+    assert {result["spec"]: result["assistant_id"] for result in changed}["beta"] == beta
+    assert client.assistants._stored[beta].max_duration_seconds == 300
+
+
+def test_dry_run_sends_nothing(tmp_path):
+    client = MockVapiClient(latency=0)
+    specs = _write_specs(tmp_path / "assistants", acme={"brokerage_name": "Acme Realty"})
+
+    assert _actions(sync_assistants(client, specs, dry_run=True)) == {"acme": "create"}
+    assert client.calls == {"list": 1}
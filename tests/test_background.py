@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+
+from src.background import drain, pending_count, spawn
+from src.storage import append_line
+
+
+def test_drain_waits_for_pending_work():
+    finished = []
+
+    async def deliver(name: str, delay: float):
+        await asyncio.sleep(delay)
+        finished.append(name)
+
+    async def fail():
+        raise RuntimeError("sink down")
+
+    async def scenario():
+        spawn("sheets", deliver("sheets", 0.05), "call-1")
+        spawn("fails", fail(), "call-2")
+        assert pending_count() == 2
+        abandoned = await drain(5)
+        return abandoned, pending_count()
+
+    assert asyncio.run(scenario()) == (0, 0)
+    assert finished == ["sheets"]
+
+
+def test_drain_abandons_work_past_the_timeout():
+    async def scenario():
+        task = spawn("stuck", asyncio.sleep(60))
+        abandoned = await drain(0.05)
+        await asyncio.sleep(0)
+        return abandoned, task.cancelled()
+
+    assert asyncio.run(scenario()) == (1, True)
+
+
+def _append_many(path: str, worker: int):
+    for n in range(200):
+        append_line(path, f'{{"worker":{worker},"n":{n},"pad":"{"x" * 500}"}}')
+
+
+def test_appends_from_several_processes_never_interleave(tmp_path):
+    path = tmp_path / "all_calls.jsonl"
+    workers = [multiprocessing.Process(target=_append_many, args=(str(path), w)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 800
+    assert all(line.startswith('{"worker":') and line.endswith('"}') for line in lines)
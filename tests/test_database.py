@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from src.database import save_call_data
+from src.models import CallerInfo, ConversationData, Transcript
+from src.tenants import run_as
+
+
+def _conversation(call_id: str, **metadata) -> ConversationData:
+    return ConversationData(
+        call_id=call_id,
+        assistant_id="asst-test",
+        transcript=Transcript.from_messages([{"role": "assistant", "content": "Hello"}]),
+        call_duration=42,
+        metadata={"started_at": "2025-01-01T10:00:00Z", "end_reason": "customer-ended-call", **metadata},
+    )
+
+
+def test_phone_number_object_is_stored_as_text(tenant):
+    conversation = _conversation("call-object-number", phone_number={"id": "pn-1", "number": "+15125550100"})
+
+    run_as(tenant, save_call_data, conversation)
+
+    with sqlite3.connect(tenant.db_path) as conn:
+        stored = conn.execute("SELECT phone_number FROM calls WHERE call_id = ?", ("call-object-number",)).fetchone()
+    assert stored == ("+15125550100",)
+
+
+def test_failed_save_releases_write_lock(tenant):
+    # A cost the driver can't bind fails the insert after BEGIN IMMEDIATE
+    conversation = _conversation("call-bad-cost", cost={"total": 1.5})
+
+    with pytest.raises(sqlite3.Error):
+        run_as(tenant, save_call_data, conversation)
+
+    conn = sqlite3.connect(tenant.db_path, timeout=0)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.rollback()
+    finally:
+        conn.close()
+
+    # And the next write goes through
+    run_as(tenant, save_call_data, _conversation("call-after-error", cost=0.5))
+    with sqlite3.connect(tenant.db_path) as conn:
+        calls = [row[0] for row in conn.execute("SELECT call_id FROM calls ORDER BY call_id")]
+    assert calls == ["call-after-error"]
+
+
+def test_caller_info_is_linked_to_the_call(tenant):
+    conversation = _conversation("call-with-lead", customer_number="+15125550199")
+    conversation.caller_info = CallerInfo(caller_name="Dana", phone_number="(512) 555-0199")
+
+    run_as(tenant, save_call_data, conversation)
+
+    with sqlite3.connect(tenant.db_path) as conn:
+        call_lead, = conn.execute("SELECT lead_id FROM calls WHERE call_id = ?", ("call-with-lead",)).fetchone()
+        info_lead, = conn.execute(
+            "SELECT lead_id FROM caller_information WHERE call_id = ?", ("call-with-lead",)
+        ).fetchone()
+    assert call_lead is not None and call_lead == info_lead
+
+
+def test_calls_without_a_customer_number_are_not_merged_on_the_dialed_line(tenant):
+    for call_id in ("call-anon-1", "call-anon-2"):
+        run_as(tenant, save_call_data, _conversation(call_id, phone_number="+15125550100"))
+
+    with sqlite3.connect(tenant.db_path) as conn:
+        lead_ids = [row[0] for row in conn.execute("SELECT lead_id FROM calls ORDER BY call_id")]
+        leads = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    assert lead_ids == [None, None]
+    assert leads == 0
+
+
+def test_link_leads_ignores_the_dialed_line(tenant):
+    from src.database import connect, link_leads
+
+    with sqlite3.connect(tenant.db_path) as conn:
+        conn.execute(
+            "INSERT INTO caller_information (call_id, type, function_name, arguments, raw_payload) VALUES (?, ?, ?, ?, ?)",
+            ("call-dialed", "tool-calls", "submit_caller_information", '{"caller_name":"Sam"}',
+             '{"call":{"phoneNumber":{"number":"+15125550100"}}}'),
+        )
+        conn.execute(
+            "INSERT INTO caller_information (call_id, type, function_name, arguments, raw_payload) VALUES (?, ?, ?, ?, ?)",
+            ("call-customer", "tool-calls", "submit_caller_information", '{"caller_name":"Ana"}',
+             '{"call":{"customer":{"number":"+15125550177"},"phoneNumber":"+15125550100"}}'),
+        )
+
+    def backfill():
+        conn = connect()
+        try:
+            linked = link_leads(conn.cursor(), "caller_information")
+            conn.commit()
+            return linked
+        finally:
+            conn.close()
+
+    assert run_as(tenant, backfill) == 1
+    with sqlite3.connect(tenant.db_path) as conn:
+        phones = [row[0] for row in conn.execute("SELECT phone FROM leads")]
+    assert phones == ["+15125550177"]
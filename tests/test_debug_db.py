@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from debug_db import check, integrity, open_readonly, summary
+from src.database import save_call_data, save_caller_info
+from src.models import CallerInfo, ConversationData
+from src.tenants import run_as
+
+
+def _save_call(call_id: str):
+    conversation = ConversationData(call_id=call_id, assistant_id="asst-test", metadata={"customer_number": "+15125550100"})
+    save_call_data(conversation)
+    save_caller_info(CallerInfo(caller_name="Dana", phone_number="+15125550100"), call_id,
+                     {"type": "tool-calls", "toolCalls": [{"id": f"tool-{call_id}"}]})
+
+
+def test_clean_database_passes(tenant, capsys):
+    run_as(tenant, _save_call, "call-1")
+
+    conn = open_readonly(tenant.db_path)
+    try:
+        assert check(conn) is False
+        assert integrity(conn, full=True) is False
+        summary(conn, show=5)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM calls")
+    finally:
+        conn.close()
+    assert "❌" not in capsys.readouterr().out
+
+
+def test_check_reports_duplicates_and_invalid_json(tenant, capsys):
+    run_as(tenant, _save_call, "call-1")
+    run_as(tenant, _save_call, "call-1")
+    with sqlite3.connect(tenant.db_path) as conn:
+        conn.execute("UPDATE calls SET metadata = '{not json'")
+
+    conn = open_readonly(tenant.db_path)
+    try:
+        assert check(conn) is True
+    finally:
+        conn.close()
+    out = capsys.readouterr().out
+    assert "❌ tool calls saved more than once: 1" in out
+    assert "❌ calls.metadata not valid JSON: 1" in out
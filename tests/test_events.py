@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from src.events import EVENT_OVERFLOWS, EventBus
+
+
+def _buses(tmp_path, count=2, backlog=10):
+    # One bus per worker process, all on the same state file
+    return [EventBus(tmp_path / "state.db", backlog, 10, poll_interval=0.01) for _ in range(count)]
+
+
+def test_events_reach_subscribers_of_another_worker(tmp_path):
+    publisher, listener = _buses(tmp_path)
+
+    async def scenario():
+        subscriber, backlog = await listener.subscribe("acme")
+        publisher.publish("lead", {"id": 1}, "acme")
+        publisher.publish("lead", {"id": 2}, "other")
+        publisher.publish("call", {"call_id": "c-3"}, "acme")
+        events = await subscriber.wait(1)
+        while len(events) < 2:
+            events += await subscriber.wait(1)
+        listener.unsubscribe(subscriber)
+        return backlog, events
+
+    backlog, events = asyncio.run(scenario())
+    assert backlog == []
+    assert [event.id for event in events] == [1, 3]
+    assert events[0].sse == b'id: 1\nevent: lead\ndata: {"id":1,"tenant":"acme"}\n\n'
+    assert json.loads(events[1].text) == {"id": 3, "event": "call", "data": {"call_id": "c-3", "tenant": "acme"}}
+
+
+def test_resume_on_another_worker_replays_missed_events(tmp_path):
+    first, second = _buses(tmp_path)
+    for n in range(5):
+        first.publish("lead", {"n": n})
+
+    async def scenario():
+        subscriber, backlog = await second.subscribe(last_event_id=2)
+        second.unsubscribe(subscriber)
+        return backlog
+
+    assert [event.id for event in asyncio.run(scenario())] == [3, 4, 5]
+
+
+def test_resume_after_pruned_events_resets(tmp_path):
+    publisher, listener = _buses(tmp_path, backlog=3)
+    for n in range(6):
+        publisher.publish("lead", {"n": n})
+
+    async def scenario():
+        results = []
+        for last_event_id in (1, 3, 6, 99):
+            subscriber, backlog = await listener.subscribe(last_event_id=last_event_id)
+            listener.unsubscribe(subscriber)
+            results.append(None if backlog is None else [event.id for event in backlog])
+        return results
+
+    assert asyncio.run(scenario()) == [None, [4, 5, 6], [], None]
+
+
+def test_full_buffer_drops_and_counts(tmp_path):
+    bus, = _buses(tmp_path, count=1, backlog=100)
+    dropped = EVENT_OVERFLOWS.labels("drop-oldest")
+    before = dropped.value
+
+    async def scenario():
+        subscriber, _ = await bus.subscribe()
+        for n in range(12):
+            bus.publish("lead", {"n": n})
+        while bus.last_id < 12:
+            await asyncio.sleep(0.01)
+        buffered = bus.buffered()
+        events = await subscriber.wait(1)
+        bus.unsubscribe(subscriber)
+        return buffered, events
+
+    buffered, events = asyncio.run(scenario())
+    assert buffered == 10 and [event.id for event in events] == list(range(3, 13))
+    assert dropped.value - before == 2
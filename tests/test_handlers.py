@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from src import handlers
+from src.tenants import run_as
+
+
+def _on_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@pytest.fixture
+def blocking_calls(monkeypatch):
+    """Names of the replaced blocking functions, with whether each ran on the event loop's thread"""
+    calls = {}
+
+    def recorder(name, result=None):
+        def record(*args, **kwargs):
+            calls[name] = _on_loop_thread()
+            return result
+        return record
+
+    for name, result in (("save_conversation_data", None), ("save_call_data", 1), ("save_caller_info", 7)):
+        monkeypatch.setattr(handlers, name, recorder(name, result))
+    monkeypatch.setattr(handlers.LEAD_EVENTS, "publish", recorder("publish"))
+    monkeypatch.setattr(handlers, "spawn", lambda *args: args[1].close())
+    return calls
+
+
+def test_end_of_call_writes_run_off_the_event_loop(tenant, blocking_calls):
+    report = {"message": {"type": "end-of-call-report", "call": {"id": "call-off-loop"}, "transcript": []}}
+
+    result = run_as(tenant, asyncio.run, handlers.handle_end_of_call(report))
+
+    assert result["status"] == "success"
+    assert blocking_calls == {"save_conversation_data": False, "save_call_data": False, "publish": False}
+
+
+def test_caller_info_is_saved_off_the_event_loop(tenant, blocking_calls):
+    tool_call = {"id": "tool-1", "function": {"name": "submit_caller_information", "arguments": {"caller_name": "Dana"}}}
+    payload = {"message": {"type": "tool-calls", "call": {"id": "call-off-loop"}, "toolCallList": [tool_call]}}
+
+    result = run_as(tenant, asyncio.run, handlers.handle_function_call(payload))
+
+    assert result["toolCallId"] == "tool-1"
+    assert blocking_calls == {"save_caller_info": False, "publish": False}
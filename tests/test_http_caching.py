@@ -0,0 +1,60 @@
+from src.database import save_call_data
+from src.models import ConversationData, Transcript
+from src.tenants import DEFAULT_TENANT, run_as
+from src.utils import save_conversation_data
+
+
+def _save_call(call_id: str, messages: int = 1, summary: str = "First pass"):
+    conversation = ConversationData(
+        call_id=call_id,
+        assistant_id="asst-test",
+        transcript=Transcript.from_messages(
+            [{"role": "user", "content": f"Message {n} about an industrial property"} for n in range(messages)]
+        ),
+        call_duration=42,
+        summary=summary,
+        metadata={"started_at": "2025-01-01T10:00:00Z"},
+    )
+    run_as(DEFAULT_TENANT, save_call_data, conversation)
+    run_as(DEFAULT_TENANT, save_conversation_data, conversation, call_id)
+
+
+def test_db_call_revalidates_with_etag(client):
+    _save_call("etag-db")
+
+    first = client.get("/db/calls/etag-db")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    cached = client.get("/db/calls/etag-db", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b"" and cached.headers["etag"] == etag
+
+    # A new version of the call gets a new tag, and the old one no longer matches
+    _save_call("etag-db", summary="Second pass")
+    changed = client.get("/db/calls/etag-db", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["summary"] == "Second pass"
+
+
+def test_logged_call_revalidates_with_content_etag(client):
+    _save_call("etag-log")
+
+    first = client.get("/calls/etag-log")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["call_id"] == "etag-log"
+
+    assert client.get("/calls/etag-log", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+    assert client.get("/calls/etag-log", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_large_call_is_compressed_when_accepted(client):
+    _save_call("etag-large", messages=200)
+
+    response = client.get("/db/calls/etag-large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] in ("gzip", "br")
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["transcript"]) == 200
@@ -0,0 +1,30 @@
+import sqlite3
+
+from import_history import Checkpoint, import_records
+from src.tenants import run_as
+
+
+def _record(call_id: str, phone_number) -> dict:
+    return {
+        "call_id": call_id,
+        "assistant_id": "asst-test",
+        "call_duration": 30,
+        "transcript": [{"role": "user", "content": "Hi", "timestamp": None}],
+        "metadata": {"phone_number": phone_number, "started_at": "2025-01-01T10:00:00Z"},
+    }
+
+
+def test_imports_calls_with_phone_number_objects(tenant):
+    records = [
+        (_record("import-object", {"id": "pn-1", "number": "+15125550100"}), {"jsonl": {"offset": 1}}),
+        (_record("import-text", "+15125550101"), {"jsonl": {"offset": 2}}),
+    ]
+    checkpoint = Checkpoint(tenant.data_dir / "checkpoint.json")
+
+    totals = run_as(tenant, import_records, iter(records), checkpoint, 100)
+
+    assert totals["calls"] == 2
+    assert checkpoint.state == {"jsonl": {"offset": 2}}
+    with sqlite3.connect(tenant.db_path) as conn:
+        stored = dict(conn.execute("SELECT call_id, phone_number FROM calls"))
+    assert stored == {"import-object": "+15125550100", "import-text": "+15125550101"}
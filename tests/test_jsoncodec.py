@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from src import jsoncodec
+from src.models import Transcript
+
+VALUES = [
+    {"call_id": "c-1", "cost": 0.125, "ok": True, "missing": None, "tags": ["a", "b"]},
+    {"text": "Café — 東京 \"quoted\" \\ back\nslash", "emoji": "🏢"},
+    {1: "integer keys", "nested": {"deep": [1, 2.5, -3, {"x": []}]}},
+    [2**70, "integers over 64 bits"],
+]
+
+
+def _transcript() -> Transcript:
+    return Transcript.from_messages([
+        {"role": "assistant", "content": "Hello — how can I help?", "timestamp": "2025-01-01T10:00:00Z"},
+        {"role": "user", "content": "Looking for \"warehouse\" space\tin Phoenix", "timestamp": None},
+    ])
+
+
+def test_standard_library_fallback(monkeypatch):
+    monkeypatch.setattr(jsoncodec, "orjson", None)
+
+    assert jsoncodec.dumps(VALUES[0]) == '{"call_id":"c-1","cost":0.125,"ok":true,"missing":null,"tags":["a","b"]}'
+    assert jsoncodec.dumpb(VALUES[1]) == jsoncodec.dumps(VALUES[1]).encode()
+    assert jsoncodec.dumps({"day": date(2025, 1, 2)}, default=str) == '{"day":"2025-01-02"}'
+    assert jsoncodec.loads(jsoncodec.dumpb(VALUES[1])) == VALUES[1]
+    assert jsoncodec.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert _transcript().to_json() == jsoncodec.dumps(_transcript().dicts())
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_backends_write_the_same_json(value, monkeypatch):
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr(jsoncodec, "orjson", orjson)
+    fast = jsoncodec.dumps(value), jsoncodec.dumpb(value)
+    monkeypatch.setattr(jsoncodec, "orjson", None)
+    assert (jsoncodec.dumps(value), jsoncodec.dumpb(value)) == fast
+
+
+def test_backends_encode_transcripts_the_same(monkeypatch):
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr(jsoncodec, "orjson", orjson)
+    fast = _transcript().to_json()
+    monkeypatch.setattr(jsoncodec, "orjson", None)
+    assert _transcript().to_json() == fast
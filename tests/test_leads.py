@@ -0,0 +1,64 @@
+import pytest
+
+from src.database import query_leads, save_caller_info
+from src.models import CallerInfo
+from src.normalize import canonical_asset_type, canonical_urgency, market_key, parse_deal_size
+from src.tenants import run_as
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$2-3M", (2e6, 3e6)),
+    ("1.5M to 2M", (1.5e6, 2e6)),
+    ("under $750,000", (0.0, 750000.0)),
+    ("$25M+", (25e6, None)),
+    ("around 500k", (500e3, 500e3)),
+    ("not sure yet", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_deal_size(text, expected):
+    assert parse_deal_size(text) == expected
+
+
+def test_canonical_values():
+    assert canonical_asset_type("Medical office building") == "medical_office"
+    assert canonical_asset_type("small warehouse") == "industrial"
+    assert canonical_asset_type("a boat") == "other"
+    assert canonical_asset_type(" ") is None
+    assert canonical_urgency("ASAP please") == "immediate"
+    assert canonical_urgency("whenever") == "unspecified"
+    assert market_key("Phoenix metro") == market_key("Phoenix, AZ") == "phoenix"
+    assert market_key("Denver CO") == "denver"
+    assert market_key("Dallas-Fort Worth") == "dallas-fort-worth"
+
+
+def _save_leads():
+    for n, (location, asset_type, deal_size) in enumerate([
+        ("Phoenix, AZ", "warehouse", "$2-3M"),
+        ("Phoenix metro", "office", "under $750,000"),
+        ("Miami", "industrial", "$25M+"),
+        ("phoenix", "distribution center", "$10 million"),
+    ]):
+        save_caller_info(CallerInfo(location=location, asset_type=asset_type, deal_size=deal_size), f"call-{n}")
+
+
+def test_query_leads_filters_on_normalized_columns(tenant):
+    run_as(tenant, _save_leads)
+
+    def calls(**filters):
+        return [lead["call_id"] for lead in run_as(tenant, query_leads, **filters)]
+
+    assert calls(market="phoenix") == ["call-3", "call-1", "call-0"]
+    assert calls(market="phoenix", asset_class="industrial") == ["call-3", "call-0"]
+    # Deal size ranges overlap the filter; open-ended leads have no maximum
+    assert calls(min_deal_size=5e6) == ["call-3", "call-2"]
+    assert calls(max_deal_size=1e6) == ["call-1"]
+    assert calls(min_deal_size=1e6, max_deal_size=2.5e6) == ["call-0"]
+
+
+def test_query_leads_pages_by_keyset(tenant):
+    run_as(tenant, _save_leads)
+
+    first = run_as(tenant, query_leads, limit=3)
+    rest = run_as(tenant, query_leads, before_id=first[-1]["id"], limit=3)
+
+    assert [lead["call_id"] for lead in first + rest] == ["call-3", "call-2", "call-1", "call-0"]
@@ -0,0 +1,81 @@
+import asyncio
+
+from src.live import LiveCallRegistry
+
+CALL = {"id": "call-live", "assistantId": "asst-test", "customer": {"number": "+15125550100"}}
+
+
+def _registries(tmp_path, count=2, **options):
+    # One registry per worker process, all on the same state file
+    return [LiveCallRegistry(tmp_path / "state.db", 10, 3600, poll_interval=0.01, **options) for _ in range(count)]
+
+
+def test_webhooks_on_different_workers_build_one_call(tmp_path):
+    first, second = _registries(tmp_path)
+
+    first.update_status(CALL, "in-progress", "acme")
+    second.add_segment(CALL, "assistant", "Hello", "acme")
+    first.add_segment(CALL, "user", "Hi, I'm looking to buy", "acme")
+
+    for registry in (first, second):
+        assert [call["call_id"] for call in registry.calls("acme")] == ["call-live"]
+        assert registry.calls("other") == []
+        live = registry.get("call-live")
+        assert live["status"] == "in-progress" and live["segments"] == 2
+        assert [segment["seq"] for segment in registry.transcript("call-live")] == [1, 2]
+
+
+def test_stream_on_one_worker_sees_webhooks_from_another(tmp_path):
+    webhooks, supervisor = _registries(tmp_path)
+    webhooks.add_segment(CALL, "assistant", "Hello", "acme")
+    webhooks.add_segment(CALL, "user", "Hi", "acme")
+
+    async def scenario():
+        live, queue, backlog = await supervisor.subscribe("call-live", after=1)
+        webhooks.add_segment(CALL, "assistant", "How can I help?", "acme")
+        webhooks.end("call-live", "customer-ended-call")
+        events = [await asyncio.wait_for(queue.get(), 1) for _ in range(2)]
+        supervisor.unsubscribe("call-live", queue)
+        return live, backlog, events
+
+    live, backlog, events = asyncio.run(scenario())
+    assert live["segments"] == 2
+    assert [segment["text"] for segment in backlog] == ["Hi"]
+    assert [(event, data.get("seq")) for event, data in events] == [("transcript", 3), ("ended", None)]
+    assert events[1][1]["reason"] == "customer-ended-call"
+    assert webhooks.get("call-live") is None and len(supervisor) == 0
+
+
+def test_transcript_and_calls_are_bounded(tmp_path):
+    registry, = _registries(tmp_path, count=1, transcript_max=3)
+    for n in range(5):
+        registry.add_segment(CALL, "user", f"segment {n}")
+    assert [segment["seq"] for segment in registry.transcript("call-live")] == [3, 4, 5]
+
+    for n in range(12):
+        registry.update_status({"id": f"call-{n}"}, "ringing")
+    # Listing stops at max_calls straight away; the sweep ends the oldest call for good
+    assert len(registry.calls()) == 10
+    registry.evict()
+    assert len(registry) == registry.count == 10
+    assert registry.get("call-live") is None
+
+
+def test_sweep_ends_calls_without_news(tmp_path):
+    registry, = _registries(tmp_path, count=1)
+    registry.update_status(CALL, "in-progress", "acme")
+
+    async def scenario():
+        live, queue, _ = await registry.subscribe("call-live")
+        registry.ttl = 0.2
+        await asyncio.sleep(0.3)
+        registry.update_status({"id": "call-fresh"}, "ringing")
+        # An expired call is no longer listed, but only the sweep ends it
+        listed = [call["call_id"] for call in registry.calls()]
+        registry.evict()
+        return live, listed, await asyncio.wait_for(queue.get(), 1)
+
+    live, listed, (event, data) = asyncio.run(scenario())
+    assert live is not None and listed == ["call-fresh"]
+    assert event == "ended" and data["reason"] == "evicted"
+    assert len(registry) == registry.count == 1
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+
+from src.metrics import Registry, read_snapshots, write_snapshot
+
+
+def _worker_registry():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("status",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "In flight")
+    shared = registry.gauge("shared_total", "Read from shared state", multiprocess_mode="max")
+    return registry, requests, latency, in_flight, shared
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_merges_workers_and_drops_gauges_of_exited_ones(tmp_path):
+    first, requests, latency, in_flight, shared = _worker_registry()
+    requests.labels("ok").inc(3)
+    latency.observe(0.05)
+    in_flight.set(2)
+    shared.set(7)
+    write_snapshot(tmp_path, first)
+
+    second, requests, latency, in_flight, shared = _worker_registry()
+    requests.labels("ok").inc(2)
+    requests.labels("error").inc()
+    latency.observe(0.5)
+    in_flight.set(5)
+    shared.set(7)
+    write_snapshot(tmp_path, second, pid=_exited_pid())
+
+    text = first.render_merged(read_snapshots(tmp_path))
+
+    assert 'requests_total{status="ok"} 5' in text
+    assert 'requests_total{status="error"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert "latency_seconds_count 2" in text
+    # The second worker has exited: its requests still count, its in-flight gauge doesn't
+    assert "in_flight 2" in text
+    assert "shared_total 7" in text
+
+
+def test_snapshot_file_is_named_by_pid(tmp_path):
+    registry, requests, *_ = _worker_registry()
+    requests.labels("ok").inc()
+    write_snapshot(tmp_path, registry)
+
+    assert [path.name for path in tmp_path.iterdir()] == [f"{os.getpid()}.json"]
+    [(alive, snapshot)] = read_snapshots(tmp_path)
+    assert alive and snapshot["requests_total"] == [[["ok"], 1.0]]
+
+
+def test_snapshot_while_other_threads_add_children():
+    registry, requests, *_ = _worker_registry()
+    done = threading.Event()
+
+    def add_children():
+        for n in range(20000):
+            requests.labels(str(n)).inc()
+        done.set()
+
+    thread = threading.Thread(target=add_children)
+    thread.start()
+    while not done.is_set():
+        registry.snapshot()
+        registry.render()
+    thread.join()
+
+    assert len(registry.snapshot()["requests_total"]) == 20000
@@ -0,0 +1,27 @@
+from src.normalize import caller_phone, e164, phone_number_text
+
+
+def test_e164_reads_national_and_international_numbers():
+    assert e164("(512) 555-0100") == "+15125550100"
+    assert e164("1-512-555-0100") == "+15125550100"
+    assert e164("+44 20 7946 0958") == "+442079460958"
+    assert e164("555-0100") is None
+    assert e164(None) is None
+
+
+def test_caller_phone_uses_customer_number_then_fallbacks():
+    call = {"customer": {"number": "+15125550199"}, "phoneNumber": {"number": "+15125550100"}}
+    assert caller_phone(call, "+15125550123") == "+15125550199"
+    assert caller_phone({"customer": {}}, None, "512 555 0123") == "+15125550123"
+
+
+def test_caller_phone_ignores_the_dialed_number():
+    assert caller_phone({"phoneNumber": "+15125550100"}) is None
+    assert caller_phone({"phoneNumber": {"number": "+15125550100"}}) is None
+
+
+def test_phone_number_text():
+    assert phone_number_text("+15125550100") == "+15125550100"
+    assert phone_number_text({"id": "pn-1", "number": "+15125550100"}) == "+15125550100"
+    assert phone_number_text({"id": "pn-1"}) is None
+    assert phone_number_text(None) is None
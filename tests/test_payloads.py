@@ -0,0 +1,52 @@
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from benchmarks.payloads import DEFAULT_MIX, MESSAGE_TYPES, generate, workload
+
+
+@pytest.mark.parametrize("message_type", MESSAGE_TYPES)
+def test_payloads_carry_what_the_handlers_read(message_type):
+    message = generate(message_type, random.Random(1))["message"]
+
+    assert message["type"] == message_type
+    assert message["call"]["id"] and message["call"]["assistantId"]
+    if message_type == "tool-calls":
+        assert message["toolCalls"][0]["function"]["name"] == "submit_caller_information"
+    if message_type == "transcript":
+        assert message["transcriptType"] in ("final", "partial") and message["transcript"]
+
+
+def test_end_of_call_report_options():
+    rng = random.Random(2)
+    report = generate("end-of-call-report", rng, transcript_length=7)["message"]
+    bare = generate("end-of-call-report", rng, transcript_length=0, structured_data=False)["message"]
+
+    assert len(report["transcript"]) == len(report["messages"]) == 7
+    assert [m["role"] for m in report["transcript"][:2]] == ["assistant", "user"]
+    assert report["analysis"]["structuredData"]["caller_name"]
+    assert bare["transcript"] == [] and "structuredData" not in bare["analysis"]
+
+
+def test_workload_is_reproducible_and_follows_the_mix():
+    first = list(workload(200, seed=3))
+    second = list(workload(200, seed=3))
+
+    # Bodies carry the current time; the sequence of types is fixed by the seed
+    assert [message_type for message_type, _ in first] == [message_type for message_type, _ in second]
+    counts = Counter(message_type for message_type, _ in first)
+    assert set(counts) <= set(DEFAULT_MIX)
+    assert counts["transcript"] > counts["end-of-call-report"]
+    assert all(json.loads(body)["message"]["type"] == message_type for message_type, body in first)
+
+
+def test_app_accepts_generated_payloads(client):
+    rng = random.Random(4)
+    report = generate("end-of-call-report", rng, transcript_length=5, call_id="call-synthetic")
+
+    for payload in (report, *(generate(message_type, rng) for message_type in MESSAGE_TYPES[1:])):
+        response = client.post("/webhook", json=payload)
+        assert response.status_code == 200
+        assert response.json().get("status") != "error"
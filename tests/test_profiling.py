@@ -0,0 +1,58 @@
+import asyncio
+import pstats
+import time
+
+from src import profiling
+from src.profiling import ProfilingMiddleware, sign_profile_request, verify_profile_request
+
+
+async def _slow_app(scope, receive, send):
+    time.sleep(0.03)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _deliver(path: str = "/webhook", headers: list = ()):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "headers": list(headers), "state": {"call_id": "call/1"}}
+    asyncio.run(ProfilingMiddleware(_slow_app)(scope, receive, send))
+    return sent
+
+
+def test_signed_header_is_checked_against_the_secret(monkeypatch):
+    monkeypatch.setattr(profiling, "WEBHOOK_SECRET", "s3cret")
+
+    assert verify_profile_request(sign_profile_request())
+    assert not verify_profile_request(sign_profile_request(int(time.time()) - 3600))
+    assert not verify_profile_request(f"{int(time.time())}.forged")
+
+
+def test_requested_profile_writes_cprofile_and_collapsed_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "WEBHOOK_SECRET", "s3cret")
+
+    sent = _deliver(headers=[(b"x-profile-request", sign_profile_request().encode())])
+
+    assert sent[0]["status"] == 200
+    prof, = tmp_path.glob("*_call_1_*ms.prof")
+    assert pstats.Stats(str(prof)).total_calls > 0
+    collapsed = prof.with_suffix(".collapsed").read_text()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+
+def test_slow_mode_keeps_only_sampled_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "PROFILE_SLOW_MS", 10)
+
+    _deliver()
+    _deliver(path="/calls")
+
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
+    assert not list(tmp_path.glob("*.prof"))
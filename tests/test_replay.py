@@ -0,0 +1,58 @@
+import asyncio
+import json
+import sqlite3
+
+from replay_webhooks import Replayer, find_divergence, load_deliveries
+
+
+def _conversation(call_id: str, ended_at: str) -> dict:
+    return {
+        "call_id": call_id,
+        "assistant_id": "asst-test",
+        "summary": f"Summary of {call_id}",
+        "transcript": [{"role": "user", "content": "Hi", "timestamp": ended_at}],
+        "metadata": {"ended_at": ended_at, "end_reason": "customer-ended-call"},
+    }
+
+
+def _tool_calls_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE caller_information (id INTEGER PRIMARY KEY, call_id TEXT, timestamp TEXT, raw_payload TEXT)")
+    conn.executemany("INSERT INTO caller_information (call_id, timestamp, raw_payload) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_replay_merges_sources_in_time_order_and_finds_divergence(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    calls = [_conversation("call-a", "2025-01-01T10:00:00Z"), _conversation("call-c", "2025-01-01T12:00:00Z")]
+    (source / "all_calls.jsonl").write_text("".join(json.dumps(record) + "\n" for record in calls))
+    tool_call = {"type": "tool-calls", "toolCalls": [{"function": {"name": "submit_caller_information"}}]}
+    _tool_calls_db(source / "calls.db", [("call-b", "2025-01-01T11:00:00", json.dumps(tool_call))])
+
+    deliveries = list(load_deliveries(source, source / "calls.db", ["db", "jsonl"], None, None))
+    assert [(d.call_id, d.message_type, d.source) for d in deliveries] == [
+        ("call-a", "end-of-call-report", "jsonl"),
+        ("call-b", "tool-calls", "db"),
+        ("call-c", "end-of-call-report", "jsonl"),
+    ]
+    assert deliveries[0].payload["message"]["analysis"]["summary"] == "Summary of call-a"
+    assert len(list(load_deliveries(source, source / "calls.db", ["db", "jsonl"], {"end-of-call-report"}, 1))) == 1
+
+    sent = []
+
+    async def send(body: bytes):
+        sent.append(json.loads(body))
+        return 200, {"status": "success"}
+
+    replayer = Replayer(send, concurrency=2, speed=0)
+    asyncio.run(replayer.run(iter(deliveries)))
+    assert replayer.sent == {"end-of-call-report": 2, "tool-calls": 1} and not replayer.errors
+    assert len(sent) == 3
+
+    # The target kept call-a's report and call-b's tool call, but lost call-c
+    (target / "all_calls.jsonl").write_text(json.dumps(calls[0]) + "\n")
+    _tool_calls_db(target / "calls.db", [("call-b", "2025-01-01T11:00:00", json.dumps(tool_call))])
+    assert find_divergence(replayer, target) == ["call-c"]
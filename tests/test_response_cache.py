@@ -0,0 +1,77 @@
+import asyncio
+import json
+import threading
+
+from src.response_cache import ResponseCache
+
+
+def _counting(value):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+
+    return compute, calls
+
+
+def test_entry_is_recomputed_when_the_version_changes():
+    cache = ResponseCache(10)
+    compute, calls = _counting({"rows": [1]})
+
+    async def scenario():
+        first = await cache.get("/test", "key", (1,), 60, compute)
+        hit = await cache.get("/test", "key", (1,), 60, compute)
+        changed = await cache.get("/test", "key", (2,), 60, compute)
+        return first, hit, changed
+
+    first, hit, changed = asyncio.run(scenario())
+    assert first == hit == changed == b'{"rows":[1]}'
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_recomputed():
+    cache = ResponseCache(10)
+    compute, calls = _counting([])
+
+    async def scenario():
+        await cache.get("/test", "key", (1,), 0, compute)
+        await cache.get("/test", "key", (1,), 0, compute)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache(10)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return []
+
+    async def scenario():
+        requests = [asyncio.create_task(cache.get("/test", "key", (1,), 60, compute)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*requests)
+
+    assert asyncio.run(scenario()) == [b"[]"] * 20
+    assert len(calls) == 1
+
+
+def test_write_invalidates_cached_read(client):
+    before = client.get("/db/calls", params={"limit": 500}).json()
+    report = {"message": {
+        "type": "end-of-call-report",
+        "call": {"id": "call-cache-write", "assistantId": "asst-test"},
+        "transcript": [],
+    }}
+
+    assert client.post("/webhook", json=report).status_code == 200
+    after = client.get("/db/calls", params={"limit": 500}).json()
+
+    assert after["total"] == before["total"] + 1
+    assert "call-cache-write" in json.dumps(after)
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from src.tenants import DEFAULT_TENANT, run_as
+
+
+def test_gzip_export_is_a_gzip_file(client):
+    response = client.get("/db/export/leads", params={"format": "csv", "gzip": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="leads.csv.gz"'
+    # Left compressed on the wire, so the client saves what the filename says
+    assert "content-encoding" not in response.headers
+    header = next(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert "caller_name" in header
+
+
+def test_plain_export(client):
+    response = client.get("/db/export/calls", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == 'attachment; filename="calls.ndjson"'
+
+
+def test_fan_out_reads_run_off_the_event_loop(client):
+    import asyncio
+    from src.routes import api_router
+
+    blocking = {"/db/calls/{call_id}", "/db/leads/top", "/db/leads/by-phone/{phone}", "/db/timeseries"}
+    # FastAPI runs plain def endpoints in its threadpool
+    assert not [
+        route.path for route in api_router.routes
+        if route.path in blocking and asyncio.iscoroutinefunction(route.endpoint)
+    ]
+    for path in ("/db/leads/top", "/db/timeseries", "/db/stats"):
+        assert client.get(path, params={"tenant": "all"}).status_code == 200
+    assert client.get("/db/leads/by-phone/5125550100", params={"tenant": "all"}).status_code == 404
+
+
+@pytest.fixture
+def acme(tmp_path, monkeypatch):
+    """A second tenant, "acme", next to the default one"""
+    from src.tenants import TENANTS
+
+    tenants_file = tmp_path / "tenants.json"
+    tenants_file.write_text(json.dumps({"acme": {"brokerage_name": "Acme Realty", "assistant_ids": ["asst-acme"]}}))
+    monkeypatch.setattr(TENANTS, "path", str(tenants_file))
+    TENANTS.reload()
+    yield TENANTS.get("acme")
+    monkeypatch.undo()
+    TENANTS.reload()
+
+
+def _log_call(tenant, call_id: str, duration: int):
+    from src.models import ConversationData, Transcript
+    from src.utils import save_conversation_data
+
+    conversation = ConversationData(
+        call_id=call_id,
+        assistant_id="asst-test",
+        transcript=Transcript.from_messages([{"role": "assistant", "content": "Hello"}]),
+        call_duration=duration,
+    )
+    run_as(tenant, save_conversation_data, conversation, call_id)
+
+
+def test_call_log_routes_read_the_requested_tenant(client, acme):
+    _log_call(acme, "log-acme", 30)
+    _log_call(DEFAULT_TENANT, "log-default", 90)
+
+    acme_calls = client.get("/calls", params={"tenant": "acme"}).json()["calls"]
+    default_calls = client.get("/calls").json()["calls"]
+    assert [call["call_id"] for call in acme_calls] == ["log-acme"]
+    assert "log-acme" not in [call["call_id"] for call in default_calls]
+
+    assert client.get("/calls/log-acme", params={"tenant": "acme"}).json()["call_duration"] == 30
+    assert client.get("/calls/log-acme").status_code == 404
+    assert client.get("/calls/log-default", params={"tenant": "acme"}).status_code == 404
+
+    assert client.get("/stats", params={"tenant": "acme"}).json()["total_calls"] == 1
+    assert client.get("/stats", params={"tenant": "nobody"}).status_code == 404
+    assert client.get("/calls", params={"tenant": "all"}).status_code == 400
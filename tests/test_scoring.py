@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from src.database import get_top_leads
+from src.scoring import load_weights, score_leads
+from src.tenants import run_as
+
+
+def _add_lead(tenant, urgency: str, caller_role: str, age_days: float):
+    with sqlite3.connect(tenant.db_path) as conn:
+        conn.execute(
+            "INSERT INTO caller_information (call_id, type, arguments, urgency, caller_role, submitted_at) "
+            "VALUES (?, 'tool-calls', '{}', ?, ?, datetime('now', ?))",
+            (f"call-{urgency}-{age_days}", urgency, caller_role, f"-{age_days} days"),
+        )
+
+
+def _top(tenant, weights):
+    leads = run_as(tenant, get_top_leads, 10, recency_per_day=weights["recency_per_day"],
+                   recency_horizon_days=weights["recency_horizon_days"])
+    return [lead["call_id"] for lead in leads], leads
+
+
+def test_strong_older_lead_outranks_weak_new_one(tenant):
+    weights = load_weights()
+    _add_lead(tenant, "immediate", "owner", 60)
+    _add_lead(tenant, "exploring", "other", 0)
+    run_as(tenant, score_leads, weights)
+
+    order, leads = _top(tenant, weights)
+
+    assert order == ["call-immediate-60", "call-exploring-0"]
+    # Stored scores are feature points only; age is taken off at ranking time, capped at the horizon
+    assert leads[0]["score"] == 50.0
+    assert leads[0]["priority"] == 50.0 - weights["recency_per_day"] * weights["recency_horizon_days"]
+    assert abs(leads[1]["priority"] - leads[1]["score"]) < 0.1
+
+
+def test_age_past_the_horizon_no_longer_counts(tenant):
+    weights = load_weights()
+    _add_lead(tenant, "within_month", "buyer", 400)
+    _add_lead(tenant, "within_month", "tenant", 45)
+    _add_lead(tenant, "within_month", "owner", 5)
+    run_as(tenant, score_leads, weights)
+
+    order, leads = _top(tenant, weights)
+
+    assert order == ["call-within_month-5", "call-within_month-400", "call-within_month-45"]
+    assert leads[1]["priority"] - leads[2]["priority"] == pytest.approx((0.9 - 0.6) * weights["caller_role"])
+
+
+def test_weights_file_is_read_again_only_after_it_changes(tmp_path, monkeypatch):
+    path = tmp_path / "weights.json"
+    path.write_text('{"urgency": 40.0}')
+    assert load_weights(str(path))["urgency"] == 40.0
+
+    reads = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *args, **kwargs: reads.append(args[0]) or real_open(*args, **kwargs))
+    weights = load_weights(str(path))
+    weights["urgency_levels"]["immediate"] = 0
+    assert reads == [] and load_weights(str(path))["urgency_levels"]["immediate"] == 1.0
+
+    path.write_text('{"urgency": 45.0, "success": 5.0}')
+    assert load_weights(str(path))["success"] == 5.0 and reads == [str(path)]
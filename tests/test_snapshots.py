@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+
+from src.database import connect
+from src.snapshots import existing_partitions, partition_path, snapshot, snapshot_tenants
+from src.tenants import Tenant, ensure_storage, run_as
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _insert_calls(rows):
+    conn = connect()
+    conn.executemany("INSERT INTO calls (call_id, call_duration, started_at, created_at) VALUES (?, ?, ?, ?)", rows)
+    conn.execute(
+        "INSERT INTO caller_information (call_id, type, arguments, submitted_at) VALUES (?, ?, ?, ?)",
+        ("call-1", "tool-calls", '{"caller_name": "Dana Lee", "asset_type": "office"}', "2025-06-01 09:30:00"),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_snapshot_writes_complete_days_once(tenant, tmp_path):
+    output_dir = tmp_path / "analytics"
+    run_as(tenant, _insert_calls, [
+        ("call-1", 61.5, "2025-06-01T09:00:00Z", "2025-06-01 09:05:00"),
+        ("call-2", None, None, "2025-06-01 23:59:59"),
+        ("call-3", 12.0, "2025-06-02T08:00:00Z", "2025-06-02 08:01:00"),
+        ("call-4", 30.0, "2025-06-03T08:00:00Z", "2025-06-03 08:01:00"),
+    ])
+
+    written = run_as(tenant, snapshot, output_dir=output_dir, through=date(2025, 6, 2))
+
+    assert written == {"calls": {"2025-06-01": 2, "2025-06-02": 1}, "caller_information": {"2025-06-01": 1}}
+    calls = pq.read_table(partition_path("calls", date(2025, 6, 1), output_dir)).to_pylist()
+    assert [row["call_id"] for row in calls] == ["call-1", "call-2"]
+    assert calls[0]["call_duration"] == 61.5 and calls[0]["started_at"].hour == 9
+    callers = pq.read_table(partition_path("caller_information", date(2025, 6, 1), output_dir)).to_pylist()
+    assert callers[0]["caller_name"] == "Dana Lee" and callers[0]["asset_type"] == "office"
+
+    # Later runs only append the days after the newest partition
+    assert run_as(tenant, snapshot, ["calls"], output_dir, date(2025, 6, 2)) == {"calls": {}}
+    assert run_as(tenant, snapshot, ["calls"], output_dir, date(2025, 6, 3)) == {"calls": {"2025-06-03": 1}}
+    assert existing_partitions("calls", output_dir) == [date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)]
+
+    rebuilt = run_as(tenant, snapshot, ["calls"], output_dir, date(2025, 6, 3), rebuild_from=date(2025, 6, 2))
+    assert rebuilt == {"calls": {"2025-06-02": 1, "2025-06-03": 1}}
+
+
+def test_each_tenant_is_snapshotted_into_its_own_directory(tmp_path):
+    tenants = [Tenant(name, name, tmp_path / name, tmp_path / name / "calls.db", "") for name in ("acme", "other")]
+    for tenant in tenants:
+        ensure_storage(tenant)
+    run_as(tenants[0], _insert_calls, [("call-1", 61.5, None, "2025-06-01 09:05:00")])
+    run_as(tenants[1], _insert_calls, [("call-9", 5.0, None, "2025-06-02 10:00:00")])
+    never_called = Tenant("new", "new", tmp_path / "new", tmp_path / "new" / "calls.db", "")
+
+    written = snapshot_tenants(["calls"], tenants + [never_called], through=date(2025, 6, 2))
+
+    assert written == {"acme": {"calls": {"2025-06-01": 1}}, "other": {"calls": {"2025-06-02": 1}}}
+    assert existing_partitions("calls", tmp_path / "acme" / "analytics") == [date(2025, 6, 1)]
+    other = pq.read_table(partition_path("calls", date(2025, 6, 2), tmp_path / "other" / "analytics")).to_pylist()
+    assert [row["call_id"] for row in other] == ["call-9"]
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+CHECK_IMPORT = "import sys, app; print(sorted(name for name in ('httpx', 'uvicorn') if name in sys.modules))"
+
+
+def test_importing_the_app_has_no_side_effects(tmp_path):
+    data_dir = tmp_path / "not-created"
+    env = {**os.environ, "DATA_DIR": str(data_dir), "DB_PATH": str(data_dir / "calls.db")}
+
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK_IMPORT], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    # Storage is created by the lifespan, not on import
+    assert not data_dir.exists()
+    assert "Database initialized" not in result.stdout
+    # Optional integrations load on first use
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_lifespan_creates_storage(tmp_path):
+    data_dir = tmp_path / "data"
+    env = {**os.environ, "DATA_DIR": str(data_dir), "DB_PATH": str(data_dir / "calls.db")}
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "from app import app\n"
+        "with TestClient(app) as client:\n"
+        "    assert client.get('/health').json()['data_directory_exists']\n"
+    )
+
+    subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, env=env, capture_output=True, check=True)
+
+    assert (data_dir / "calls.db").exists()
+
+
+def test_workers_default_to_cpu_count():
+    env = {key: value for key, value in os.environ.items() if key != "WEB_CONCURRENCY"}
+    check = "import os; from src.config import WORKERS; print(WORKERS == (os.cpu_count() or 1))"
+
+    result = subprocess.run([sys.executable, "-c", check], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "True"
+
+    env["WEB_CONCURRENCY"] = "3"
+    check = "from src.config import WORKERS; print(WORKERS)"
+    result = subprocess.run([sys.executable, "-c", check], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "3"
@@ -0,0 +1,37 @@
+import json
+
+from src.storage import LineIndex, append_line
+
+
+def _key(line: bytes):
+    return json.loads(line).get("id")
+
+
+def test_index_reads_lines_appended_after_it_was_built(tmp_path):
+    log = tmp_path / "log.jsonl"
+    append_line(log, json.dumps({"id": "a", "n": 1}))
+    index = LineIndex(log, _key)
+
+    assert json.loads(index.read("a"))["n"] == 1
+    assert index.read("b") is None
+
+    append_line(log, json.dumps({"id": "b", "n": 2}))
+    append_line(log, json.dumps({"id": "a", "n": 3}))
+    assert json.loads(index.read("b"))["n"] == 2
+    # The first line for a key wins
+    assert json.loads(index.read("a"))["n"] == 1
+
+
+def test_index_holds_only_the_newest_keys(tmp_path):
+    log = tmp_path / "log.jsonl"
+    for n in range(10):
+        append_line(log, json.dumps({"id": f"call-{n}", "n": n}))
+    index = LineIndex(log, _key, max_keys=3)
+
+    assert json.loads(index.read("call-9"))["n"] == 9
+    assert list(index._offsets) == ["call-7", "call-8", "call-9"]
+    # Dropped keys are still found by scanning the head of the file
+    assert json.loads(index.read("call-0"))["n"] == 0
+    assert json.loads(index.read("call-6"))["n"] == 6
+    assert index.read("call-missing") is None
+    assert len(index._offsets) == 3
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from src import tracing
+from src.tracing import bind_call_id, start_span, trace_id_for_call, traced
+
+
+@pytest.fixture
+def trace_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "TRACE_DIR", tmp_path)
+    return tmp_path
+
+
+def _exported(trace_dir) -> list[list[dict]]:
+    lines = next(trace_dir.glob("spans-*.jsonl")).read_text().splitlines()
+    return [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"] for line in lines]
+
+
+@traced()
+def _query():
+    return "rows"
+
+
+@traced("handler")
+async def _handler():
+    return _query()
+
+
+def test_spans_of_a_delivery_share_the_call_trace(trace_dir):
+    async def deliver():
+        with start_span("webhook", **{"http.route": "/webhook"}):
+            bind_call_id("call-42")
+            return await _handler()
+
+    assert asyncio.run(deliver()) == "rows"
+
+    spans, = _exported(trace_dir)
+    by_name = {span["name"]: span for span in spans}
+    assert set(by_name) == {"webhook", "handler", "test_tracing._query"}
+    assert {span["traceId"] for span in spans} == {trace_id_for_call("call-42")}
+    assert by_name["handler"]["parentSpanId"] == by_name["webhook"]["spanId"]
+    assert by_name["test_tracing._query"]["parentSpanId"] == by_name["handler"]["spanId"]
+    assert {"key": "vapi.call_id", "value": {"stringValue": "call-42"}} in by_name["webhook"]["attributes"]
+
+
+def test_failed_span_is_exported_with_its_error(trace_dir):
+    with pytest.raises(ValueError):
+        with start_span("webhook"):
+            raise ValueError("bad payload")
+
+    (span,), = _exported(trace_dir)
+    assert span["status"] == {"code": 2, "message": "ValueError: bad payload"}
+
+
+def test_disabled_tracing_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_DIR", tmp_path)
+
+    with start_span("webhook") as span:
+        assert span is None
+    assert _query() == "rows"
+    assert not list(tmp_path.iterdir())
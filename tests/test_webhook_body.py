@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from src import webhook_body
+from src.models import Transcript
+from src.webhook_body import parse_body
+
+
+def _report(messages: int) -> dict:
+    transcript = [{"role": "user", "content": f"Line {n}", "timestamp": f"2025-01-01T10:00:{n:02d}Z"} for n in range(messages)]
+    return {"message": {
+        "type": "end-of-call-report",
+        "call": {"id": "call-body", "assistantId": "asst-test"},
+        "transcript": transcript,
+        "messages": [{"role": "bot", "message": "x" * 200, "time": n} for n in range(messages)],
+        "artifact": {"messages": transcript, "recordingUrl": "https://example.com/r.wav"},
+        "endedReason": "customer-ended-call",
+    }}
+
+
+def _parse(payload) -> object:
+    body = json.dumps(payload).encode()
+    return parse_body(io.BytesIO(body), len(body))
+
+
+def test_oversized_body_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(webhook_body, "WEBHOOK_MAX_BODY_BYTES", 1000)
+    body = json.dumps(_report(20)).encode()
+
+    assert client.post("/webhook", content=body, headers={"Content-Type": "application/json"}).status_code == 413
+    # Without a Content-Length, the limit applies while the body streams in
+    chunks = (body[i:i + 256] for i in range(0, len(body), 256))
+    assert client.post("/webhook", content=chunks, headers={"Content-Type": "application/json"}).status_code == 413
+
+
+def test_small_body_is_decoded_in_memory(monkeypatch):
+    monkeypatch.setattr(webhook_body, "WEBHOOK_STREAM_PARSE_BYTES", 1 << 20)
+    report = _report(3)
+
+    assert _parse(report) == report
+
+
+def test_large_body_is_parsed_incrementally(monkeypatch):
+    pytest.importorskip("ijson")
+    monkeypatch.setattr(webhook_body, "WEBHOOK_STREAM_PARSE_BYTES", 100)
+    report = _report(50)
+
+    payload = _parse(report)
+
+    message = payload["message"]
+    assert "messages" not in message and "artifact" not in message
+    assert message["call"] == report["message"]["call"]
+    assert message["endedReason"] == "customer-ended-call"
+    assert isinstance(message["transcript"], Transcript)
+    assert message["transcript"].dicts() == report["message"]["transcript"]
+
+
+def test_streamed_invalid_transcript_is_left_as_a_list(monkeypatch):
+    pytest.importorskip("ijson")
+    monkeypatch.setattr(webhook_body, "WEBHOOK_STREAM_PARSE_BYTES", 100)
+    report = _report(5)
+    report["message"]["transcript"][2]["content"] = {"not": "text"}
+
+    transcript = _parse(report)["message"]["transcript"]
+
+    assert transcript == report["message"]["transcript"]